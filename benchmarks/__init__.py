@@ -0,0 +1,4 @@
+"""Offline benchmarks for the tokenizer, trainer step and dashboard update paths.
+
+Run with `python -m benchmarks`; see benchmarks/__main__.py for options.
+"""
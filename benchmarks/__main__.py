@@ -0,0 +1,40 @@
+import argparse
+import sys
+
+from .suite import BENCHMARKS, compare, load, run, save
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks (no network needed)")
+    parser.add_argument("names", nargs="*", help=f"benchmarks or groups to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs and fewer repeats")
+    parser.add_argument("--output", default="benchmark-results.json", help="where to write the results JSON")
+    parser.add_argument("--baseline", help="results JSON to compare against; regressions exit with status 1")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before flagging (0.25 = 25%%)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = run(args.names, quick=args.quick)
+    save(results, args.output)
+    print(f"Results written to {args.output}")
+
+    for name, metrics in results["results"].items():
+        print(name)
+        for metric, value in metrics.items():
+            print(f"  {metric:<32} {value:,.3f}" if isinstance(value, float) else f"  {metric:<32} {value}")
+
+    failed = [name for name, metrics in results["results"].items() if "error" in metrics]
+    if args.baseline:
+        regressions = compare(results, load(args.baseline), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import random
+
+from datasets import Dataset, DatasetDict
+from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+from transformers import GPT2Config, GPT2LMHeadModel, GPT2TokenizerFast
+
+# Small vocabulary with a Zipf-like frequency spread, so line lengths and
+# BPE merges look roughly like natural text without any download
+WORDS = (
+    "the of and to in a is that for it as was with be by on not he this are or his from at which but "
+    "have an they you were her she there been one all we their has would when if so no will more "
+    "model training loss gradient learning rate schedule token batch epoch checkpoint dataset "
+    "optimizer evaluation accuracy perplexity transformer attention layer embedding sequence"
+).split()
+EOS_TOKEN = "<|endoftext|>"
+
+
+def synthetic_corpus(lines: int, seed: int = 0, blank_ratio: float = 0.3, max_words: int = 80):
+    """Wikitext-shaped lines: some blank, the rest of varying length"""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(WORDS))]
+    corpus = []
+    for _ in range(lines):
+        if rng.random() < blank_ratio:
+            corpus.append("")
+            continue
+        corpus.append(" ".join(rng.choices(WORDS, weights, k=rng.randint(1, max_words))))
+    return corpus
+
+
+def synthetic_dataset(train_lines: int, eval_lines: int, seed: int = 0) -> DatasetDict:
+    return DatasetDict({
+        "train": Dataset.from_dict({"text": synthetic_corpus(train_lines, seed)}),
+        "validation": Dataset.from_dict({"text": synthetic_corpus(eval_lines, seed + 1)}),
+    })
+
+
+def build_tokenizer(vocab_size: int = 1000, seed: int = 0) -> GPT2TokenizerFast:
+    """Byte-level BPE trained on the synthetic corpus, wrapped like the GPT-2 tokenizer"""
+    tokenizer = Tokenizer(models.BPE())
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(
+        vocab_size=vocab_size,
+        special_tokens=[EOS_TOKEN],
+        initial_alphabet=pre_tokenizers.ByteLevel.alphabet(),
+        show_progress=False
+    )
+    tokenizer.train_from_iterator(synthetic_corpus(5000, seed), trainer)
+    wrapped = GPT2TokenizerFast(tokenizer_object=tokenizer, eos_token=EOS_TOKEN, bos_token=EOS_TOKEN,
+                                unk_token=EOS_TOKEN)
+    wrapped.pad_token = wrapped.eos_token
+    return wrapped
+
+
+def tiny_model(vocab_size: int, max_length: int, seed: int = 0) -> GPT2LMHeadModel:
+    """Two-layer GPT-2: same code paths as the real model at a fraction of the cost"""
+    import torch
+    torch.manual_seed(seed)
+    config = GPT2Config(vocab_size=vocab_size, n_positions=max_length, n_embd=64, n_layer=2, n_head=2)
+    return GPT2LMHeadModel(config)
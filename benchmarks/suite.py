@@ -0,0 +1,316 @@
+import json
+import platform
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from .fixtures import build_tokenizer, synthetic_dataset, tiny_model
+
+# Sizes the dashboard update paths are measured at
+POINT_COUNTS = (1_000, 100_000, 1_000_000)
+
+# Metrics whose names end like this are better when higher; everything else is a time
+HIGHER_IS_BETTER_SUFFIXES = ("_per_sec",)
+# Worst-case latencies are reported but too noisy to gate on
+UNGATED_MARKERS = ("_max_",)
+# Differences below this are timer noise, whatever the relative change
+NOISE_FLOOR_MS = 0.05
+
+BENCHMARKS: Dict[str, Callable] = {}
+
+
+def benchmark(name: str):
+    """Register fn(quick) -> {metric: value} under a dotted name (group.case)"""
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def timed_ms(fn, repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """Median and worst latency of fn() in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(samples), "max_ms": max(samples)}
+
+
+_fixture_cache = {}
+
+
+def _tokenizer():
+    if "tokenizer" not in _fixture_cache:
+        _fixture_cache["tokenizer"] = build_tokenizer()
+    return _fixture_cache["tokenizer"]
+
+
+def _tokenize(strategy: str, quick: bool):
+    from src.training.tokenizer import ModelTokenizer
+
+    lines = 5_000 if quick else 50_000
+    dataset = synthetic_dataset(lines, lines // 10)
+    model_tokenizer = ModelTokenizer(tokenizer=_tokenizer(), strategy=strategy)
+    start = time.perf_counter()
+    model_tokenizer.tokenize_dataset(dataset, max_length=128)
+    elapsed = time.perf_counter() - start
+    return {
+        "wall_s": elapsed,
+        "lines_per_sec": model_tokenizer.throughput["lines_per_sec"],
+        "tokens_per_sec": model_tokenizer.throughput["tokens_per_sec"],
+    }
+
+
+@benchmark("tokenizer.padding")
+def bench_tokenize_padding(quick: bool):
+    return _tokenize("padding", quick)
+
+
+@benchmark("tokenizer.packing")
+def bench_tokenize_packing(quick: bool):
+    return _tokenize("packing", quick)
+
+
+@benchmark("trainer.step")
+def bench_trainer_step(quick: bool):
+    from transformers import TrainingArguments
+    from src.training.resume import ResumableTrainer
+    from src.training.throughput import StepTimer, StepTimingCallback, ThroughputMeter, STEP_PHASES
+    from src.training.tokenizer import CausalLMCollator, ModelTokenizer
+
+    class RecordingMeter(ThroughputMeter):
+        def __init__(self):
+            super().__init__()
+            self.history = []
+
+        def update(self, stats):
+            self.history.append(stats)
+            super().update(stats)
+
+    max_length = 128
+    tokenizer = _tokenizer()
+    tokenized = ModelTokenizer(tokenizer=tokenizer, strategy="packing").tokenize_dataset(
+        synthetic_dataset(5_000, 100), max_length=max_length
+    )
+    timer, meter = StepTimer(), RecordingMeter()
+    with tempfile.TemporaryDirectory() as output_dir:
+        args = TrainingArguments(
+            output_dir=output_dir,
+            max_steps=10 if quick else 40,
+            per_device_train_batch_size=8,
+            learning_rate=5e-4,
+            save_strategy="no",
+            eval_strategy="no",
+            logging_strategy="no",
+            report_to="none",
+            disable_tqdm=True,
+            dataloader_num_workers=0,
+            seed=0
+        )
+        trainer = ResumableTrainer(
+            model=tiny_model(len(tokenizer), max_length),
+            args=args,
+            train_dataset=tokenized["train"],
+            data_collator=CausalLMCollator(),
+            callbacks=[StepTimingCallback(timer, meter)],
+            step_timer=timer
+        )
+        trainer.train()
+
+    walls = [stats["wall"] for stats in meter.history]
+    result = {"step_median_ms": statistics.median(walls) * 1000, "step_max_ms": max(walls) * 1000}
+    for phase in STEP_PHASES:
+        result[f"{phase}_median_ms"] = statistics.median(stats[phase] for stats in meter.history) * 1000
+    result["samples_per_sec"] = sum(stats["samples"] for stats in meter.history) / sum(walls)
+    result["tokens_per_sec"] = sum(stats["tokens"] for stats in meter.history) / sum(walls)
+    return result
+
+
+def _display_available() -> bool:
+    try:
+        import tkinter
+        tkinter.Tk().destroy()
+        return True
+    except Exception:
+        return False
+
+
+def _open_window():
+    """The real dashboard, with its deferred charts built"""
+    from src.ui.training_window import TrainingProgressWindow
+
+    window = TrainingProgressWindow()
+    window.window.withdraw()
+    while window.renderer is None:
+        window.window.update()
+    return window
+
+
+def _loss_series(points: int):
+    import numpy as np
+    from src.utils.metric_series import MetricSeries
+
+    values = 5.0 * np.exp(-np.linspace(0, 3, points)) + np.random.default_rng(0).normal(0, 0.05, points)
+    return MetricSeries.from_values(values, window=50)
+
+
+@benchmark("dashboard.update_loss_plot")
+def bench_update_loss_plot(quick: bool):
+    """One new point plus a redraw at each history size.
+
+    Without a display the dashboard cannot be built, so the same data path
+    (min/max downsampling plus a blitted Agg render) is measured instead.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from src.ui.plot_renderer import BlitPlotRenderer
+
+    repeat = 10 if quick else 50
+    window = _open_window() if _display_available() else None
+    result = {"path": "window" if window else "headless"}
+    try:
+        for points in POINT_COUNTS:
+            series = _loss_series(points)
+            if window is not None:
+                def update():
+                    series.append(1.0)
+                    window.update_loss_plot(series)
+            else:
+                figure = Figure(figsize=(8, 3), dpi=100)
+                canvas = FigureCanvasAgg(figure)
+                ax = figure.add_subplot(111)
+                line, = ax.plot([], [])
+                avg_line, = ax.plot([], [])
+                ax.set_xlim(0, points * 1.5)
+                renderer = BlitPlotRenderer(canvas, [line, avg_line])
+                max_points = max(int(ax.bbox.width), 100)
+
+                def update():
+                    series.append(1.0)
+                    steps, values = series.downsample(max_points)
+                    avg_steps, avg_values = series.average.downsample(max_points)
+                    line.set_data(steps, values)
+                    avg_line.set_data(avg_steps, avg_values)
+                    BlitPlotRenderer.fit_y(ax, min(values.min(), avg_values.min()),
+                                           max(values.max(), avg_values.max()))
+                    renderer.render()
+            for name, value in timed_ms(update, repeat).items():
+                result[f"{points}_{name}"] = value
+    finally:
+        if window is not None:
+            window.close()
+    return result
+
+
+@benchmark("dashboard.update_log")
+def bench_update_log(quick: bool):
+    """One new log line and a filtered search over each history size.
+
+    Without a display the log console's LogStore (the part that scales with
+    history) is measured instead of the full widget path.
+    """
+    from src.ui.log_console import LogStore
+
+    repeat = 10 if quick else 50
+    categories = ("TRAINING", "SYSTEM", "CHECKPOINT", "SPEED")
+    window = _open_window() if _display_available() else None
+    result = {"path": "window" if window else "headless"}
+    try:
+        for points in POINT_COUNTS:
+            history = [(1.7e9 + i, categories[i % len(categories)], f"step {i} loss {5.0 - i * 1e-6:.4f}")
+                       for i in range(points)]
+            if window is not None:
+                window.console.append_batch(history)
+                append = lambda: window.update_log("TRAINING", "step loss 1.0000")
+                search = lambda: window.filter_logs("TRAINING", "loss 4.99")
+            else:
+                store = LogStore()
+                store.extend(history)
+                append = lambda: store.extend([(time.time(), "TRAINING", "step loss 1.0000")])
+                search = lambda: store.tail(1000, ["TRAINING"], "loss 4.99")
+            for name, value in timed_ms(append, repeat).items():
+                result[f"{points}_append_{name}"] = value
+            for name, value in timed_ms(search, max(3, repeat // 10)).items():
+                result[f"{points}_search_{name}"] = value
+            if window is not None:
+                window.filter_logs("All", "")
+    finally:
+        if window is not None:
+            window.close()
+    return result
+
+
+def environment() -> Dict[str, str]:
+    import psutil
+    import torch
+    import transformers
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": str(psutil.cpu_count()),
+        "torch": torch.__version__,
+        "transformers": transformers.__version__,
+        "cuda": str(torch.cuda.is_available()),
+    }
+
+
+def run(names: Optional[List[str]] = None, quick: bool = False, log=print) -> dict:
+    """Run the selected benchmarks (all by default; a group name selects its cases)"""
+    import datasets
+    datasets.disable_progress_bars()
+
+    selected = [name for name in BENCHMARKS
+                if not names or any(name == wanted or name.startswith(wanted + ".") for wanted in names)]
+    results = {}
+    for name in selected:
+        log(f"Running {name}...")
+        start = time.perf_counter()
+        try:
+            results[name] = BENCHMARKS[name](quick)
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+        log(f"  done in {time.perf_counter() - start:.1f}s")
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "quick": quick,
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.25) -> List[str]:
+    """Describe every metric that got worse than the baseline by more than tolerance"""
+    regressions = []
+    for name, metrics in current["results"].items():
+        reference = baseline.get("results", {}).get(name, {})
+        for metric, value in metrics.items():
+            old = reference.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or old <= 0:
+                continue
+            if any(marker in metric for marker in UNGATED_MARKERS):
+                continue
+            if metric.endswith("_ms") and abs(value - old) < NOISE_FLOOR_MS:
+                continue
+            if metric.endswith(HIGHER_IS_BETTER_SUFFIXES):
+                change = (old - value) / old
+            else:
+                change = (value - old) / old
+            if change > tolerance:
+                regressions.append(f"{name} {metric}: {old:.4g} -> {value:.4g} ({change:+.0%} worse)")
+    return regressions
+
+
+def save(results: dict, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -1,30 +1,208 @@
+import argparse
+import os
+import socket
+import subprocess
+import sys
 import threading
-from src.ui.training_window import TrainingProgressWindow
-from src.training.trainer import ModelTrainer
-from src.utils.logger import TrainingLogger
-from src.config.training_config import get_training_args
-
-
-def start_training(progress_window):
-    #logger = TrainingLogger(progress_window)
-    trainer = ModelTrainer(progress_window)
-    training_args = get_training_args()
-    
-    # Run training in a separate thread
+from src.utils.logger import ConsoleLogger
+from src.utils.startup import StartupTimer, import_time_report
+
+# Modules whose import cost decides how fast the window appears / training can start
+STARTUP_MODULES = ["src.ui.training_window", "src.training.trainer"]
+
+
+def launch_ranks(window, nproc):
+    """Train as nproc data-parallel processes; window only receives rank 0's reports"""
+    from src.training.distributed import DistributedLauncher
+    from src.config.training_config import DISTRIBUTED_CONFIG
+
+    return DistributedLauncher(
+        nproc,
+        window,
+        backend=DISTRIBUTED_CONFIG['backend'],
+        master_addr=DISTRIBUTED_CONFIG['master_addr'],
+        master_port=DISTRIBUTED_CONFIG['master_port'],
+        bind_cores=DISTRIBUTED_CONFIG['bind_cores']
+    ).run()
+
+
+def load_and_train(progress_window, timer, nproc=1):
+    """Import the training stack and train; runs off the UI thread so the window paints first"""
+    if nproc > 1:
+        # Ranks import the training stack themselves; this thread only relays rank 0's reports
+        launch_ranks(progress_window, nproc)
+        return
+    try:
+        with timer.phase("Loading training libraries"):
+            from src.training.trainer import ModelTrainer
+            from src.config.training_config import get_training_args
+        with timer.phase("Preparing trainer"):
+            #logger = TrainingLogger(progress_window)
+            trainer = ModelTrainer(progress_window)
+            training_args = get_training_args()
+    except Exception as e:
+        progress_window.show_error_message(f"Startup failed: {e}")
+        return
+    try:
+        trainer.train(training_args)
+    finally:
+        trainer.close()
+
+
+def start_training(progress_window, timer=None, nproc=1):
+    # Run startup and training in a separate thread
     training_thread = threading.Thread(
-        target=trainer.train,
-        args=(training_args,),
+        target=load_and_train,
+        args=(progress_window, timer or StartupTimer(progress_window.update_log), nproc),
         daemon=True
     )
     training_thread.start()
 
+
+def run_headless(log_file=None, nproc=1):
+    """Train in the foreground with a terminal/file sink; Tk and Matplotlib are never imported"""
+    sink = ConsoleLogger(log_file=log_file)
+    try:
+        if nproc > 1:
+            return launch_ranks(sink, nproc)
+        from src.training.trainer import ModelTrainer
+        from src.config.training_config import get_training_args
+
+        trainer = ModelTrainer(sink)
+        try:
+            trainer.train(get_training_args())
+        finally:
+            trainer.close()
+        # A failed run exits nonzero, as with --serve
+        return 1 if trainer.error is not None else 0
+    finally:
+        sink.close()
+
+
+def stream_address(address=None):
+    """address, or the configured one (loopback TCP where Unix sockets are unavailable)"""
+    from src.config.training_config import TRAINER_PROCESS_CONFIG
+
+    if address:
+        return address
+    if hasattr(socket, "AF_UNIX"):
+        return TRAINER_PROCESS_CONFIG['address']
+    return TRAINER_PROCESS_CONFIG['loopback_address']
+
+
+def run_server(address, log_file=None, nproc=1):
+    """Train in this process and stream every report to dashboards attached at address"""
+    from src.utils.event_stream import EventPublisher
+    from src.config.training_config import TRAINER_PROCESS_CONFIG
+
+    sink = ConsoleLogger(log_file=log_file)
+    publisher = EventPublisher(
+        address,
+        echo=sink,
+        log_tail=TRAINER_PROCESS_CONFIG['log_tail'],
+        client_buffer=TRAINER_PROCESS_CONFIG['client_buffer']
+    )
+    publisher.start()
+    try:
+        publisher.update_log("SYSTEM", f"Streaming training events on {publisher.address} (pid {os.getpid()})")
+        if nproc > 1:
+            return launch_ranks(publisher, nproc)
+        from src.training.trainer import ModelTrainer
+        from src.config.training_config import get_training_args
+
+        trainer = ModelTrainer(publisher)
+        try:
+            trainer.train(get_training_args())
+        finally:
+            trainer.close()
+        return 1 if trainer.error is not None else 0
+    finally:
+        publisher.close()
+        sink.close()
+
+
+def spawn_trainer(address, nproc, log_file):
+    """Start a trainer process that outlives the dashboard; its output is appended to log_file"""
+    directory = os.path.dirname(log_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    command = [sys.executable, os.path.abspath(__file__), "--serve", address, "--nproc", str(nproc)]
+    with open(log_file, "a") as output:
+        # A new session keeps the trainer alive when the dashboard's terminal goes away
+        return subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=output, stderr=subprocess.STDOUT,
+                                start_new_session=True)
+
+
+def attach_dashboard(progress_window, address, spawn=True, nproc=1):
+    """Follow the trainer process streaming on address; with spawn, start one if none is running"""
+    from src.utils.event_stream import EventSubscriber, is_serving
+    from src.config.training_config import TRAINER_PROCESS_CONFIG
+
+    if spawn and not is_serving(address):
+        log_file = TRAINER_PROCESS_CONFIG['log_file']
+        process = spawn_trainer(address, nproc, log_file)
+        progress_window.update_log("SYSTEM", f"Started trainer process (pid {process.pid}), output in {log_file}")
+    subscriber = EventSubscriber(address, progress_window, TRAINER_PROCESS_CONFIG['retry_interval'])
+    # Pause/Stop go to the trainer process; closing the window only detaches
+    progress_window.set_training_control(subscriber)
+    subscriber.start()
+    return subscriber
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="LLM training dashboard")
+    parser.add_argument("--headless", action="store_true", help="train without the dashboard window")
+    parser.add_argument("--log-file", help="also append log lines to this file (--headless and --serve)")
+    parser.add_argument("--watch", metavar="RUN_DIR", help="open the dashboard on an existing run log instead of training")
+    parser.add_argument("--nproc", type=int, help="train with this many data-parallel processes "
+                                                    "(default: DISTRIBUTED_CONFIG['nproc'])")
+    parser.add_argument("--serve", metavar="ADDRESS", nargs="?", const="",
+                        help="train without a window, streaming to dashboards that attach "
+                             "(default: TRAINER_PROCESS_CONFIG['address'])")
+    parser.add_argument("--attach", metavar="ADDRESS", nargs="?", const="",
+                        help="open the dashboard on a trainer started with --serve")
+    parser.add_argument("--in-process", action="store_true",
+                        help="train in a thread of the dashboard process instead of its own process")
+    parser.add_argument("--startup-report", action="store_true", help="print an import-time breakdown and exit")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    from src.config.training_config import DISTRIBUTED_CONFIG, TRAINER_PROCESS_CONFIG
+    if args.nproc is None:
+        args.nproc = DISTRIBUTED_CONFIG['nproc']
+
+    if args.startup_report:
+        print("\n".join(import_time_report(STARTUP_MODULES)))
+    elif args.headless:
+        sys.exit(run_headless(args.log_file, args.nproc))
+    elif args.serve is not None:
+        sys.exit(run_server(stream_address(args.serve), args.log_file, args.nproc))
+    else:
+        timer = StartupTimer()
+        with timer.phase("Loading dashboard"):
+            # Imported here so headless runs never load ttkbootstrap or matplotlib
+            from src.ui.training_window import TrainingProgressWindow
+
+        # Initialize the progress window
+        with timer.phase("Building window"):
+            progress_window = TrainingProgressWindow()
+        timer.log_callback = progress_window.update_log
+        for line in timer.report():
+            progress_window.update_log("STARTUP", line.strip())
+        progress_window.window.after_idle(lambda: timer.mark("First frame"))
+
+        if args.watch:
+            progress_window.watch_run(args.watch)
+        elif args.attach is not None:
+            attach_dashboard(progress_window, stream_address(args.attach), spawn=False)
+        elif TRAINER_PROCESS_CONFIG['out_of_process'] and not args.in_process:
+            # Training runs in its own process; re-opening the dashboard re-attaches to it
+            attach_dashboard(progress_window, stream_address(), nproc=args.nproc)
+        else:
+            # Train in a thread of this process; heavy libraries load in the background
+            start_training(progress_window, timer, args.nproc)
 
-    # Initialize the progress window
-    progress_window = TrainingProgressWindow()
-    
-    # Start the training process
-    start_training(progress_window)
-    
-    # Start the Tkinter event loop
-    progress_window.window.mainloop() 
\ No newline at end of file
+        # Start the Tkinter event loop
+        progress_window.window.mainloop()
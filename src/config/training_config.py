@@ -1,22 +1,201 @@
-from transformers import TrainingArguments
+# Dataset passed to datasets.load_dataset; also part of the token cache key
+DATASET_CONFIG = {
+    'path': "wikitext",
+    'name': "wikitext-103-raw-v1"
+}
+
+# Tokenization settings read by ModelTrainer.
+# strategy: "padding" pads each line to max_length, "packing" builds dense EOS-joined blocks
+# use_token_store: tokenize once into a memory-mapped uint16 cache under cache_dir
+# num_proc: tokenizer worker processes; batch_size: lines per tokenizer call;
+# writer_batch_size: rows buffered per Arrow write when use_token_store is off
+TOKENIZATION_CONFIG = {
+    'strategy': "packing",
+    'max_length': 512,
+    'use_token_store': True,
+    'cache_dir': "./cache/tokens",
+    'num_proc': 4,
+    'batch_size': 1000,
+    'writer_batch_size': 1000
+}
+
+# Streaming mode reads local text/JSONL shards and tokenizes/packs them on the fly,
+# so training starts immediately regardless of corpus size. Progress is reported
+# in steps; max_steps is used when the TrainingArguments do not set one.
+STREAMING_CONFIG = {
+    'enabled': False,
+    'train_files': "./data/train/*",
+    'eval_files': "./data/validation/*",
+    'text_field': "text",
+    'shuffle_buffer': 10000,
+    'prefetch': 64,
+    'max_steps': 10000,
+    'seed': 42
+}
+
+# Per-step metrics are appended to a columnar log under <dir>/run-<timestamp>/
+RUN_LOG_CONFIG = {
+    'dir': "./runs",
+    'flush_rows': 1024,
+    'flush_interval': 2.0,
+    'export_chunk_rows': 65536
+}
+
+# Trainer log messages are written in the background as JSON lines (time, category,
+# step, message, data) to file (rank N > 0 of a distributed run: training.rankN.jsonl),
+# rotated at max_bytes with backup_count old files kept. rate_limits caps noisy
+# categories at that many messages per second; a held-back message is replaced by the
+# next one, so only repeated progress updates (tokenization's "Processed ...") belong there
+LOGGING_CONFIG = {
+    'file': "./logs/training.jsonl",
+    'max_bytes': 10 * 1024 * 1024,
+    'backup_count': 5,
+    'rate_limits': {'Tokenization': 2.0}
+}
+
+# Pause/Stop behaviour; a checkpoint on pause lets the trainer free the model until resumed
+CONTROL_CONFIG = {
+    'checkpoint_on_pause': True,
+    'checkpoint_on_stop': False
+}
+
+# Checkpoints are snapshotted to host memory and written in the background;
+# only the newest keep_last (plus the best one, if keep_best) stay on disk
+CHECKPOINT_CONFIG = {
+    'async': True,
+    'keep_last': 3,
+    'keep_best': True
+}
+
+# Step timing: smoothing of the throughput/ETA averages, and whether to wait for
+# CUDA kernels at phase boundaries (accurate split, slightly slower steps)
+THROUGHPUT_CONFIG = {
+    'ema_alpha': 0.1,
+    'synchronize_cuda': True
+}
+
+# Evaluation runs on a fixed subset of the validation split (0 = full split);
+# token accuracy and perplexity are reduced per batch instead of buffering logits
+EVAL_CONFIG = {
+    'subset_size': 512,
+    'seed': 42,
+    'token_metrics': True
+}
+
+# CPU-only runs: physical cores are split between torch compute threads and
+# dataloader workers (worker_fraction of them, at most max_workers, and no more
+# than available memory / worker_memory_mb). bf16: True, False or "auto" (use
+# bf16 autocast only if calibration_steps timed training steps show it is faster);
+# compile: torch.compile with Inductor, where supported
+CPU_PROFILE_CONFIG = {
+    'enabled': True,
+    'worker_fraction': 0.125,
+    'max_workers': 8,
+    'worker_memory_mb': 1024,
+    'bf16': "auto",
+    'compile': False,
+    'calibration_steps': 3
+}
+
+# Before training on CPU, micro-batch sizes 1, 2, 4, ... up to max_micro_batch are
+# timed for probe_steps forward/backward passes each, stopping before the projected
+# RSS passes memory_fraction of available memory; the fastest size is used and
+# gradient accumulation is solved to keep effective_batch_size (None: the batch
+# size x accumulation steps of get_training_args). Probes are cached in cache_file
+# per model, sequence length, precision and host.
+BATCH_FINDER_CONFIG = {
+    'enabled': True,
+    'effective_batch_size': None,
+    'max_micro_batch': 16,
+    'probe_steps': 2,
+    'memory_fraction': 0.8,
+    'cache_file': "./cache/batch_size.json"
+}
+
+# Host-memory accounting on CPU: before training, the activations of one sample are
+# measured and the step's peak RSS is predicted from parameters, gradients, optimizer
+# state and activations; every step's actual peak RSS is tracked. With budget, a run
+# predicted to pass budget_mb (None: budget_fraction of this process's share of free
+# memory) first turns on gradient checkpointing ('auto'; True always, False never) and
+# then halves the micro-batch, keeping the effective batch size via accumulation.
+# Activations are measured on the longest of the first sample_rows training rows
+MEMORY_CONFIG = {
+    'enabled': True,
+    'budget': True,
+    'budget_mb': None,
+    'budget_fraction': 0.85,
+    'gradient_checkpointing': "auto",
+    'sample_rows': 8
+}
+
+# torch.profiler capture (the dashboard's Profile button, or automatically after step
+# at_step): warmup_steps unrecorded steps, then steps recorded ones. The top_ops operators
+# by self CPU time are shown and a Chrome trace is written to the run directory.
+# Nothing is profiled, and nothing costs anything, until a capture is requested
+PROFILER_CONFIG = {
+    'steps': 5,
+    'warmup_steps': 1,
+    'top_ops': 20,
+    'at_step': None,
+    'record_shapes': False,
+    'with_stack': False
+}
+
+# Data-parallel CPU training (main.py --nproc): nproc local ranks in a torch.distributed
+# process group; master_port 0 picks a free port; bind_cores pins each rank to its own
+# block of cores, filled NUMA node by node
+DISTRIBUTED_CONFIG = {
+    'nproc': 1,
+    'backend': "gloo",
+    'master_addr': "127.0.0.1",
+    'master_port': 0,
+    'bind_cores': True
+}
+
+# The dashboard starts the trainer as its own process (main.py --serve) and follows it
+# over a local socket, so plotting never competes with training for the GIL and closing
+# the window leaves the run going; opening the dashboard again re-attaches to it.
+# address: Unix socket path; loopback_address (host:port) is used where Unix sockets
+# are unavailable. A dashboard that attaches late is sent the last log_tail log lines
+# plus the current metrics and plots; one more than client_buffer events behind is
+# disconnected (and re-attaches) rather than slowing the trainer down
+TRAINER_PROCESS_CONFIG = {
+    'out_of_process': True,
+    'address': "./runs/trainer.sock",
+    'loopback_address': "127.0.0.1:7711",
+    'log_file': "./runs/trainer.log",
+    'log_tail': 1000,
+    'client_buffer': 4096,
+    'retry_interval': 0.5
+}
+
+# Dashboard system telemetry: sampling period (s), samples kept, and the
+# directory whose disk usage/IO is shown (the checkpoint output directory)
+TELEMETRY_CONFIG = {
+    'interval': 1.0,
+    'history': 600,
+    'watch_path': "./results"
+}
 
 def get_training_args():
+    # Deferred so importing the config (e.g. from the UI) does not load transformers/torch
+    from transformers import TrainingArguments
+
     return TrainingArguments(
         output_dir="./results",
         num_train_epochs=3,
-        per_device_train_batch_size=2,  # Increased for your 64GB RAM
-        per_device_eval_batch_size=2,   # Increased for evaluation
-        logging_dir='./logs',
+        per_device_train_batch_size=2,  # On CPU, re-picked by the batch-size finder (BATCH_FINDER_CONFIG)
+        per_device_eval_batch_size=2,
         logging_steps=10,               # Adjusted for CPU training pace
         logging_first_step=True,
         logging_strategy="steps",
-        evaluation_strategy="steps",
+        eval_strategy="steps",
         eval_steps=100,                 # Reduced frequency for CPU
         save_strategy="steps",
         save_steps=100,                 # Reduced frequency for CPU
         load_best_model_at_end=True,
         disable_tqdm=True,
         report_to="none",
-        dataloader_num_workers=8,       # Added to utilize i9's cores
-        gradient_accumulation_steps=4    # Added for stability
-    )    
\ No newline at end of file
+        dataloader_num_workers=8,       # On CPU, replaced by the CPU profile (CPU_PROFILE_CONFIG)
+        gradient_accumulation_steps=4    # Effective batch of 8 is kept when the finder changes the micro-batch
+    )    
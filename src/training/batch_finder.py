@@ -0,0 +1,180 @@
+import json
+import math
+import os
+import platform
+from typing import Callable, Dict, List, Optional
+
+import psutil
+
+from .cpu_profile import take_rows, time_training_step
+
+# AdamW keeps two fp32 moments per parameter; they only exist once training
+# starts, so the probe (forward/backward only) has to budget for them
+OPTIMIZER_STATES_PER_PARAM = 2
+
+
+def host_key() -> str:
+    """Identifies the machine a probe result is valid for"""
+    cores = psutil.cpu_count(logical=False) or psutil.cpu_count() or 1
+    memory_gb = round(psutil.virtual_memory().total / 2 ** 30)
+    return f"{platform.node()}-{cores}c-{memory_gb}g"
+
+
+def accumulation_for(micro_batch: int, effective_batch_size: int, world_size: int = 1) -> int:
+    """Accumulation steps that reach at least effective_batch_size across all devices"""
+    return max(1, math.ceil(effective_batch_size / (micro_batch * max(1, world_size))))
+
+
+class BatchSizeFinder:
+    """Probes micro-batch sizes on the loaded model and picks the one with the best tokens/sec.
+
+    Sizes double from 1 up to max_micro_batch. Each probe times a few
+    forward/backward passes (weights, gradients and RNG are left as found)
+    and records the process RSS at the end of the forward pass, when the
+    saved activations peak. Before the next size is tried its RSS is
+    extrapolated from the last probe; probing stops if that would pass
+    memory_fraction of the memory the run may use, or once throughput
+    falls clearly below the best size so far. The probe table is cached
+    per model, sequence length, precision, gradient checkpointing, number
+    of processes and host, so later runs only re-solve the accumulation
+    steps for the requested effective batch size.
+    """
+
+    def __init__(self, cache_file: str, max_micro_batch: int = 16, probe_steps: int = 2,
+                 memory_fraction: float = 0.8, log_callback: Optional[Callable] = None):
+        self.cache_file = cache_file
+        self.max_micro_batch = max(1, max_micro_batch)
+        self.probe_steps = probe_steps
+        self.memory_fraction = memory_fraction
+        self.log_callback = log_callback
+
+    def _log(self, message: str):
+        if self.log_callback:
+            self.log_callback("SYSTEM", message)
+
+    @staticmethod
+    def cache_key(model, max_length: int, bf16: bool, processes: int = 1, gradient_checkpointing: bool = False) -> str:
+        name = getattr(model.config, "name_or_path", "") or type(model).__name__
+        # Checkpointing and processes sharing the host change how much memory a batch size needs
+        return (f"{name}|seq{max_length}|{'bf16' if bf16 else 'fp32'}|"
+                f"{'checkpointing' if gradient_checkpointing else 'no-checkpointing'}|x{processes}|{host_key()}")
+
+    def _read_cache(self) -> Dict[str, dict]:
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_cache(self, key: str, entry: dict):
+        cache = self._read_cache()
+        cache[key] = entry
+        directory = os.path.dirname(self.cache_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.cache_file + ".tmp", "w") as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+        os.replace(self.cache_file + ".tmp", self.cache_file)
+
+    def probe(self, model, rows: list, collator, bf16: bool = False, processes: int = 1,
+              gradient_checkpointing: bool = False) -> List[dict]:
+        """Time and measure doubling micro-batch sizes; returns one dict per size that fit.
+
+        processes is the number of training processes sharing this host's
+        available memory (data-parallel ranks), each running the same batch.
+        With gradient_checkpointing the probes run with it turned on, as
+        training will.
+        """
+        process = psutil.Process()
+        baseline_mb = process.memory_info().rss / 2 ** 20
+        parameters = sum(parameter.numel() for parameter in model.parameters())
+        optimizer_mb = parameters * 4 * OPTIMIZER_STATES_PER_PARAM / 2 ** 20
+        available_mb = psutil.virtual_memory().available / 2 ** 20 / max(1, processes)
+        limit_mb = self.memory_fraction * (baseline_mb + available_mb) - optimizer_mb
+
+        peak = {"rss_mb": 0.0}
+
+        def record_rss(module, inputs, outputs):
+            peak["rss_mb"] = max(peak["rss_mb"], process.memory_info().rss / 2 ** 20)
+
+        probes = []
+        hook = model.register_forward_hook(record_rss)
+        checkpointing = gradient_checkpointing and not getattr(model, "is_gradient_checkpointing", True)
+        if checkpointing:
+            model.gradient_checkpointing_enable(gradient_checkpointing_kwargs={"use_reentrant": False})
+        try:
+            size = 1
+            while size <= min(self.max_micro_batch, len(rows)):
+                if probes:
+                    last = probes[-1]
+                    predicted = baseline_mb + (last["peak_rss_mb"] - baseline_mb) * size / last["micro_batch"]
+                    if predicted > limit_mb:
+                        self._log(f"Batch size {size}: skipped, needs ~{predicted / 1024:.1f} GB "
+                                  f"of a {limit_mb / 1024:.1f} GB budget")
+                        break
+                batch = collator(rows[:size])
+                tokens = int(batch["attention_mask"].sum()) if "attention_mask" in batch else batch["input_ids"].numel()
+                peak["rss_mb"] = 0.0
+                seconds = time_training_step(model, batch, self.probe_steps, bf16=bf16)
+                result = {
+                    "micro_batch": size,
+                    "step_seconds": seconds,
+                    "tokens_per_second": tokens / seconds,
+                    "peak_rss_mb": peak["rss_mb"],
+                }
+                if result["peak_rss_mb"] > limit_mb and probes:
+                    self._log(f"Batch size {size}: {result['peak_rss_mb'] / 1024:.1f} GB RSS is over budget")
+                    break
+                probes.append(result)
+                self._log(f"Batch size {size}: {result['tokens_per_second']:.0f} tokens/s, "
+                          f"{seconds * 1000:.0f} ms, peak RSS {result['peak_rss_mb'] / 1024:.1f} GB")
+                best = max(probe["tokens_per_second"] for probe in probes)
+                if result["tokens_per_second"] < 0.9 * best:
+                    # Past the knee: bigger batches only add memory pressure
+                    break
+                size *= 2
+        finally:
+            hook.remove()
+            if checkpointing:
+                model.gradient_checkpointing_disable()
+        return probes
+
+    @staticmethod
+    def choose(probes: List[dict], per_device_limit: int) -> dict:
+        """Fastest probed size that does not exceed the per-device share of the effective batch"""
+        allowed = [probe for probe in probes if probe["micro_batch"] <= per_device_limit] or probes[:1]
+        return max(allowed, key=lambda probe: probe["tokens_per_second"])
+
+    def find(self, model, dataset, collator, max_length: int, effective_batch_size: int,
+             bf16: bool = False, world_size: int = 1, gradient_checkpointing: bool = False) -> Optional[dict]:
+        """Micro-batch size and accumulation steps for this run, probing only on a cache miss.
+
+        world_size ranks are assumed to run on this host and share its memory.
+        """
+        key = self.cache_key(model, max_length, bf16, processes=world_size,
+                             gradient_checkpointing=gradient_checkpointing)
+        entry = self._read_cache().get(key)
+        if entry is not None:
+            self._log(f"Using cached batch-size probe for {key}")
+        else:
+            rows = take_rows(dataset, self.max_micro_batch)
+            if not rows:
+                return None
+            self._log(f"Probing micro-batch sizes up to {min(self.max_micro_batch, len(rows))}...")
+            entry = {"probes": self.probe(model, rows, collator, bf16=bf16, processes=world_size,
+                                          gradient_checkpointing=gradient_checkpointing)}
+            self._write_cache(key, entry)
+
+        per_device_limit = max(1, effective_batch_size // max(1, world_size))
+        best = self.choose(entry["probes"], per_device_limit)
+        accumulation = accumulation_for(best["micro_batch"], effective_batch_size, world_size)
+        return dict(best, gradient_accumulation_steps=accumulation,
+                    effective_batch_size=best["micro_batch"] * accumulation * max(1, world_size))
+
+    @staticmethod
+    def apply(choice: dict, training_args):
+        training_args.per_device_train_batch_size = choice["micro_batch"]
+        training_args.per_device_eval_batch_size = choice["micro_batch"]
+        training_args.gradient_accumulation_steps = choice["gradient_accumulation_steps"]
@@ -0,0 +1,189 @@
+import os
+import queue
+import random
+import re
+import shutil
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+import torch
+
+CHECKPOINT_DIR_PATTERN = re.compile(r"^checkpoint-(\d+)$")
+
+# File names Trainer reads back in resume_from_checkpoint
+OPTIMIZER_FILE = "optimizer.pt"
+SCHEDULER_FILE = "scheduler.pt"
+SCALER_FILE = "scaler.pt"
+RNG_STATE_FILE = "rng_state.pth"
+TRAINER_STATE_FILE = "trainer_state.json"
+TRAINING_ARGS_FILE = "training_args.bin"
+
+
+def to_host(obj, _copies=None):
+    """Deep-copy every tensor in a (nested) state dict to CPU memory.
+
+    Tensors that share storage (e.g. tied embeddings) stay shared in the
+    copy, so save_pretrained can still drop the tied duplicates.
+    """
+    copies = {} if _copies is None else _copies
+    if isinstance(obj, torch.Tensor):
+        key = (obj.data_ptr(), obj.dtype, tuple(obj.shape), obj.stride(), obj.device)
+        if key not in copies:
+            copies[key] = obj.detach().to("cpu", copy=True)
+        return copies[key]
+    if isinstance(obj, dict):
+        return {name: to_host(value, copies) for name, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(to_host(value, copies) for value in obj)
+    return obj
+
+
+def rng_snapshot():
+    """The RNG states Trainer restores from rng_state.pth on resume"""
+    states = {
+        "python": random.getstate(),
+        "numpy": np.random.get_state(),
+        "cpu": torch.random.get_rng_state(),
+    }
+    if torch.cuda.is_available():
+        states["cuda"] = torch.cuda.random.get_rng_state()
+    return states
+
+
+def list_checkpoints(run_dir: str):
+    """Completed checkpoint directories in run_dir as (step, path), oldest first"""
+    if not os.path.isdir(run_dir):
+        return []
+    found = []
+    for name in os.listdir(run_dir):
+        match = CHECKPOINT_DIR_PATTERN.match(name)
+        if match:
+            found.append((int(match.group(1)), os.path.join(run_dir, name)))
+    return sorted(found)
+
+
+def rotate_checkpoints(run_dir: str, keep_last: int, best_checkpoint: Optional[str] = None):
+    """Delete all but the newest keep_last checkpoints, always keeping best_checkpoint"""
+    if not keep_last or keep_last <= 0:
+        return []
+    checkpoints = list_checkpoints(run_dir)
+    keep = {path for _, path in checkpoints[-keep_last:]}
+    if best_checkpoint:
+        keep.add(os.path.join(run_dir, os.path.basename(os.path.normpath(best_checkpoint))))
+    removed = []
+    for _, path in checkpoints:
+        if path not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(path)
+    return removed
+
+
+class CheckpointSnapshot:
+    """Host-memory copy of everything a checkpoint directory contains"""
+
+    def __init__(self, run_dir, output_dir, model, model_state, optimizer_state, scheduler_state,
+                 scaler_state, rng_state, trainer_state_json, training_args, best_checkpoint=None):
+        self.run_dir = run_dir
+        self.output_dir = output_dir
+        self.model = model
+        self.model_state = model_state
+        self.optimizer_state = optimizer_state
+        self.scheduler_state = scheduler_state
+        self.scaler_state = scaler_state
+        self.rng_state = rng_state
+        self.trainer_state_json = trainer_state_json
+        self.training_args = training_args
+        self.best_checkpoint = best_checkpoint
+        self.snapshot_time = 0.0
+
+
+class AsyncCheckpointWriter:
+    """Serializes checkpoint snapshots on a background thread.
+
+    The training loop only pays for the copy to host memory; weights are
+    written as safetensors through save_pretrained and the rest in Trainer's
+    own file layout, so resume_from_checkpoint works unchanged. Each
+    checkpoint is written to "<dir>.tmp" and renamed when complete, then
+    older ones are rotated (keep_last, plus the best one when keep_best).
+    At most one snapshot waits behind the one being written, which bounds
+    the extra host memory.
+    """
+
+    def __init__(self, keep_last: int = 3, keep_best: bool = True, log_callback=None):
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        self.log_callback = log_callback
+        self._queue = queue.Queue(maxsize=1)
+        self._error = None
+        self.submitted = set()
+        self.written = []
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def _log(self, message: str):
+        if self.log_callback:
+            self.log_callback("CHECKPOINT", message)
+
+    def _raise_pending_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Background checkpoint write failed") from error
+
+    def submit(self, snapshot: CheckpointSnapshot):
+        self._raise_pending_error()
+        self.submitted.add(snapshot.output_dir)
+        self._queue.put(snapshot)
+
+    def wait(self):
+        """Block until every submitted checkpoint is on disk"""
+        self._queue.join()
+        self._raise_pending_error()
+
+    def close(self):
+        self.wait()
+        self._queue.put(None)
+        self._thread.join()
+
+    def _write_loop(self):
+        while True:
+            snapshot = self._queue.get()
+            try:
+                if snapshot is None:
+                    return
+                start = time.perf_counter()
+                self.write(snapshot)
+                self.written.append(snapshot.output_dir)
+                self._log(
+                    f"Saved {os.path.basename(snapshot.output_dir)} in {time.perf_counter() - start:.2f}s "
+                    f"(training paused {snapshot.snapshot_time * 1000:.0f} ms for the snapshot)"
+                )
+            except Exception as e:
+                shutil.rmtree(snapshot.output_dir + ".tmp", ignore_errors=True)
+                self._error = e
+                self._log(f"Writing {snapshot.output_dir} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def write(self, snapshot: CheckpointSnapshot):
+        tmp_dir = snapshot.output_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        snapshot.model.save_pretrained(tmp_dir, state_dict=snapshot.model_state)
+        for state, name in ((snapshot.optimizer_state, OPTIMIZER_FILE), (snapshot.scheduler_state, SCHEDULER_FILE),
+                            (snapshot.scaler_state, SCALER_FILE), (snapshot.rng_state, RNG_STATE_FILE)):
+            if state is not None:
+                torch.save(state, os.path.join(tmp_dir, name))
+        torch.save(snapshot.training_args, os.path.join(tmp_dir, TRAINING_ARGS_FILE))
+        # trainer_state.json last: its presence marks a resumable checkpoint
+        with open(os.path.join(tmp_dir, TRAINER_STATE_FILE), "w", encoding="utf-8") as f:
+            f.write(snapshot.trainer_state_json)
+
+        shutil.rmtree(snapshot.output_dir, ignore_errors=True)
+        os.replace(tmp_dir, snapshot.output_dir)
+
+        best = snapshot.best_checkpoint if self.keep_best else None
+        for path in rotate_checkpoints(snapshot.run_dir, self.keep_last, best):
+            self._log(f"Removed old checkpoint {os.path.basename(path)}")
@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+
+from transformers import TrainerCallback
+from transformers.trainer_utils import PREFIX_CHECKPOINT_DIR
+
+
+class TrainingControl:
+    """Pause/resume/stop (and profile) requests shared between the UI and the training thread.
+
+    The UI only flips flags; the trainer acts on them at the next optimizer
+    step boundary (see ControlCallback), so no state is torn mid-step.
+    """
+
+    def __init__(self):
+        self._running = threading.Event()
+        self._running.set()
+        self.paused = False
+        self.stop_requested = False
+        self.profile_requested = False
+
+    def pause(self):
+        self.paused = True
+        self._running.clear()
+
+    def resume(self):
+        self.paused = False
+        self._running.set()
+
+    def stop(self):
+        self.stop_requested = True
+        # Wake a trainer that is blocked in a pause so it can exit
+        self._running.set()
+
+    def request_profile(self):
+        """Ask for a profiler capture starting at the next step (see ProfilerCallback)"""
+        self.profile_requested = True
+
+    def take_profile_request(self) -> bool:
+        if not self.profile_requested:
+            return False
+        self.profile_requested = False
+        return True
+
+    def wait_until_resumed(self, timeout: float = None) -> bool:
+        """Block while paused; returns False if training should stop instead"""
+        self._running.wait(timeout)
+        return not self.stop_requested
+
+
+class ControlCallback(TrainerCallback):
+    """Applies TrainingControl requests between optimizer steps.
+
+    Stop ends training after the current step. Pause either blocks the
+    training thread in place or, with checkpoint_on_pause, saves a checkpoint
+    and leaves the training loop so the caller can free the model and
+    optimizer and resume from that checkpoint later.
+    """
+
+    def __init__(self, training_control: TrainingControl, log=None,
+                 checkpoint_on_pause: bool = True, checkpoint_on_stop: bool = False):
+        self.training_control = training_control
+        self.log = log or (lambda category, message: None)
+        self.checkpoint_on_pause = checkpoint_on_pause
+        self.checkpoint_on_stop = checkpoint_on_stop
+        self._saving_for_pause = False
+        self.released_checkpoint = None
+
+    def take_released_checkpoint(self):
+        """Checkpoint the loop exited on for a pause (None if it ended for any other reason)"""
+        checkpoint, self.released_checkpoint = self.released_checkpoint, None
+        return checkpoint
+
+    def on_step_end(self, args, state, control, **kwargs):
+        if self.training_control.stop_requested:
+            self.log("SYSTEM", f"Stopping at step {state.global_step}")
+            control.should_training_stop = True
+            control.should_save = control.should_save or self.checkpoint_on_stop
+            return
+        if not self.training_control.paused:
+            return
+
+        if self.checkpoint_on_pause:
+            # The loop exits in on_save, once the checkpoint is on disk
+            self._saving_for_pause = True
+            control.should_save = True
+            return
+
+        self.log("SYSTEM", f"Paused at step {state.global_step}")
+        start = time.perf_counter()
+        if self.training_control.wait_until_resumed():
+            self.log("SYSTEM", f"Resumed after {time.perf_counter() - start:.0f}s")
+        else:
+            control.should_training_stop = True
+
+    def on_save(self, args, state, control, **kwargs):
+        if self._saving_for_pause:
+            self._saving_for_pause = False
+            self.released_checkpoint = os.path.join(args.output_dir, f"{PREFIX_CHECKPOINT_DIR}-{state.global_step}")
+            control.should_training_stop = True
@@ -0,0 +1,166 @@
+import itertools
+import os
+import shutil
+import time
+from typing import Dict, List, Optional
+
+import psutil
+import torch
+
+
+def _usable_cpus() -> int:
+    """Logical CPUs this process may run on (cgroup/taskset limits included where visible)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return psutil.cpu_count() or 1
+
+
+def _bf16_supported() -> bool:
+    """Native bf16 kernels (AVX512-BF16/AMX); elsewhere bf16 autocast is emulated and slower"""
+    try:
+        return torch.backends.mkldnn.is_available() and bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        return False
+
+
+def _compile_supported() -> bool:
+    """TorchDynamo works on this platform and Inductor has a C++ compiler for CPU kernels"""
+    try:
+        import torch._dynamo
+        dynamo = torch._dynamo.is_dynamo_supported()
+    except Exception:
+        return False
+    compiler = os.environ.get("CXX") or shutil.which("g++") or shutil.which("c++") or shutil.which("clang++")
+    return bool(dynamo and compiler)
+
+
+def detect_hardware() -> Dict[str, object]:
+    logical = psutil.cpu_count() or 1
+    usable = _usable_cpus()
+    physical = psutil.cpu_count(logical=False) or logical
+    # SMT siblings share execution units, so count at most one thread per physical core
+    # (scaled down when the process is restricted to a subset of the CPUs)
+    cores = max(1, min(physical, round(physical * usable / logical)))
+    return {
+        "physical_cores": physical,
+        "logical_cores": logical,
+        "usable_cores": cores,
+        "available_memory_mb": psutil.virtual_memory().available / 2 ** 20,
+        "bf16": _bf16_supported(),
+        "compile": _compile_supported(),
+    }
+
+
+class CPUProfile:
+    """How the CPU is split between compute threads and dataloader workers, plus precision/compile choices.
+
+    Each dataloader worker is a process that runs single-threaded, so it takes
+    a core away from torch's intra-op pool; sizing both from the same core
+    count keeps them from oversubscribing the machine.
+    """
+
+    def __init__(self, compute_threads: int, interop_threads: int, workers: int,
+                 bf16: bool = False, compile: bool = False):
+        self.compute_threads = compute_threads
+        self.interop_threads = interop_threads
+        self.workers = workers
+        self.bf16 = bf16
+        self.compile = compile
+        # Filled in by calibration: precision -> measured seconds per training step
+        self.step_times: Dict[str, float] = {}
+
+    @classmethod
+    def plan(cls, hardware: Dict[str, object], worker_fraction: float = 0.125, max_workers: int = 8,
+             worker_memory_mb: float = 1024):
+        cores = hardware["usable_cores"]
+        workers = min(round(cores * worker_fraction), max_workers, cores - 1)
+        # Each worker holds its own copy of the dataset iterator and prefetched batches
+        workers = max(0, min(workers, int(hardware["available_memory_mb"] // max(worker_memory_mb, 1))))
+        compute_threads = max(1, cores - workers)
+        return cls(compute_threads, interop_threads=1 if compute_threads < 8 else 2, workers=workers)
+
+    def apply(self, training_args):
+        """Set torch's thread pools and update training_args in place (after TrainingArguments.__post_init__)"""
+        torch.set_num_threads(self.compute_threads)
+        try:
+            torch.set_num_interop_threads(self.interop_threads)
+        except RuntimeError:
+            # Only allowed before the first inter-op parallel work in the process
+            pass
+
+        training_args.dataloader_num_workers = self.workers
+        training_args.dataloader_persistent_workers = self.workers > 0
+        # Pinned memory only speeds up host-to-GPU copies
+        training_args.dataloader_pin_memory = False
+        if self.bf16:
+            training_args.bf16 = True
+            training_args.use_cpu = True
+            # Derived in __post_init__, which has already run
+            training_args.mixed_precision = "bf16"
+        if self.compile:
+            training_args.torch_compile = True
+            training_args.torch_compile_backend = training_args.torch_compile_backend or "inductor"
+
+    def describe(self, samples_per_step: int) -> List[str]:
+        lines = [
+            f"Compute threads: {self.compute_threads} intra-op, {self.interop_threads} inter-op",
+            f"Dataloader workers: {self.workers}" + (" (batches are built in the training process)"
+                                                     if not self.workers else ""),
+        ]
+        for precision, seconds in self.step_times.items():
+            chosen = " (chosen)" if (precision == "bf16") == self.bf16 else ""
+            lines.append(f"{precision}: {seconds * 1000:.0f} ms per batch of {samples_per_step}, "
+                         f"{samples_per_step / seconds:.1f} samples/s{chosen}")
+        if not self.step_times:
+            lines.append(f"Precision: {'bf16 autocast' if self.bf16 else 'fp32'}")
+        lines.append(f"torch.compile: {'on (first steps include compilation)' if self.compile else 'off'}")
+        return lines
+
+
+def take_rows(dataset, count: int) -> list:
+    """The first count rows of a map-style or iterable dataset"""
+    if hasattr(dataset, "__len__"):
+        return [dataset[index] for index in range(min(count, len(dataset)))]
+    blocks = iter(dataset)
+    try:
+        return list(itertools.islice(blocks, count))
+    finally:
+        # Stops a streaming dataset's prefetch thread
+        getattr(blocks, "close", lambda: None)()
+
+
+def first_batch(dataset, batch_size: int, collator) -> Optional[dict]:
+    """One collated training batch from the start of a map-style or iterable dataset"""
+    rows = take_rows(dataset, batch_size)
+    return collator(rows) if rows else None
+
+
+def time_training_step(model, batch: dict, steps: int, bf16: bool = False) -> float:
+    """Median seconds per forward/backward pass over batch; leaves weights, gradients and RNG as found"""
+    rng_state = torch.get_rng_state()
+    was_training = model.training
+    model.train()
+    times = []
+    try:
+        # One extra pass first: allocator and oneDNN kernel selection warm up on it
+        for _ in range(steps + 1):
+            start = time.perf_counter()
+            with torch.autocast("cpu", dtype=torch.bfloat16, enabled=bf16):
+                loss = model(**batch).loss
+            loss.backward()
+            times.append(time.perf_counter() - start)
+            model.zero_grad(set_to_none=True)
+    finally:
+        model.zero_grad(set_to_none=True)
+        model.train(was_training)
+        torch.set_rng_state(rng_state)
+    times = sorted(times[1:])
+    return times[len(times) // 2]
+
+
+def calibrate_precision(profile: CPUProfile, model, batch: dict, steps: int, bf16: str):
+    """Measure fp32 and, when allowed, bf16 autocast steps; bf16="auto" keeps it only if it is faster"""
+    profile.step_times["fp32"] = time_training_step(model, batch, steps)
+    if bf16:
+        profile.step_times["bf16"] = time_training_step(model, batch, steps, bf16=True)
+        profile.bf16 = bf16 != "auto" or profile.step_times["bf16"] < profile.step_times["fp32"]
@@ -0,0 +1,380 @@
+import glob
+import multiprocessing
+import os
+import socket
+import threading
+import traceback
+from typing import Dict, List, Optional, Sequence
+
+import torch
+import torch.distributed as dist
+from transformers import TrainerCallback
+
+from .control import TrainingControl
+from .throughput import STEP_PHASES
+from ..utils.event_stream import WINDOW_METHODS, SeriesPoints, SeriesRebuilder
+from ..utils.metric_series import MetricSeries
+
+# Window methods a rank-0 trainer may call; the rest of the window stays in the launching process
+FORWARDED_METHODS = WINDOW_METHODS
+# Other ranks only surface problems
+RANK_LOG_CATEGORIES = ("ERROR", "WARNING")
+
+
+def free_port(address: str = "127.0.0.1") -> int:
+    with socket.socket() as sock:
+        sock.bind((address, 0))
+        return sock.getsockname()[1]
+
+
+def parse_cpulist(text: str) -> List[int]:
+    """Expand a sysfs cpulist such as "0-3,8,10-11" """
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def _read_int(path: str, default: int = 0) -> int:
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return default
+
+
+def ordered_cpus() -> List[int]:
+    """Usable CPUs ordered by NUMA node, then socket and physical core.
+
+    Hyperthread siblings end up next to each other, so contiguous slices
+    of this list map to whole cores on a single node wherever possible.
+    """
+    usable = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    node_of = {}
+    for node_dir in glob.glob("/sys/devices/system/node/node[0-9]*"):
+        node = int(os.path.basename(node_dir)[4:])
+        try:
+            with open(os.path.join(node_dir, "cpulist")) as f:
+                for cpu in parse_cpulist(f.read()):
+                    node_of[cpu] = node
+        except OSError:
+            continue
+
+    def position(cpu):
+        topology = f"/sys/devices/system/cpu/cpu{cpu}/topology"
+        return (node_of.get(cpu, 0), _read_int(f"{topology}/physical_package_id"),
+                _read_int(f"{topology}/core_id", cpu), cpu)
+
+    return sorted(usable, key=position)
+
+
+def rank_cpus(rank: int, world_size: int, cpus: Sequence[int]) -> Optional[List[int]]:
+    """This rank's contiguous share of cpus, or None when there are fewer CPUs than ranks"""
+    if len(cpus) < world_size:
+        return None
+    return list(cpus[rank * len(cpus) // world_size:(rank + 1) * len(cpus) // world_size])
+
+
+def get_rank() -> int:
+    return dist.get_rank() if dist.is_available() and dist.is_initialized() else 0
+
+
+def get_world_size() -> int:
+    return dist.get_world_size() if dist.is_available() and dist.is_initialized() else 1
+
+
+def broadcast_object(obj, src: int = 0):
+    """obj from rank src on every rank; a no-op outside a process group"""
+    if get_world_size() == 1:
+        return obj
+    holder = [obj]
+    dist.broadcast_object_list(holder, src=src)
+    return holder[0]
+
+
+def gather_step_stats(stats: Dict[str, float]) -> Dict[str, float]:
+    """Combine one optimizer step's StepTimer stats across ranks.
+
+    Samples and tokens are summed (global throughput), wall time is the
+    slowest rank's and phase times are averaged. Gradient all-reduce makes
+    every rank's wall time equal, so each rank's own busy time (CPU time
+    over its compute threads, capped at the wall time) is kept as
+    rank<N>_step_time: a straggler is the rank that is busy the longest.
+    """
+    busy = min(stats["wall"], stats.get("cpu", stats["wall"]) / torch.get_num_threads())
+    keys = ("wall", "samples", "tokens") + STEP_PHASES
+    local = torch.tensor([stats[key] for key in keys] + [busy], dtype=torch.float64)
+    gathered = [torch.zeros_like(local) for _ in range(dist.get_world_size())]
+    dist.all_gather(gathered, local)
+    table = torch.stack(gathered)
+
+    merged = {key: float(table[:, index].mean()) for index, key in enumerate(keys)}
+    merged["wall"] = float(table[:, 0].max())
+    merged["samples"] = float(table[:, 1].sum())
+    merged["tokens"] = float(table[:, 2].sum())
+    for rank, value in enumerate(table[:, -1].tolist()):
+        merged[f"rank{rank}_step_time"] = value
+    return merged
+
+
+class ProcessTrainingControl(TrainingControl):
+    """TrainingControl whose state lives in shared memory, for trainers running in child processes"""
+
+    def __init__(self, context=None):
+        context = context or multiprocessing.get_context("spawn")
+        self._running = context.Event()
+        self._running.set()
+        self._flags = context.Array("b", 3)  # paused, stop_requested, profile_requested
+
+    @property
+    def paused(self):
+        return bool(self._flags[0])
+
+    @paused.setter
+    def paused(self, value):
+        self._flags[0] = int(value)
+
+    @property
+    def stop_requested(self):
+        return bool(self._flags[1])
+
+    @stop_requested.setter
+    def stop_requested(self, value):
+        self._flags[1] = int(value)
+
+    @property
+    def profile_requested(self):
+        return bool(self._flags[2])
+
+    @profile_requested.setter
+    def profile_requested(self, value):
+        self._flags[2] = int(value)
+
+
+class RankControl(TrainingControl):
+    """One rank's view of a ProcessTrainingControl that all ranks agree on.
+
+    Every rank has to pause or stop after the same step; a rank leaving the
+    training loop alone would leave the others blocked in a collective. So
+    the flags are only read on rank 0 and broadcast in sync(), which
+    ControlSyncCallback calls at every step end before ControlCallback.
+    """
+
+    def __init__(self, shared: ProcessTrainingControl):
+        super().__init__()
+        self.shared = shared
+
+    def sync(self):
+        flags = torch.tensor([self.shared.paused, self.shared.stop_requested], dtype=torch.uint8)
+        dist.broadcast(flags, src=0)
+        self.paused, self.stop_requested = bool(flags[0]), bool(flags[1])
+
+    def take_profile_request(self) -> bool:
+        # Only rank 0 profiles, so the request is not broadcast
+        return self.shared.take_profile_request()
+
+    def wait_until_resumed(self, timeout: float = None) -> bool:
+        self.shared.wait_until_resumed(timeout)
+        # Collective: every rank waits here, so all of them see the same resume/stop decision
+        self.sync()
+        return not self.stop_requested
+
+
+class ControlSyncCallback(TrainerCallback):
+    """Agrees on pause/stop across ranks; must come before ControlCallback"""
+
+    def __init__(self, rank_control: RankControl):
+        self.rank_control = rank_control
+
+    def on_step_end(self, args, state, control, **kwargs):
+        self.rank_control.sync()
+
+
+class RemoteWindow:
+    """Window stand-in inside a rank process: forwards the trainer's UI calls over a queue.
+
+    Only the methods listed are present (so the trainer's hasattr() checks
+    see what the real window supports). MetricSeries arguments are sent as
+    SeriesPoints holding the points appended since the last call, the same
+    increments an EventPublisher streams, and rebuilt by WindowPump, so
+    a plot update costs the same at step 10 and step 1,000,000. Other ranks
+    only forward log lines in log_categories, tagged with their rank.
+    """
+
+    def __init__(self, events, methods: Sequence[str], rank: int = 0, log_categories: Sequence[str] = None):
+        self._events = events
+        self._methods = set(methods)
+        self._rank = rank
+        self._log_categories = log_categories
+        self._sent = {}
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name not in self._methods:
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self._forward(name, args, kwargs)
+
+    def _encode(self, value):
+        if not isinstance(value, MetricSeries):
+            return value
+        start = self._sent.get(value.name, 0)
+        points = SeriesPoints.since(value, start)
+        self._sent[value.name] = start + len(points.values)
+        return points
+
+    def _forward(self, name, args, kwargs):
+        if self._rank and name != "update_log":
+            return
+        if name == "update_log":
+            category, message = args
+            if self._log_categories is not None and category not in self._log_categories:
+                return
+            if self._rank:
+                args = (category, f"[rank {self._rank}] {message}")
+        self._events.put((name, tuple(self._encode(arg) for arg in args),
+                          {key: self._encode(value) for key, value in kwargs.items()}))
+
+
+class WindowPump:
+    """Applies calls sent by RemoteWindow to the real window (or sink) in this process"""
+
+    def __init__(self, target, events):
+        self.target = target
+        self.events = events
+        self._series = SeriesRebuilder()
+        self._thread = None
+
+    def run(self):
+        while True:
+            item = self.events.get()
+            if item is None:
+                return
+            name, args, kwargs = item
+            try:
+                getattr(self.target, name)(*[self._series.decode(arg) for arg in args],
+                                           **{key: self._series.decode(value) for key, value in kwargs.items()})
+            except Exception:
+                # A closed window must not stop the pump, or rank 0 blocks on a full queue
+                traceback.print_exc()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.events.put(None)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def _run_rank(rank: int, world_size: int, master_addr: str, master_port: int, backend: str,
+              cpus: Optional[List[int]], events, methods, control: ProcessTrainingControl):
+    """Entry point of one spawned training process"""
+    os.environ.update({
+        "MASTER_ADDR": master_addr,
+        "MASTER_PORT": str(master_port),
+        "RANK": str(rank),
+        "LOCAL_RANK": str(rank),
+        "WORLD_SIZE": str(world_size),
+        "LOCAL_WORLD_SIZE": str(world_size),
+        # Makes TrainingArguments set up multi-CPU data parallelism on the existing process group
+        "ACCELERATE_USE_CPU": "true",
+    })
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+
+    window = RemoteWindow(events, methods if rank == 0 else ("update_log", "update_progress"), rank,
+                          log_categories=None if rank == 0 else RANK_LOG_CATEGORIES)
+    failed = True
+    try:
+        dist.init_process_group(backend, rank=rank, world_size=world_size)
+        from .trainer import ModelTrainer
+        from ..config.training_config import get_training_args
+
+        trainer = ModelTrainer(window, control=RankControl(control))
+        try:
+            trainer.train(get_training_args())
+        finally:
+            trainer.close()
+        failed = trainer.error is not None
+    except Exception as e:
+        window.update_log("ERROR", f"Rank {rank} failed: {e}\n{traceback.format_exc()}")
+    finally:
+        if dist.is_initialized():
+            dist.destroy_process_group()
+    raise SystemExit(1 if failed else 0)
+
+
+class DistributedLauncher:
+    """Runs ModelTrainer as nproc data-parallel processes on this machine.
+
+    Ranks are spawned processes joined in a torch.distributed process group
+    (gloo by default). With bind_cores each rank is pinned to its own
+    contiguous block of cores, NUMA node by node, so ranks do not share
+    cores and each allocates memory on its own node. Only rank 0 reports to
+    the window: its calls arrive through a queue and are applied here by a
+    WindowPump. Pause/Stop reach every rank through a ProcessTrainingControl.
+    If one rank fails the others are terminated, since they would otherwise
+    wait in a collective until the process group times out.
+    """
+
+    def __init__(self, nproc: int, window, backend: str = "gloo", master_addr: str = "127.0.0.1",
+                 master_port: int = 0, bind_cores: bool = True):
+        self.nproc = nproc
+        self.window = window
+        self.backend = backend
+        self.master_addr = master_addr
+        self.master_port = master_port or free_port(master_addr)
+        self.bind_cores = bind_cores
+        self.context = multiprocessing.get_context("spawn")
+        self.control = ProcessTrainingControl(self.context)
+        self.processes = []
+
+    def _log(self, category: str, message: str):
+        self.window.update_log(category, message)
+
+    def run(self) -> int:
+        """Train to completion; returns 0, or 1 if any rank failed"""
+        if hasattr(self.window, "set_training_control"):
+            self.window.set_training_control(self.control)
+        events = self.context.Queue()
+        pump = WindowPump(self.window, events)
+        pump.start()
+        methods = [name for name in FORWARDED_METHODS if hasattr(self.window, name)]
+        cpus = ordered_cpus() if self.bind_cores else []
+
+        for rank in range(self.nproc):
+            assigned = rank_cpus(rank, self.nproc, cpus) if self.bind_cores else None
+            process = self.context.Process(
+                target=_run_rank,
+                args=(rank, self.nproc, self.master_addr, self.master_port, self.backend, assigned,
+                      events, methods, self.control),
+                name=f"trainer-rank{rank}"
+            )
+            process.start()
+            self.processes.append(process)
+            where = f"CPUs {assigned[0]}-{assigned[-1]}" if assigned else "unpinned"
+            self._log("SYSTEM", f"Started rank {rank}/{self.nproc} (pid {process.pid}, {where})")
+
+        failed = self._wait()
+        pump.stop()
+        return 1 if failed else 0
+
+    def _wait(self) -> bool:
+        failed = False
+        remaining = list(self.processes)
+        while remaining:
+            for process in list(remaining):
+                process.join(timeout=0.5)
+                if process.exitcode is None:
+                    continue
+                remaining.remove(process)
+                if process.exitcode != 0 and not failed:
+                    failed = True
+                    self._log("ERROR", f"{process.name} exited with code {process.exitcode}; stopping the other ranks")
+                    for other in remaining:
+                        other.terminate()
+        return failed
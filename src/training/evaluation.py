@@ -0,0 +1,79 @@
+import itertools
+import math
+import random
+
+import torch
+from datasets import Dataset
+
+
+def eval_subset(dataset, size: int, seed: int = 42):
+    """A fixed, in-memory slice of the validation set, built once per run.
+
+    Map-style datasets get `size` rows drawn with `seed` (kept in original
+    order); streaming datasets contribute their first `size` blocks. A size
+    of 0 (or one at least the dataset length) keeps the full split.
+    """
+    if dataset is None or not size:
+        return dataset
+    if hasattr(dataset, "__len__"):
+        if size >= len(dataset):
+            return dataset
+        indices = sorted(random.Random(seed).sample(range(len(dataset)), size))
+        if isinstance(dataset, Dataset):
+            # flatten_indices copies the rows so every evaluation reads them contiguously
+            return dataset.select(indices).flatten_indices()
+        # e.g. a token store's memory-mapped split: keep the decoded rows
+        return [dataset[index] for index in indices]
+
+    blocks = iter(dataset)
+    try:
+        return list(itertools.islice(blocks, size))
+    finally:
+        # Stops the streaming dataset's prefetch thread
+        getattr(blocks, "close", lambda: None)()
+
+
+class TokenMetrics:
+    """Next-token accuracy and perplexity, reduced batch by batch during evaluation.
+
+    preprocess_logits() turns each batch's (batch, seq, vocab) logits into
+    three numbers per row on the device (correct predictions, counted tokens,
+    summed negative log-likelihood), so neither logits nor predictions are
+    kept. Rows stay the leading dimension so the Trainer's gather can drop the
+    duplicate samples padded onto the last batch in distributed runs.
+    With TrainingArguments(batch_eval_metrics=True) the Trainer hands every
+    batch to __call__, which accumulates them and reports at the last batch.
+    Positions labelled -100 (padding) are not counted.
+    """
+
+    def __init__(self):
+        self._totals = None
+
+    @staticmethod
+    def preprocess_logits(logits, labels):
+        if isinstance(logits, tuple):
+            logits = logits[0]
+        # The prediction at position t is for the token at t + 1
+        logits = logits[:, :-1].float()
+        targets = labels[:, 1:]
+        mask = targets != -100
+        safe_targets = targets.masked_fill(~mask, 0)
+        nll = torch.nn.functional.cross_entropy(logits.transpose(1, 2), safe_targets, reduction="none")
+        correct = (logits.argmax(dim=-1) == targets) & mask
+        return torch.stack([
+            correct.sum(dim=1).double(),
+            mask.sum(dim=1).double(),
+            nll.masked_fill(~mask, 0.0).sum(dim=1).double()
+        ], dim=1)
+
+    def __call__(self, eval_prediction, compute_result: bool = True):
+        batch = torch.as_tensor(eval_prediction.predictions).reshape(-1, 3).sum(dim=0)
+        self._totals = batch if self._totals is None else self._totals + batch.to(self._totals.device)
+        if not compute_result:
+            return {}
+
+        correct, tokens, nll = self._totals.tolist()
+        self._totals = None
+        if not tokens:
+            return {}
+        return {"accuracy": correct / tokens, "perplexity": math.exp(min(nll / tokens, 700.0))}
@@ -0,0 +1,263 @@
+import re
+import threading
+import time
+from typing import Optional
+
+import psutil
+import torch
+from transformers import TrainerCallback
+
+from .batch_finder import OPTIMIZER_STATES_PER_PARAM, accumulation_for
+
+MB = 2 ** 20
+# Kernel-tracked peak RSS (VmHWM); writing 5 to clear_refs resets it to the current RSS
+_STATUS_FILE = "/proc/self/status"
+_CLEAR_REFS_FILE = "/proc/self/clear_refs"
+
+
+def transformer_blocks(model):
+    """The repeated transformer blocks of a GPT-2 style model (model.transformer.h), or None"""
+    return getattr(getattr(model, "transformer", None), "h", None)
+
+
+def dataset_bytes(dataset) -> Optional[int]:
+    """Bytes a tokenized training split occupies (memory-mapped, so it lives in the page cache)"""
+    if hasattr(dataset, "num_tokens") and hasattr(dataset, "offsets"):
+        # TokenStore split
+        return dataset.num_tokens * dataset.dtype.itemsize + dataset.offsets.nbytes
+    data = getattr(dataset, "data", None)
+    if hasattr(data, "nbytes"):
+        # datasets.Dataset: an Arrow table
+        return int(data.nbytes)
+    return None
+
+
+def measure_activations(model, batch: dict, bf16: bool = False) -> dict:
+    """Bytes autograd saves for backward during one training forward pass over batch.
+
+    Every tensor saved for backward passes through a saved_tensors_hooks pack
+    hook; each storage is counted once and parameters are left out. Saves
+    are attributed to the transformer block running at the time, and each
+    block's input (what gradient checkpointing keeps instead) is recorded.
+    Weights, gradients and RNG are left as found.
+    """
+    parameters = {parameter.untyped_storage().data_ptr() for parameter in model.parameters()}
+    blocks = transformer_blocks(model) or []
+    per_block = [0] * len(blocks)
+    block_inputs = [0] * len(blocks)
+    seen = set()
+    current = [None]
+    total = [0]
+
+    def pack(tensor):
+        storage = tensor.untyped_storage()
+        pointer = storage.data_ptr()
+        if pointer not in parameters and pointer not in seen:
+            seen.add(pointer)
+            total[0] += storage.nbytes()
+            if current[0] is not None:
+                per_block[current[0]] += storage.nbytes()
+        return tensor
+
+    def enter(index):
+        def hook(module, args):
+            current[0] = index
+            if args and torch.is_tensor(args[0]):
+                block_inputs[index] = args[0].nelement() * args[0].element_size()
+        return hook
+
+    def leave(module, args, output):
+        current[0] = None
+
+    handles = []
+    for index, block in enumerate(blocks):
+        handles.append(block.register_forward_pre_hook(enter(index)))
+        handles.append(block.register_forward_hook(leave))
+    rng_state = torch.get_rng_state()
+    was_training = model.training
+    model.train()
+    try:
+        with torch.autograd.graph.saved_tensors_hooks(pack, lambda tensor: tensor), \
+                torch.autocast("cpu", dtype=torch.bfloat16, enabled=bf16):
+            output = model(**batch)
+        del output
+    finally:
+        for handle in handles:
+            handle.remove()
+        model.train(was_training)
+        torch.set_rng_state(rng_state)
+    return {"total": total[0], "blocks": per_block, "block_inputs": block_inputs}
+
+
+def activation_bytes(measured: dict, checkpointing: bool) -> int:
+    """Peak activation bytes of a training step, with or without gradient checkpointing.
+
+    With checkpointing only each block's input is kept through the forward
+    pass, and a block's own activations come back one at a time while
+    backward recomputes it. Either way, backward needs scratch space for the
+    gradients flowing through the largest segment (a block, or the embedding
+    and LM head outside them); about twice its saved activations matches
+    measured peaks within some 10%.
+    """
+    outside_blocks = measured["total"] - sum(measured["blocks"])
+    workspace = 2 * max(measured["blocks"] + [outside_blocks])
+    if not checkpointing or not measured["blocks"]:
+        return measured["total"] + workspace
+    return outside_blocks + sum(measured["block_inputs"]) + max(measured["blocks"]) + workspace
+
+
+class MemoryEstimate:
+    """What training costs in host memory, split into its parts (all in MB).
+
+    Parameters, gradients and optimizer state come from the model (fp32
+    gradients and OPTIMIZER_STATES_PER_PARAM AdamW moments per trainable
+    parameter). Activations are measured per sample by measure_activations
+    and scale with the micro-batch. The dataset is memory-mapped and can be
+    evicted, so it is shown but not counted against the budget. Everything
+    else already resident (runtime, libraries, buffers) is the baseline.
+    """
+
+    def __init__(self, model, sample_batch: dict, dataset_size: Optional[int] = None, bf16: bool = False):
+        self.parameters_mb = sum(p.numel() * p.element_size() for p in model.parameters()) / MB
+        trainable = sum(p.numel() for p in model.parameters() if p.requires_grad)
+        self.gradients_mb = trainable * 4 / MB
+        self.optimizer_mb = trainable * 4 * OPTIMIZER_STATES_PER_PARAM / MB
+        self.dataset_mb = dataset_size / MB if dataset_size is not None else None
+        samples = max(1, sample_batch["input_ids"].shape[0])
+        measured = measure_activations(model, sample_batch, bf16=bf16)
+        self.checkpointing_supported = bool(measured["blocks"]) and getattr(
+            model, "supports_gradient_checkpointing", False)
+        self._per_sample_mb = {
+            checkpointing: activation_bytes(measured, checkpointing) / samples / MB
+            for checkpointing in (False, True)
+        }
+        self.baseline_mb = max(0.0, psutil.Process().memory_info().rss / MB - self.parameters_mb)
+
+    def activations_mb(self, micro_batch: int, checkpointing: bool = False) -> float:
+        return self._per_sample_mb[checkpointing] * micro_batch
+
+    def peak_mb(self, micro_batch: int, checkpointing: bool = False) -> float:
+        """Predicted peak RSS of a training step"""
+        return (self.baseline_mb + self.parameters_mb + self.gradients_mb + self.optimizer_mb +
+                self.activations_mb(micro_batch, checkpointing))
+
+    def breakdown(self, micro_batch: int, checkpointing: bool = False) -> dict:
+        return {
+            "parameters_mb": self.parameters_mb,
+            "gradients_mb": self.gradients_mb,
+            "optimizer_mb": self.optimizer_mb,
+            "activations_mb": self.activations_mb(micro_batch, checkpointing),
+            "dataset_mb": self.dataset_mb,
+            "baseline_mb": self.baseline_mb,
+            "estimated_peak_mb": self.peak_mb(micro_batch, checkpointing),
+            "micro_batch": micro_batch,
+            "gradient_checkpointing": checkpointing,
+        }
+
+
+def memory_budget_mb(budget_mb: Optional[float], budget_fraction: float, processes: int = 1) -> float:
+    """Memory one training process may use: budget_mb, or its share of what is free plus what it holds"""
+    if budget_mb:
+        return float(budget_mb)
+    resident = psutil.Process().memory_info().rss
+    available = psutil.virtual_memory().available / max(1, processes)
+    return budget_fraction * (resident + available) / MB
+
+
+def plan_memory_budget(estimate: MemoryEstimate, budget_mb: Optional[float], micro_batch: int, accumulation: int,
+                       gradient_checkpointing="auto", world_size: int = 1) -> dict:
+    """Cheapest change that brings the predicted peak under budget_mb (None: no budget).
+
+    First gradient checkpointing (when "auto" and the model supports it;
+    True turns it on regardless), then halving the micro-batch with more
+    accumulation steps so the effective batch size stays the same. fits is
+    False if even that is not enough.
+    """
+    def over(size, checkpointing):
+        return budget_mb is not None and estimate.peak_mb(size, checkpointing) > budget_mb
+
+    effective = micro_batch * accumulation * max(1, world_size)
+    checkpointing = estimate.checkpointing_supported and (
+        gradient_checkpointing is True or (gradient_checkpointing == "auto" and over(micro_batch, False))
+    )
+    while micro_batch > 1 and over(micro_batch, checkpointing):
+        micro_batch //= 2
+        accumulation = accumulation_for(micro_batch, effective, world_size)
+    return {
+        "gradient_checkpointing": checkpointing,
+        "micro_batch": micro_batch,
+        "gradient_accumulation_steps": accumulation,
+        "budget_mb": budget_mb,
+        "fits": not over(micro_batch, checkpointing),
+    }
+
+
+class PeakRSSMeter:
+    """Peak resident set size of this process since the last take().
+
+    On Linux the kernel keeps the peak (VmHWM in /proc/self/status) and
+    clear_refs resets it, so reading a step's peak costs two small file
+    operations and misses no short-lived spike. Elsewhere a thread samples
+    RSS every interval seconds.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self._kernel = self._reset_kernel_peak()
+        self._peak = 0
+        self._running = False
+        self._thread = None
+        if not self._kernel:
+            self._process = psutil.Process()
+            self._running = True
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def _reset_kernel_peak() -> bool:
+        try:
+            with open(_CLEAR_REFS_FILE, "w") as f:
+                f.write("5")
+            return True
+        except OSError:
+            return False
+
+    def _sample(self):
+        while self._running:
+            self._peak = max(self._peak, self._process.memory_info().rss)
+            time.sleep(self.interval)
+
+    def take(self) -> float:
+        """Peak RSS in MB since the previous call, then start a new interval"""
+        if self._kernel:
+            with open(_STATUS_FILE) as f:
+                peak = int(re.search(r"VmHWM:\s+(\d+)", f.read()).group(1)) * 1024
+            self._reset_kernel_peak()
+        else:
+            peak, self._peak = max(self._peak, self._process.memory_info().rss), 0
+        return peak / MB
+
+    def close(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class PeakMemoryCallback(TrainerCallback):
+    """Records the peak RSS of every optimizer step; step_peak_mb is the newest, run_peak_mb the highest"""
+
+    def __init__(self, meter: PeakRSSMeter):
+        self.meter = meter
+        self.step_peak_mb = None
+        self.run_peak_mb = 0.0
+
+    def on_step_begin(self, args, state, control, **kwargs):
+        if self.step_peak_mb is None:
+            # Startup (model load, dataset) is not part of the first step
+            self.meter.take()
+            self.step_peak_mb = 0.0
+
+    def on_step_end(self, args, state, control, **kwargs):
+        self.step_peak_mb = self.meter.take()
+        self.run_peak_mb = max(self.run_peak_mb, self.step_peak_mb)
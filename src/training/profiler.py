@@ -0,0 +1,178 @@
+import os
+import time
+from contextlib import nullcontext
+from typing import Callable, Optional
+
+import torch
+from torch.profiler import ProfilerActivity, profile, record_function, schedule
+from transformers import TrainerCallback
+
+# Ranges recorded around each part of a training step while a profile is captured;
+# ResumableTrainer marks the first three, ProfilerCallback the optimizer step
+PROFILE_PHASES = ("dataloader", "forward", "backward", "optimizer")
+
+
+class StepProfiler:
+    """Captures a window of training steps with torch.profiler when asked to.
+
+    Nothing is profiled until start(); until then phase() hands out a
+    nullcontext, so an idle profiler costs the training loop nothing. A
+    capture runs warmup_steps untimed steps (the profiler's own startup
+    would otherwise land in the first step) and then records steps steps.
+    """
+
+    def __init__(self, steps: int = 5, warmup_steps: int = 1, top_ops: int = 20,
+                 record_shapes: bool = False, with_stack: bool = False):
+        self.steps = max(1, steps)
+        self.warmup_steps = max(0, warmup_steps)
+        self.top_ops = top_ops
+        self.record_shapes = record_shapes
+        self.with_stack = with_stack
+        self.profile = None
+        self.start_step = None
+        self._remaining = 0
+
+    @property
+    def active(self) -> bool:
+        return self.profile is not None
+
+    def phase(self, name: str):
+        """Profiler range for one part of the step (a no-op unless capturing)"""
+        return record_function(name) if self.profile is not None else nullcontext()
+
+    def start(self, step: int):
+        activities = [ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(ProfilerActivity.CUDA)
+        self.profile = profile(
+            activities=activities,
+            schedule=schedule(wait=0, warmup=self.warmup_steps, active=self.steps, repeat=1),
+            record_shapes=self.record_shapes,
+            with_stack=self.with_stack
+        )
+        self.profile.start()
+        self.start_step = step
+        self._remaining = self.warmup_steps + self.steps
+
+    def step(self) -> bool:
+        """Mark a step boundary; True once the capture window is complete"""
+        self.profile.step()
+        self._remaining -= 1
+        return self._remaining <= 0
+
+    def stop(self, trace_path: Optional[str] = None) -> dict:
+        """End the capture and summarize it; the Chrome trace is written to trace_path"""
+        prof, self.profile = self.profile, None
+        prof.stop()
+        # Steps actually recorded: fewer than asked if training ended during the capture
+        recorded = min(self.steps, self.steps - self._remaining)
+        report = summarize_profile(prof.key_averages(), max(1, recorded), self.top_ops)
+        report["start_step"] = self.start_step + self.warmup_steps
+        report["trace"] = None
+        if trace_path:
+            directory = os.path.dirname(trace_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            prof.export_chrome_trace(trace_path)
+            report["trace"] = trace_path
+        return report
+
+
+def summarize_profile(events, steps: int, top_ops: int = 20) -> dict:
+    """Per-step phase times and the operators with the most self CPU time.
+
+    Operator rows are [name, calls, self ms, total ms, share of all self CPU
+    time]; phases map each PROFILE_PHASES range to its ms per step.
+    """
+    phases = {}
+    operators = []
+    for event in events:
+        if event.key in PROFILE_PHASES:
+            phases[event.key] = event.cpu_time_total / 1000 / steps
+        elif not event.key.startswith("ProfilerStep"):
+            operators.append(event)
+    total = sum(event.self_cpu_time_total for event in operators) or 1.0
+    operators.sort(key=lambda event: event.self_cpu_time_total, reverse=True)
+    return {
+        "steps": steps,
+        "phases": {name: phases.get(name, 0.0) for name in PROFILE_PHASES},
+        "operators": [
+            [event.key, event.count, event.self_cpu_time_total / 1000, event.cpu_time_total / 1000,
+             event.self_cpu_time_total / total]
+            for event in operators[:top_ops]
+        ],
+    }
+
+
+def format_profile(report: dict) -> list:
+    """Plain-text lines of a profile report, for logs and headless runs"""
+    steps = report["steps"]
+    lines = [
+        f"Steps {report['start_step'] + 1}-{report['start_step'] + steps} per step: " +
+        ", ".join(f"{name} {ms:.1f} ms" for name, ms in report["phases"].items())
+    ]
+    lines.append(f"{'Operator (per step)':<40} {'Calls':>7} {'Self ms':>10} {'Total ms':>10} {'Self %':>7}")
+    for name, calls, self_ms, total_ms, share in report["operators"]:
+        lines.append(f"{name[:40]:<40} {calls / steps:>7.0f} {self_ms / steps:>10.1f} {total_ms / steps:>10.1f} "
+                     f"{share:>7.1%}")
+    if report.get("trace"):
+        lines.append(f"Chrome trace: {report['trace']}")
+    return lines
+
+
+class ProfilerCallback(TrainerCallback):
+    """Starts a StepProfiler capture when the UI (or at_step) asks for one and reports it.
+
+    Requests come through TrainingControl.request_profile() and are picked
+    up at the next step boundary, so a capture always covers whole steps,
+    dataloader wait included. The finished report goes to on_report and the
+    Chrome trace to trace_dir. A capture cut short by the end of training
+    is reported over the steps it did record.
+    """
+
+    def __init__(self, profiler: StepProfiler, training_control, trace_dir: str,
+                 on_report: Callable[[dict], None], at_step: Optional[int] = None, log=None):
+        self.profiler = profiler
+        self.training_control = training_control
+        self.trace_dir = trace_dir
+        self.on_report = on_report
+        self.at_step = at_step
+        self.log = log or (lambda category, message: None)
+        self._optimizer_range = None
+
+    def on_pre_optimizer_step(self, args, state, control, **kwargs):
+        if self.profiler.active:
+            self._optimizer_range = record_function("optimizer")
+            self._optimizer_range.__enter__()
+
+    def on_optimizer_step(self, args, state, control, **kwargs):
+        if self._optimizer_range is not None:
+            self._optimizer_range.__exit__(None, None, None)
+            self._optimizer_range = None
+
+    def on_step_end(self, args, state, control, **kwargs):
+        if self.profiler.active:
+            if self.profiler.step():
+                self._finish(state)
+            return
+        if state.global_step == self.at_step or self.training_control.take_profile_request():
+            self.profiler.start(state.global_step)
+            first = state.global_step + self.profiler.warmup_steps + 1
+            self.log("PROFILE", f"Profiling steps {first}-{first + self.profiler.steps - 1}")
+
+    def on_train_end(self, args, state, control, **kwargs):
+        if self.profiler.active:
+            self._finish(state)
+
+    def _finish(self, state):
+        start = time.perf_counter()
+        first = self.profiler.start_step + self.profiler.warmup_steps + 1
+        trace_path = os.path.join(self.trace_dir, f"profile-step{first}-{state.global_step}.json")
+        try:
+            report = self.profiler.stop(trace_path)
+        except Exception as e:
+            self.log("ERROR", f"Profiling failed: {e}")
+            return
+        self.log("PROFILE", f"Profile of {report['steps']} steps written to {trace_path} "
+                            f"in {time.perf_counter() - start:.1f}s")
+        self.on_report(report)
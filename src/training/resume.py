@@ -0,0 +1,287 @@
+import dataclasses
+import json
+import math
+import os
+import time
+from contextlib import nullcontext
+
+import torch
+from torch.utils.data import Sampler
+from transformers import Trainer, TrainerCallback
+from transformers.trainer_callback import ExportableState
+from transformers.trainer_utils import PREFIX_CHECKPOINT_DIR, get_last_checkpoint, has_length
+
+from .checkpoint import CheckpointSnapshot, rng_snapshot, to_host
+
+TRAINER_STATE_FILE = "trainer_state.json"
+
+
+class ResumableRandomSampler(Sampler):
+    """Shuffled sampler whose order depends only on (seed, epoch) and that can start mid-epoch.
+
+    The permutation is regenerated from a dedicated generator, so a resumed
+    run sees exactly the order the original run would have seen, and
+    resume_at() starts it at a sample index without touching the skipped
+    samples or the global RNG.
+    """
+
+    def __init__(self, num_samples: int, seed: int = 42):
+        self.num_samples = num_samples
+        self.seed = seed
+        self.epoch = 0
+        self._resume = None  # (epoch, start_index)
+
+    def set_epoch(self, epoch: int):
+        self.epoch = epoch
+
+    def resume_at(self, epoch: int, start_index: int):
+        self._resume = (epoch, start_index)
+
+    def __iter__(self):
+        generator = torch.Generator()
+        generator.manual_seed(self.seed + self.epoch)
+        order = torch.randperm(self.num_samples, generator=generator)
+        start = 0
+        if self._resume is not None and self._resume[0] == self.epoch:
+            start = self._resume[1]
+            self._resume = None
+        return iter(order[start:].tolist())
+
+    def __len__(self):
+        # The full epoch length: Trainer derives steps per epoch from it
+        return self.num_samples
+
+
+class _ResumedEpochCallback(TrainerCallback):
+    """Finishes a sampler-based resume inside the training loop.
+
+    Restores the checkpoint RNG at the first step (after the dataloader
+    iterator has drawn its seed, as in an uninterrupted run). In the resumed
+    epoch the loop only sees the batches left after the sampler's start, so
+    state.epoch is recomputed from the micro-batches run plus those skipped.
+    """
+
+    def __init__(self, trainer):
+        self.trainer = trainer
+        self.epoch = None
+        self.skipped_batches = 0
+        self.batches_per_epoch = 0
+        self._batches = 0
+
+    def resume_at(self, epoch: int, skipped_batches: int, batches_per_epoch: int):
+        self.epoch = epoch
+        self.skipped_batches = skipped_batches
+        self.batches_per_epoch = batches_per_epoch
+        self._batches = 0
+
+    def on_step_begin(self, args, state, control, **kwargs):
+        self.trainer.restore_pending_rng()
+
+    def on_substep_end(self, args, state, control, **kwargs):
+        self._batches += 1
+
+    def on_step_end(self, args, state, control, **kwargs):
+        if self.skipped_batches:
+            self._batches += 1
+            # Same arithmetic Trainer uses in an uninterrupted epoch
+            state.epoch = self.epoch + (self.skipped_batches + self._batches) / self.batches_per_epoch
+
+    def on_epoch_end(self, args, state, control, **kwargs):
+        self.skipped_batches = 0
+
+
+class ResumableTrainer(Trainer):
+    """Trainer that resumes mid-epoch by starting the sampler at the saved sample index.
+
+    Stock Trainer resumes by fast-forwarding the dataloader through every
+    batch already seen in the epoch. For datasets with a length this class
+    instead turns off that data skip and resumes the (seed, epoch)-seeded
+    sampler at the sample index derived from the checkpoint's global step.
+    Optimizer, scheduler and RNG state are restored by Trainer as usual.
+    Iterable (streaming) datasets keep Trainer's own fast-forward.
+
+    With a checkpoint_writer, checkpoints are copied to host memory at the
+    save step and written by the AsyncCheckpointWriter in the background.
+    With a step_timer, dataloader wait and forward/backward time are
+    measured for the throughput readout. With a step_profiler, the
+    dataloader wait, forward and backward pass of each step are marked as
+    profiler ranges while it is capturing.
+    """
+
+    def __init__(self, *args, checkpoint_writer=None, step_timer=None, step_profiler=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkpoint_writer = checkpoint_writer
+        self.step_timer = step_timer
+        self.step_profiler = step_profiler
+        self._profiling_step = False
+        self._backward_range = None
+        self._resume_step = None
+        self._pending_rng = None
+        self._epoch_callback = _ResumedEpochCallback(self)
+        # First in line, so every other callback already sees the corrected epoch
+        self.callback_handler.callbacks.insert(0, self._epoch_callback)
+
+    def _load_rng_state(self, checkpoint):
+        if self._resume_step and checkpoint is not None:
+            # Trainer restores RNG before creating the epoch iterator, which draws from it;
+            # defer to the first step so the RNG stream matches an uninterrupted run
+            self._pending_rng = checkpoint
+            return
+        super()._load_rng_state(checkpoint)
+
+    def restore_pending_rng(self):
+        if self._pending_rng is not None:
+            checkpoint, self._pending_rng = self._pending_rng, None
+            super()._load_rng_state(checkpoint)
+
+    def train(self, resume_from_checkpoint=None, *args, **kwargs):
+        self._resume_step = None
+        self._pending_rng = None
+        self._epoch_callback.resume_at(None, 0, 0)
+        if self.checkpoint_writer is not None:
+            # A checkpoint still being written cannot be resumed from yet
+            self.checkpoint_writer.wait()
+        if resume_from_checkpoint is True:
+            resume_from_checkpoint = get_last_checkpoint(self.args.output_dir)
+        state_path = os.path.join(resume_from_checkpoint or "", TRAINER_STATE_FILE)
+        if not (resume_from_checkpoint and has_length(self.train_dataset) and os.path.isfile(state_path)):
+            return super().train(resume_from_checkpoint, *args, **kwargs)
+
+        with open(state_path) as f:
+            self._resume_step = json.load(f)["global_step"]
+        ignore_data_skip = self.args.ignore_data_skip
+        # The sampler jumps to the right sample, so Trainer must not also skip batches
+        self.args.ignore_data_skip = True
+        try:
+            return super().train(resume_from_checkpoint, *args, **kwargs)
+        finally:
+            self.args.ignore_data_skip = ignore_data_skip
+
+    def _run_epoch(self, **kwargs):
+        resumed = self._epoch_callback
+        if resumed.skipped_batches and kwargs["epoch"] == resumed.epoch:
+            # The sampler already starts past the skipped batches: give the loop the length it will
+            # actually see, so the last (possibly partial) accumulation still steps the optimizer
+            kwargs["steps_in_epoch"] -= resumed.skipped_batches
+            kwargs["num_update_steps_per_epoch"] -= resumed.skipped_batches // self.args.gradient_accumulation_steps
+        return super()._run_epoch(**kwargs)
+
+    def _profiling(self) -> bool:
+        return self.step_profiler is not None and self.step_profiler.active
+
+    def get_batch_samples(self, epoch_iterator, num_batches, device):
+        if self.step_timer is None and not self._profiling():
+            return super().get_batch_samples(epoch_iterator, num_batches, device)
+        measure = self.step_timer.measure("data") if self.step_timer is not None else nullcontext()
+        with measure, self.step_profiler.phase("dataloader") if self._profiling() else nullcontext():
+            batch_samples, num_items_in_batch = super().get_batch_samples(epoch_iterator, num_batches, device)
+        if self.step_timer is not None:
+            self.step_timer.count_batches(batch_samples)
+        return batch_samples, num_items_in_batch
+
+    def training_step(self, *args, **kwargs):
+        if self.step_timer is None and not self._profiling():
+            return super().training_step(*args, **kwargs)
+        self._profiling_step = self._profiling()
+        try:
+            with self.step_timer.measure("compute") if self.step_timer is not None else nullcontext():
+                return super().training_step(*args, **kwargs)
+        finally:
+            self._profiling_step = False
+            if self._backward_range is not None:
+                self._backward_range.__exit__(None, None, None)
+                self._backward_range = None
+
+    def compute_loss(self, *args, **kwargs):
+        if not self._profiling_step:
+            return super().compute_loss(*args, **kwargs)
+        with self.step_profiler.phase("forward"):
+            loss = super().compute_loss(*args, **kwargs)
+        # What training_step does after the loss is the backward pass; the range ends with the step
+        self._backward_range = self.step_profiler.phase("backward")
+        self._backward_range.__enter__()
+        return loss
+
+    def _get_train_sampler(self, train_dataset=None):
+        train_dataset = self.train_dataset if train_dataset is None else train_dataset
+        if not has_length(train_dataset):
+            return super()._get_train_sampler(train_dataset)
+
+        sampler = ResumableRandomSampler(len(train_dataset), seed=self.args.seed)
+        if self._resume_step:
+            epoch, start_index = self.resume_position(len(train_dataset), self._resume_step)
+            sampler.resume_at(epoch, start_index)
+            self._epoch_callback.resume_at(epoch, start_index // self._global_batch_size(),
+                                           self._batches_per_epoch(len(train_dataset)))
+        return sampler
+
+    def _global_batch_size(self) -> int:
+        # Every sampler batch is split across data-parallel ranks, one micro-batch each
+        return self.args.train_batch_size * self.args.world_size
+
+    def _batches_per_epoch(self, num_samples: int) -> int:
+        batch_size = self._global_batch_size()
+        return num_samples // batch_size if self.args.dataloader_drop_last else math.ceil(num_samples / batch_size)
+
+    def resume_position(self, num_samples: int, global_step: int):
+        """(epoch, sample index) reached after global_step optimizer steps, using Trainer's epoch arithmetic"""
+        batches = self._batches_per_epoch(num_samples)
+        accumulation = self.args.gradient_accumulation_steps
+        updates_per_epoch = max(batches // accumulation + int(batches % accumulation > 0), 1)
+        epoch = global_step // updates_per_epoch
+        start_batch = min((global_step % updates_per_epoch) * accumulation, batches)
+        return epoch, start_batch * self._global_batch_size()
+
+    def _async_save_supported(self) -> bool:
+        # Sharded and multi-process setups save through their own collective paths
+        return (self.checkpoint_writer is not None and self.args.world_size == 1
+                and not self.is_deepspeed_enabled and not self.is_fsdp_enabled)
+
+    def _save_checkpoint(self, model, trial):
+        if not self._async_save_supported():
+            return super()._save_checkpoint(model, trial)
+
+        start = time.perf_counter()
+        if self.hp_search_backend is None and trial is None:
+            self.store_flos()
+        run_dir = self._get_output_dir(trial=trial)
+        output_dir = os.path.join(run_dir, f"{PREFIX_CHECKPOINT_DIR}-{self.state.global_step}")
+
+        if self.state.best_global_step:
+            best_dir = os.path.join(run_dir, f"{PREFIX_CHECKPOINT_DIR}-{self.state.best_global_step}")
+            if os.path.exists(best_dir) or best_dir in self.checkpoint_writer.submitted or best_dir == output_dir:
+                self.state.best_model_checkpoint = best_dir
+
+        # Same bookkeeping Trainer does before writing trainer_state.json
+        for cb in self.callback_handler.callbacks + [self.control]:
+            if isinstance(cb, ExportableState):
+                cb_name = cb.__class__.__name__
+                if isinstance(self.state.stateful_callbacks.get(cb_name), list):
+                    self.state.stateful_callbacks[cb_name].append(cb.state())
+                else:
+                    self.state.stateful_callbacks[cb_name] = cb.state()
+
+        unwrapped = self.accelerator.unwrap_model(self.model, keep_torch_compile=False)
+        save_full_state = not self.args.save_only_model
+        scaler = getattr(self.accelerator, "scaler", None)
+        snapshot = CheckpointSnapshot(
+            run_dir=run_dir,
+            output_dir=output_dir,
+            model=unwrapped,
+            model_state=to_host(unwrapped.state_dict()),
+            optimizer_state=to_host(self.optimizer.state_dict()) if save_full_state else None,
+            scheduler_state=to_host(self.lr_scheduler.state_dict()) if save_full_state else None,
+            scaler_state=to_host(scaler.state_dict()) if save_full_state and scaler is not None else None,
+            rng_state=rng_snapshot() if save_full_state else None,
+            trainer_state_json=json.dumps(dataclasses.asdict(self.state), indent=2, sort_keys=True) + "\n",
+            training_args=self.args,
+            best_checkpoint=self.state.best_model_checkpoint,
+        )
+        snapshot.snapshot_time = time.perf_counter() - start
+        self.checkpoint_writer.submit(snapshot)
+
+    def _finalize_training(self, *args, **kwargs):
+        if self.checkpoint_writer is not None:
+            # Loading the best model and Trainer's final cleanup read the checkpoint directories
+            self.checkpoint_writer.wait()
+        return super()._finalize_training(*args, **kwargs)
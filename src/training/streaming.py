@@ -0,0 +1,166 @@
+import glob
+import json
+import os
+import queue
+import random
+import threading
+from typing import List, Sequence, Union
+
+import torch
+from torch.utils.data import IterableDataset, get_worker_info
+
+_END = object()
+
+
+def resolve_shards(patterns: Union[str, Sequence[str]]) -> List[str]:
+    """Expand glob patterns into a sorted, de-duplicated list of shard files"""
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    files = set()
+    for pattern in patterns:
+        files.update(path for path in glob.glob(pattern) if os.path.isfile(path))
+    return sorted(files)
+
+
+class StreamingTokenDataset(IterableDataset):
+    """Tokenizes and packs local text/JSONL shards on the fly.
+
+    Nothing is materialized up front: lines are read lazily, tokenized in
+    batches of batch_size, joined with EOS and cut into dense max_length
+    blocks (the partial block carries over between batches and shards).
+    A background thread fills a bounded prefetch queue so tokenization
+    overlaps the training step, and an optional shuffle buffer mixes blocks
+    from nearby positions. Shards are split between dataloader workers;
+    with fewer shards than workers every worker reads all of them and keeps
+    every num_workers-th line instead, so none sits idle.
+
+    Plain text shards yield one document per non-empty line; .jsonl shards
+    read text_field from each record.
+    """
+
+    def __init__(self, files: Sequence[str], tokenizer, max_length: int = 512, text_field: str = "text",
+                 batch_size: int = 1000, shuffle_buffer: int = 0, prefetch: int = 64, seed: int = 42):
+        if not files:
+            raise ValueError("Streaming dataset needs at least one shard file")
+        self.files = list(files)
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+        self.text_field = text_field
+        self.batch_size = batch_size
+        self.shuffle_buffer = shuffle_buffer
+        self.prefetch = max(1, prefetch)
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int):
+        # Called by the HF Trainer at each epoch so shard order and shuffling change
+        self.epoch = epoch
+
+    def _worker_files(self, rng: random.Random):
+        """(files, (row offset, row stride)) this dataloader worker reads"""
+        files = list(self.files)
+        if self.shuffle_buffer:
+            rng.shuffle(files)
+
+        worker = get_worker_info()
+        if worker is None:
+            return files, (0, 1)
+        if len(files) < worker.num_workers:
+            # Too few shards to go around (e.g. one big file): split by line instead
+            return files, (worker.id, worker.num_workers)
+        return files[worker.id::worker.num_workers], (0, 1)
+
+    def _read_documents(self, files: List[str], rows=(0, 1)):
+        offset, stride = rows
+        index = -1
+        for path in files:
+            is_jsonl = path.endswith((".jsonl", ".json"))
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    index += 1
+                    if index % stride != offset:
+                        continue
+                    if is_jsonl:
+                        if not line.strip():
+                            continue
+                        text = json.loads(line).get(self.text_field, "")
+                    else:
+                        text = line.rstrip("\n")
+                    if text.strip():
+                        yield text
+
+    def _blocks(self, files: List[str], rows=(0, 1)):
+        eos_token_id = self.tokenizer.eos_token_id
+        stream: List[int] = []
+        batch: List[str] = []
+
+        def flush():
+            for ids in self.tokenizer(batch, add_special_tokens=False)['input_ids']:
+                stream.extend(ids)
+                stream.append(eos_token_id)
+            batch.clear()
+
+            usable = (len(stream) // self.max_length) * self.max_length
+            blocks = [stream[i:i + self.max_length] for i in range(0, usable, self.max_length)]
+            del stream[:usable]
+            return blocks
+
+        for text in self._read_documents(files, rows):
+            batch.append(text)
+            if len(batch) >= self.batch_size:
+                yield from flush()
+        if batch:
+            yield from flush()
+
+    def _shuffled(self, blocks, rng: random.Random):
+        if not self.shuffle_buffer:
+            yield from blocks
+            return
+
+        buffer = []
+        for block in blocks:
+            if len(buffer) < self.shuffle_buffer:
+                buffer.append(block)
+                continue
+            index = rng.randrange(len(buffer))
+            yield buffer[index]
+            buffer[index] = block
+        rng.shuffle(buffer)
+        yield from buffer
+
+    def __iter__(self):
+        worker = get_worker_info()
+        worker_id = worker.id if worker is not None else 0
+        rng = random.Random(self.seed + self.epoch * 1000 + worker_id)
+        files, rows = self._worker_files(random.Random(self.seed + self.epoch))
+
+        prefetched = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for block in self._shuffled(self._blocks(files, rows), rng):
+                    while not stop.is_set():
+                        try:
+                            prefetched.put(block, timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        return
+                prefetched.put(_END)
+            except Exception as e:
+                prefetched.put(e)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = prefetched.get()
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield {"input_ids": torch.tensor(item, dtype=torch.long)}
+        finally:
+            stop.set()
@@ -0,0 +1,179 @@
+import time
+from contextlib import contextmanager
+
+import torch
+from transformers import TrainerCallback
+
+# Phases of one optimizer step; "other" is whatever the wall time leaves over
+# (callbacks, logging, evaluation and checkpoint snapshots)
+STEP_PHASES = ("data", "compute", "optimizer", "other")
+
+
+class StepTimer:
+    """Accumulates per-phase time and token counts for the optimizer step in progress.
+
+    ResumableTrainer reports the dataloader wait and forward/backward time,
+    StepTimingCallback the optimizer step and the step boundary. With
+    synchronize, CUDA work is waited on at the end of each measured phase so
+    asynchronous kernels are charged to the phase that launched them.
+    """
+
+    def __init__(self, synchronize: bool = True):
+        self.synchronize = synchronize and torch.cuda.is_available()
+        self._phases = dict.fromkeys(STEP_PHASES, 0.0)
+        self._samples = 0
+        self._tokens = 0
+        self._step_start = None
+        self._cpu_start = None
+        self._optimizer_start = None
+
+    def _now(self) -> float:
+        if self.synchronize:
+            torch.cuda.synchronize()
+        return time.perf_counter()
+
+    @contextmanager
+    def measure(self, phase: str):
+        start = self._now()
+        try:
+            yield
+        finally:
+            self._phases[phase] += self._now() - start
+
+    def count_batches(self, batches):
+        """Count samples and non-pad tokens in the micro-batches of one step"""
+        for batch in batches:
+            input_ids = batch.get("input_ids")
+            if input_ids is None:
+                continue
+            self._samples += input_ids.shape[0]
+            attention_mask = batch.get("attention_mask")
+            self._tokens += int(attention_mask.sum()) if attention_mask is not None else input_ids.numel()
+
+    def start_optimizer(self):
+        self._optimizer_start = self._now()
+
+    def stop_optimizer(self):
+        if self._optimizer_start is not None:
+            self._phases["optimizer"] += self._now() - self._optimizer_start
+            self._optimizer_start = None
+
+    def reset(self):
+        """Start timing from now, discarding anything measured so far"""
+        self._phases = dict.fromkeys(STEP_PHASES, 0.0)
+        self._samples = self._tokens = 0
+        self._step_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    def finish_step(self):
+        """Close the current step; returns its stats, or None if timing was never started"""
+        now = time.perf_counter()
+        cpu_now = time.process_time()
+        stats = None
+        if self._step_start is not None:
+            wall = max(now - self._step_start, 1e-9)
+            # cpu: this process's CPU seconds over all its threads (dataloader workers excluded)
+            stats = dict(self._phases, wall=wall, cpu=cpu_now - self._cpu_start,
+                         samples=self._samples, tokens=self._tokens)
+            stats["other"] = max(0.0, wall - sum(self._phases[phase] for phase in STEP_PHASES[:-1]))
+        self._phases = dict.fromkeys(STEP_PHASES, 0.0)
+        self._samples = self._tokens = 0
+        self._step_start = now
+        self._cpu_start = cpu_now
+        return stats
+
+
+class ThroughputMeter:
+    """Exponential moving averages of step time, phase times and throughput, and the ETA they imply"""
+
+    def __init__(self, alpha: float = 0.1):
+        self.alpha = alpha
+        self.averages = {}
+        self.steps = 0
+
+    def update(self, stats: dict):
+        self.steps += 1
+        for name, value in stats.items():
+            previous = self.averages.get(name)
+            self.averages[name] = value if previous is None else previous + self.alpha * (value - previous)
+
+    @property
+    def step_time(self) -> float:
+        return self.averages.get("wall", 0.0)
+
+    @property
+    def samples_per_second(self) -> float:
+        return self.averages.get("samples", 0.0) / self.step_time if self.step_time else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.averages.get("tokens", 0.0) / self.step_time if self.step_time else 0.0
+
+    def rank_step_times(self) -> list:
+        """Averaged busy time per step of each data-parallel rank (empty for single-process runs)"""
+        times = []
+        while f"rank{len(times)}_step_time" in self.averages:
+            times.append(self.averages[f"rank{len(times)}_step_time"])
+        return times
+
+    def phase_fractions(self) -> dict:
+        if not self.step_time:
+            return dict.fromkeys(STEP_PHASES, 0.0)
+        return {phase: self.averages.get(phase, 0.0) / self.step_time for phase in STEP_PHASES}
+
+    def eta_seconds(self, remaining_steps: int):
+        """Seconds left at the averaged step time (None until a step has been measured)"""
+        if not self.steps:
+            return None
+        return max(0, remaining_steps) * self.step_time
+
+    def summary(self, remaining_steps: int) -> dict:
+        """Flat numeric snapshot for the run log and the dashboard"""
+        summary = {
+            "step_time": self.step_time,
+            "samples_per_second": self.samples_per_second,
+            "tokens_per_second": self.tokens_per_second,
+        }
+        for phase in STEP_PHASES:
+            summary[f"{phase}_time"] = self.averages.get(phase, 0.0)
+        eta = self.eta_seconds(remaining_steps)
+        if eta is not None:
+            summary["eta_seconds"] = eta
+        return summary
+
+
+class StepTimingCallback(TrainerCallback):
+    """Times the optimizer step and feeds each finished step into a ThroughputMeter.
+
+    With reduce_stats (e.g. distributed.gather_step_stats), every rank's step
+    stats are combined before they reach the meter; it is a collective, so it
+    runs on every step of every rank, warm-up included.
+    """
+
+    def __init__(self, step_timer: StepTimer, meter: ThroughputMeter, reduce_stats=None):
+        self.step_timer = step_timer
+        self.meter = meter
+        self.reduce_stats = reduce_stats
+        self._warming_up = False
+
+    def on_train_begin(self, args, state, control, **kwargs):
+        # Startup (and, on resume, checkpoint loading) is not a training step
+        self.step_timer.reset()
+        self._warming_up = True
+
+    def on_pre_optimizer_step(self, args, state, control, **kwargs):
+        self.step_timer.start_optimizer()
+
+    def on_optimizer_step(self, args, state, control, **kwargs):
+        self.step_timer.stop_optimizer()
+
+    def on_step_end(self, args, state, control, **kwargs):
+        stats = self.step_timer.finish_step()
+        if stats is not None and self.reduce_stats is not None:
+            stats = self.reduce_stats(stats)
+        if self._warming_up:
+            # The first step pays for lazy allocations and worker startup; keep it out of the averages
+            self._warming_up = False
+            return
+        if stats is not None:
+            self.meter.update(stats)
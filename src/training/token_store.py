@@ -0,0 +1,215 @@
+import hashlib
+import itertools
+import json
+import os
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+HASH_CHUNK_SIZE = 1 << 20
+# Source file hashes by absolute path, with the size and mtime they were computed at
+SOURCE_HASHES_FILE = "source_hashes.json"
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dataset_source_files(dataset) -> List[str]:
+    """Return the on-disk files backing a datasets.Dataset or DatasetDict"""
+    splits = dataset.values() if hasattr(dataset, "values") else [dataset]
+    files = []
+    for split in splits:
+        files.extend(cache_file["filename"] for cache_file in getattr(split, "cache_files", []))
+    return sorted(set(files))
+
+
+def token_dtype(vocab_size: int):
+    return np.uint16 if vocab_size <= np.iinfo(np.uint16).max + 1 else np.uint32
+
+
+class MemmapTokenDataset(Dataset):
+    """Map-style dataset reading token sequences from a TokenStore split.
+
+    The token file is memory-mapped lazily on first access, so each dataloader
+    worker maps it after the fork/spawn and all of them share the same page
+    cache instead of holding private copies. Sequences are stored unpadded;
+    when pad_to is set they are padded on read and an attention mask is added.
+    """
+
+    def __init__(self, tokens_path: str, offsets_path: str, dtype, pad_to: int = None, pad_token_id: int = 0):
+        self.tokens_path = tokens_path
+        self.offsets_path = offsets_path
+        self.dtype = np.dtype(dtype)
+        self.pad_to = pad_to
+        self.pad_token_id = pad_token_id
+        self.offsets = np.load(offsets_path, mmap_mode="r")
+        self._tokens = None
+
+    def __getstate__(self):
+        # Never pickle the mapping itself; workers re-open it on first access
+        state = self.__dict__.copy()
+        state["_tokens"] = None
+        state["offsets"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.offsets = np.load(self.offsets_path, mmap_mode="r")
+
+    @property
+    def tokens(self):
+        if self._tokens is None:
+            self._tokens = np.memmap(self.tokens_path, dtype=self.dtype, mode="r")
+        return self._tokens
+
+    @property
+    def num_tokens(self) -> int:
+        return int(self.offsets[-1])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        ids = self.tokens[start:end].astype(np.int64)
+
+        if self.pad_to is None:
+            return {"input_ids": torch.from_numpy(ids)}
+
+        input_ids = torch.full((self.pad_to,), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros(self.pad_to, dtype=torch.long)
+        length = min(len(ids), self.pad_to)
+        input_ids[:length] = torch.from_numpy(ids[:length])
+        attention_mask[:length] = 1
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+
+class TokenStore:
+    """On-disk cache of tokenized splits as flat token files plus offsets.
+
+    Layout under cache_dir/<fingerprint>/:
+        <split>.tokens       flat uint16 (uint32 for large vocabularies) token ids
+        <split>.offsets.npy  int64 start offsets, len(sequences) + 1 entries
+        meta.json            written last; its presence marks a complete store
+
+    cache_dir/source_hashes.json remembers each source file's hash with the
+    size and mtime it had, so a start-up with unchanged sources does not
+    reread the corpus to compute the fingerprint.
+    """
+
+    def __init__(self, cache_dir: str = "./cache/tokens"):
+        self.cache_dir = cache_dir
+
+    def source_hash(self, path: str) -> str:
+        """sha1 of a source file, rehashed only when its size or mtime changed"""
+        stat = os.stat(path)
+        hashes_path = os.path.join(self.cache_dir, SOURCE_HASHES_FILE)
+        try:
+            with open(hashes_path) as f:
+                hashes = json.load(f)
+        except (OSError, ValueError):
+            hashes = {}
+        key = os.path.abspath(path)
+        entry = hashes.get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha1"]
+
+        digest = _hash_file(path)
+        hashes[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": digest}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Per-process temporary name: data-parallel ranks may fingerprint at once
+        temporary = f"{hashes_path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(hashes, f, indent=2, sort_keys=True)
+        os.replace(temporary, hashes_path)
+        return digest
+
+    def fingerprint(self, tokenizer, max_length: int, strategy: str, dataset_config: Dict,
+                    source_files: Sequence[str]) -> str:
+        key = {
+            "tokenizer": {
+                "class": type(tokenizer).__name__,
+                "name": getattr(tokenizer, "name_or_path", ""),
+                "vocab_size": len(tokenizer),
+                "eos_token_id": tokenizer.eos_token_id,
+            },
+            "max_length": max_length,
+            "strategy": strategy,
+            "dataset": dataset_config,
+            "sources": {os.path.basename(path): self.source_hash(path) for path in source_files},
+        }
+        encoded = json.dumps(key, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
+    def _store_dir(self, fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, fingerprint)
+
+    def _split_paths(self, fingerprint: str, split: str):
+        store_dir = self._store_dir(fingerprint)
+        return (
+            os.path.join(store_dir, f"{split}.tokens"),
+            os.path.join(store_dir, f"{split}.offsets.npy"),
+        )
+
+    def read_meta(self, fingerprint: str):
+        meta_path = os.path.join(self._store_dir(fingerprint), "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            return json.load(f)
+
+    def exists(self, fingerprint: str) -> bool:
+        return self.read_meta(fingerprint) is not None
+
+    def build(self, fingerprint: str, splits: Dict[str, Iterable[List[List[int]]]], vocab_size: int, meta: Dict = None):
+        """Write every split from an iterable of token-sequence batches.
+
+        Batches are streamed straight to disk, each as one concatenated
+        array, so peak memory is one batch regardless of corpus size.
+        """
+        store_dir = self._store_dir(fingerprint)
+        os.makedirs(store_dir, exist_ok=True)
+        dtype = token_dtype(vocab_size)
+
+        split_meta = {}
+        for split, batches in splits.items():
+            tokens_path, offsets_path = self._split_paths(fingerprint, split)
+            lengths = []
+            with open(tokens_path + ".tmp", "wb") as f:
+                for batch in batches:
+                    batch_lengths = np.fromiter((len(sequence) for sequence in batch), dtype=np.int64,
+                                                count=len(batch))
+                    np.fromiter(itertools.chain.from_iterable(batch), dtype=dtype,
+                                count=int(batch_lengths.sum())).tofile(f)
+                    lengths.append(batch_lengths)
+            os.replace(tokens_path + ".tmp", tokens_path)
+            offsets = np.zeros(sum(len(part) for part in lengths) + 1, dtype=np.int64)
+            if lengths:
+                np.cumsum(np.concatenate(lengths), out=offsets[1:])
+            np.save(offsets_path, offsets)
+            split_meta[split] = {"sequences": len(offsets) - 1, "tokens": int(offsets[-1])}
+
+        full_meta = dict(meta or {}, dtype=np.dtype(dtype).name, splits=split_meta)
+        meta_path = os.path.join(store_dir, "meta.json")
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(full_meta, f, indent=2)
+        os.replace(meta_path + ".tmp", meta_path)
+        return full_meta
+
+    def open(self, fingerprint: str, pad_to: int = None, pad_token_id: int = 0) -> Dict[str, MemmapTokenDataset]:
+        meta = self.read_meta(fingerprint)
+        if meta is None:
+            raise FileNotFoundError(f"No token store for fingerprint {fingerprint}")
+
+        datasets = {}
+        for split in meta["splits"]:
+            tokens_path, offsets_path = self._split_paths(fingerprint, split)
+            datasets[split] = MemmapTokenDataset(tokens_path, offsets_path, meta["dtype"], pad_to, pad_token_id)
+        return datasets
@@ -1,19 +1,246 @@
-from transformers import GPT2Tokenizer
+from transformers import GPT2TokenizerFast
 from typing import Dict, Any
 import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
 import datasets
 import transformers
+import torch
 
 # Set logging levels
 logging.getLogger("datasets").setLevel(logging.ERROR)
 logging.getLogger("transformers").setLevel(logging.ERROR)
 
+# "padding" pads every line to max_length, "packing" joins non-empty lines
+# with EOS and cuts the token stream into dense max_length blocks.
+TOKENIZATION_STRATEGIES = ("padding", "packing")
+
+# Worker processes are spawned, not forked: the parent already runs the UI, logger
+# and tokenizer threads, and a fork while one of them holds a lock can deadlock
+_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+
+class CausalLMCollator:
+    """Stacks tokenized rows into a batch and derives labels from input_ids.
+
+    Labels are built per batch instead of being stored as a second column.
+    Padded positions are masked with -100; packed blocks have no padding, so
+    their labels share storage with input_ids (the model shifts internally
+    and never writes to them).
+    """
+
+    @staticmethod
+    def _stack(values):
+        if torch.is_tensor(values[0]):
+            return torch.stack(values).long()
+        return torch.tensor(values, dtype=torch.long)
+
+    def __call__(self, features):
+        input_ids = self._stack([f["input_ids"] for f in features])
+        batch = {"input_ids": input_ids}
+
+        if "attention_mask" in features[0]:
+            attention_mask = self._stack([f["attention_mask"] for f in features])
+            batch["attention_mask"] = attention_mask
+            batch["labels"] = input_ids.masked_fill(attention_mask == 0, -100)
+        else:
+            batch["labels"] = input_ids
+
+        return batch
+
+
+def encode_texts(tokenizer, texts, max_length: int, strategy: str):
+    """Encode a batch of lines into unpadded token sequences.
+
+    Empty lines are dropped for both strategies. "padding" returns one
+    truncated sequence per line, "packing" joins the lines with EOS and
+    returns dense max_length blocks (the short tail is dropped).
+    """
+    documents = [text for text in texts if text.strip()]
+    if not documents:
+        return []
+
+    if strategy == "padding":
+        return tokenizer(documents, truncation=True, max_length=max_length)['input_ids']
+
+    eos_token_id = tokenizer.eos_token_id
+    encoded = tokenizer(documents, add_special_tokens=False)['input_ids']
+
+    stream = []
+    for ids in encoded:
+        stream.extend(ids)
+        stream.append(eos_token_id)
+
+    usable = (len(stream) // max_length) * max_length
+    return [stream[i:i + max_length] for i in range(0, usable, max_length)]
+
+
+def _report(progress_queue, lines: int, tokens: int):
+    if progress_queue is not None:
+        progress_queue.put((os.getpid(), lines, tokens))
+
+
+# The map functions below run inside datasets worker processes, so they are
+# module-level and only receive picklable arguments (never the UI callbacks).
+
+def _pad_batch(examples, tokenizer, max_length, progress_queue=None):
+    # Empty lines would be all padding (and all -100 labels), so they are dropped.
+    # Labels are derived from input_ids by CausalLMCollator at batch time
+    documents = [text for text in examples['text'] if text.strip()]
+    result = tokenizer(
+        documents,
+        padding="max_length",
+        truncation=True,
+        max_length=max_length
+    )
+    result["length"] = [sum(mask) for mask in result["attention_mask"]]
+    _report(progress_queue, len(examples['text']), sum(result["length"]))
+    return dict(result)
+
+
+def _pack_batch(examples, tokenizer, max_length, progress_queue=None):
+    blocks = encode_texts(tokenizer, examples['text'], max_length, "packing")
+    _report(progress_queue, len(examples['text']), len(blocks) * max_length)
+    return {"input_ids": blocks, "length": [max_length] * len(blocks)}
+
+
+_worker_state = {}
+
+
+def _init_encode_worker(tokenizer, split, max_length, strategy, progress_queue):
+    # Each worker is already one of num_proc processes; avoid nested Rust threads
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    _worker_state.update(
+        tokenizer=tokenizer, split=split, max_length=max_length,
+        strategy=strategy, progress_queue=progress_queue
+    )
+
+
+def _encode_range(bounds):
+    start, end = bounds
+    texts = _worker_state['split'][start:end]['text']
+    sequences = encode_texts(_worker_state['tokenizer'], texts, _worker_state['max_length'], _worker_state['strategy'])
+    _report(_worker_state['progress_queue'], len(texts), sum(len(seq) for seq in sequences))
+    return sequences
+
+
+class TokenizationProgress:
+    """Combines per-worker (pid, lines, tokens) reports from a queue.
+
+    Workers only put small tuples on the queue; a drain thread in the parent
+    sums them and forwards throttled updates to the progress and log hooks.
+    A multiprocessing manager queue is used when num_proc > 1 because plain
+    multiprocessing queues cannot be passed to datasets.map workers.
+    """
+
+    def __init__(self, total_lines: int, num_proc: int = 1, progress_callback=None, log_callback=None,
+                 report_interval: float = 0.5):
+        self.total_lines = total_lines
+        self.num_proc = num_proc
+        self.progress_callback = progress_callback
+        self.log_callback = log_callback
+        self.report_interval = report_interval
+        self._manager = _MP_CONTEXT.Manager() if num_proc > 1 else None
+        self.queue = self._manager.Queue() if self._manager else queue.Queue()
+        self.workers: Dict[int, list] = {}
+        self.lines = 0
+        self.tokens = 0
+        self._thread = None
+        self._start_time = None
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.queue.put(None)
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._start_time
+        if self._manager:
+            self._manager.shutdown()
+        self._emit()
+
+    def _drain(self):
+        last_report = 0.0
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            pid, lines, tokens = item
+            worker = self.workers.setdefault(pid, [0, 0])
+            worker[0] += lines
+            worker[1] += tokens
+            self.lines += lines
+            self.tokens += tokens
+
+            now = time.perf_counter()
+            if now - last_report >= self.report_interval:
+                last_report = now
+                self._emit()
+
+    def _emit(self):
+        if self.progress_callback and self.total_lines:
+            self.progress_callback(min(self.lines, self.total_lines), self.total_lines)
+        if self.log_callback:
+            self.log_callback(
+                "Tokenization",
+                f"Processed {self.lines:,} of {self.total_lines:,} lines across {len(self.workers)} worker(s)"
+            )
+
+    def throughput(self):
+        elapsed = max(self.elapsed or (time.perf_counter() - self._start_time), 1e-9)
+        return {
+            "num_proc": self.num_proc,
+            "lines": self.lines,
+            "tokens": self.tokens,
+            "seconds": elapsed,
+            "lines_per_sec": self.lines / elapsed,
+            "tokens_per_sec": self.tokens / elapsed,
+        }
+
+
 class ModelTokenizer:
-    def __init__(self, progress_callback=None, log_callback=None):
-        self.tokenizer = GPT2Tokenizer.from_pretrained("gpt2")
-        self.tokenizer.pad_token = self.tokenizer.eos_token
+    def __init__(self, progress_callback=None, log_callback=None, strategy: str = "padding",
+                 num_proc: int = 1, batch_size: int = 1000, writer_batch_size: int = 1000, tokenizer=None):
+        if strategy not in TOKENIZATION_STRATEGIES:
+            raise ValueError(f"Unknown tokenization strategy: {strategy}")
+        # A prebuilt tokenizer (e.g. a local one for offline benchmarks) skips the hub download
+        self._tokenizer = tokenizer
+        self._tokenizer_lock = threading.Lock()
         self.progress_callback = progress_callback
         self.log_callback = log_callback
+        self.strategy = strategy
+        self.num_proc = max(1, num_proc)
+        self.batch_size = batch_size
+        self.writer_batch_size = writer_batch_size
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self.throughput: Dict[str, Any] = {}
+
+    @property
+    def tokenizer(self):
+        """GPT-2 tokenizer, loaded on first use so constructing a trainer stays instant"""
+        if self._tokenizer is None:
+            with self._tokenizer_lock:
+                if self._tokenizer is None:
+                    start = time.perf_counter()
+                    # Rust-backed tokenizer; batch calls are an order of magnitude faster than GPT2Tokenizer
+                    tokenizer = GPT2TokenizerFast.from_pretrained("gpt2")
+                    tokenizer.pad_token = tokenizer.eos_token
+                    self._tokenizer = tokenizer
+                    self.update_log("INFO", f"Tokenizer loaded in {time.perf_counter() - start:.2f}s")
+        return self._tokenizer
 
     def update_terminal_progress(self, current, total):
         if self.progress_callback:
@@ -22,31 +249,112 @@ class ModelTokenizer:
     def update_log(self, category, message):
         if self.log_callback:
             self.log_callback(category, message)
-            
-    def tokenize_dataset(self, dataset, max_length: int = 512):
-        total_items = len(dataset)
-        
-        def tokenize_function(examples):
-            current_index = examples['text'].index
-            self.update_terminal_progress(current_index, total_items)
-            self.update_log("Tokenization", f"Processing items {current_index} of {total_items}")
-            
-            # Tokenize the inputs
-            result = self.tokenizer(
-                examples['text'],
-                padding="max_length",
-                truncation=True,
-                max_length=max_length,
-                return_tensors="pt"
-            )
-            
-            # Set labels equal to input_ids for language modeling
-            result["labels"] = result["input_ids"].detach().clone()
-            
-            return result
-        
-        return dataset.map(
-            tokenize_function, 
-            batched=True,
-            remove_columns=['text']  # Remove only the 'text' column which exists in the dataset
+
+    def _track(self, total_lines: int):
+        return TokenizationProgress(total_lines, self.num_proc, self.update_terminal_progress, self.update_log)
+
+    def _log_throughput(self, progress: TokenizationProgress, label: str):
+        self.throughput = progress.throughput()
+        self.update_log(
+            "INFO",
+            f"{label}: num_proc={self.num_proc}, batch_size={self.batch_size}: "
+            f"{self.throughput['lines_per_sec']:,.0f} lines/sec, "
+            f"{self.throughput['tokens_per_sec']:,.0f} tokens/sec"
         )
+
+    def tokenize_dataset(self, dataset, max_length: int = 512, strategy: str = None):
+        strategy = strategy or self.strategy
+        if strategy not in TOKENIZATION_STRATEGIES:
+            raise ValueError(f"Unknown tokenization strategy: {strategy}")
+
+        if isinstance(dataset, datasets.DatasetDict):
+            total_items = sum(len(split) for split in dataset.values())
+        else:
+            total_items = len(dataset)
+
+        with self._track(total_items) as progress:
+            tokenized = dataset.map(
+                _pack_batch if strategy == "packing" else _pad_batch,
+                batched=True,
+                batch_size=self.batch_size,
+                writer_batch_size=self.writer_batch_size,
+                num_proc=self.num_proc if self.num_proc > 1 else None,
+                fn_kwargs={
+                    'tokenizer': self.tokenizer,
+                    'max_length': max_length,
+                    'progress_queue': progress.queue
+                },
+                remove_columns=['text']  # Remove only the 'text' column which exists in the dataset
+            )
+        self._log_throughput(progress, strategy)
+
+        self.stats = self._collect_stats(tokenized, strategy, max_length)
+        return tokenized
+
+    def encode_batch(self, texts, max_length: int, strategy: str = None):
+        """Encode a batch of lines into unpadded token sequences (see encode_texts)"""
+        return encode_texts(self.tokenizer, texts, max_length, strategy or self.strategy)
+
+    def iter_batches(self, split, max_length: int, strategy: str = None, batch_size: int = None):
+        """Yield encoded sequence batches for one split without materializing it.
+
+        With num_proc > 1 the batches are encoded by a pool of spawned processes
+        and yielded in order, so the output is identical to the single-process path.
+        """
+        strategy = strategy or self.strategy
+        batch_size = batch_size or self.batch_size
+        ranges = [(start, min(start + batch_size, len(split))) for start in range(0, len(split), batch_size)]
+
+        with self._track(len(split)) as progress:
+            if self.num_proc == 1:
+                for start, end in ranges:
+                    texts = split[start:end]['text']
+                    sequences = self.encode_batch(texts, max_length, strategy)
+                    _report(progress.queue, len(texts), sum(len(seq) for seq in sequences))
+                    yield sequences
+            else:
+                with _MP_CONTEXT.Pool(
+                    self.num_proc,
+                    initializer=_init_encode_worker,
+                    initargs=(self.tokenizer, split, max_length, strategy, progress.queue)
+                ) as pool:
+                    yield from pool.imap(_encode_range, ranges)
+        self._log_throughput(progress, f"{strategy} {split.split or 'split'}")
+
+    @staticmethod
+    def _collect_stats(tokenized, strategy: str, max_length: int):
+        splits = tokenized.items() if isinstance(tokenized, datasets.DatasetDict) else [("dataset", tokenized)]
+        counts = {
+            name: (len(split), int(sum(split["length"])) if len(split) else 0)
+            for name, split in splits
+        }
+        return ModelTokenizer.stats_from_counts(counts, strategy, max_length)
+
+    @staticmethod
+    def stats_from_counts(counts, strategy: str, max_length: int):
+        """Build per-split stats from {split: (sequences, real_tokens)}"""
+        stats = {}
+        for name, (sequences, tokens) in counts.items():
+            slots = sequences * max_length
+            stats[name] = {
+                "strategy": strategy,
+                "sequences": sequences,
+                "tokens": tokens,
+                "slots": slots,
+                "padding_ratio": 1.0 - tokens / slots if slots else 0.0,
+            }
+        return stats
+
+    def summarize_stats(self, batch_size: int, gradient_accumulation_steps: int = 1, max_length: int = 512):
+        """Return one line per split with the padding ratio and real tokens per optimizer step"""
+        slots_per_step = batch_size * gradient_accumulation_steps * max_length
+        lines = []
+        for name, split_stats in self.stats.items():
+            effective = slots_per_step * (1.0 - split_stats["padding_ratio"])
+            split_stats["effective_tokens_per_step"] = effective
+            lines.append(
+                f"[{split_stats['strategy']}] {name}: {split_stats['sequences']} sequences, "
+                f"padding ratio {split_stats['padding_ratio']:.1%}, "
+                f"effective tokens/step {effective:,.0f} of {slots_per_step:,}"
+            )
+        return lines
@@ -1,17 +1,74 @@
-from transformers import GPT2LMHeadModel, TrainingArguments, Trainer, TrainerCallback
+from transformers import GPT2LMHeadModel, TrainingArguments, TrainerCallback
+from transformers.trainer_utils import IntervalStrategy
 from ..utils.logger import TrainingLogger
-from .tokenizer import ModelTokenizer
+from ..utils.metric_series import MetricSeries
+from ..utils.run_log import RunLog
+from ..utils.run_registry import RunRegistry
+from .tokenizer import ModelTokenizer, CausalLMCollator
+from .token_store import TokenStore, dataset_source_files
+from .streaming import StreamingTokenDataset, resolve_shards
+from .control import TrainingControl, ControlCallback
+from .resume import ResumableTrainer
+from .checkpoint import AsyncCheckpointWriter
+from .throughput import StepTimer, ThroughputMeter, StepTimingCallback
+from .evaluation import TokenMetrics, eval_subset
+from .cpu_profile import CPUProfile, detect_hardware, first_batch, take_rows, calibrate_precision
+from .batch_finder import BatchSizeFinder
+from .memory import MemoryEstimate, PeakRSSMeter, PeakMemoryCallback, dataset_bytes, memory_budget_mb, plan_memory_budget
+from .profiler import StepProfiler, ProfilerCallback, format_profile
+from .distributed import RankControl, ControlSyncCallback, broadcast_object, gather_step_stats, get_rank, get_world_size
+from ..config.training_config import DATASET_CONFIG, TOKENIZATION_CONFIG, STREAMING_CONFIG, RUN_LOG_CONFIG, CONTROL_CONFIG, CHECKPOINT_CONFIG, THROUGHPUT_CONFIG, EVAL_CONFIG, CPU_PROFILE_CONFIG, BATCH_FINDER_CONFIG, LOGGING_CONFIG, PROFILER_CONFIG, MEMORY_CONFIG
 from datasets import load_dataset
+import gc
+import os
 import time
+import psutil
+import torch
 
 class ModelTrainer:
-    def __init__(self, window=None):
+    def __init__(self, window=None, control=None):
         self.window = window
-        self.logger = TrainingLogger(window)
-        self.tokenizer = ModelTokenizer()
+        # Data-parallel rank (see DistributedLauncher); only rank 0 logs metrics and runs the probes
+        self.rank = get_rank()
+        self.world_size = get_world_size()
+        self.logger = TrainingLogger(
+            window,
+            log_file=self.log_file(LOGGING_CONFIG['file']),
+            max_bytes=LOGGING_CONFIG['max_bytes'],
+            backup_count=LOGGING_CONFIG['backup_count'],
+            rate_limits=LOGGING_CONFIG['rate_limits']
+        )
+        self.tokenizer = ModelTokenizer(
+            progress_callback=getattr(window, 'update_tokenization_progress', None),
+            # Per-batch progress comes as "Tokenization", rate-limited by LOGGING_CONFIG['rate_limits']
+            log_callback=self.logger.log,
+            strategy=TOKENIZATION_CONFIG['strategy'],
+            num_proc=TOKENIZATION_CONFIG['num_proc'],
+            batch_size=TOKENIZATION_CONFIG['batch_size'],
+            writer_batch_size=TOKENIZATION_CONFIG['writer_batch_size']
+        )
         self.model = None
         self.dataset = None
         self.current_progress = 0
+        self.run_log = None
+        self.checkpoint_writer = None
+        self.throughput = None
+        # Host-memory breakdown from plan_memory, and the per-step peak RSS tracker
+        self.memory = None
+        self.memory_callback = None
+        self.error = None
+        # Pause/Stop from the UI are applied by ControlCallback between steps.
+        # A launcher passes its own control when the window lives in another process
+        self.control = control or TrainingControl()
+        if control is None and hasattr(window, 'set_training_control'):
+            window.set_training_control(self.control)
+
+    def log_file(self, path):
+        """Structured log file of this rank; other ranks write next to rank 0's"""
+        if not path or self.rank == 0:
+            return path
+        root, extension = os.path.splitext(path)
+        return f"{root}.rank{self.rank}{extension}"
 
     def update_progress(self, increment: float):
         self.current_progress = min(self.current_progress + increment, 100)
@@ -20,106 +77,613 @@ class ModelTrainer:
     def load_dataset(self):
         try:
             self.logger.log("INFO", "Loading and preprocessing dataset...")
-            self.dataset = load_dataset('wikitext', 'wikitext-103-raw-v1')
+            self.dataset = load_dataset(DATASET_CONFIG['path'], DATASET_CONFIG['name'])
             self.logger.log("INFO", f"Dataset loaded. {len(self.dataset['train'])} training examples.")
 
         except Exception as e:
             self.logger.log("ERROR", "Error loading dataset.")
             raise
 
-    def initialize_model(self):
+    def tokenize_dataset(self, max_length: int):
+        """Tokenize self.dataset, reusing the on-disk token store when it is enabled"""
+        if not TOKENIZATION_CONFIG['use_token_store']:
+            return self.tokenizer.tokenize_dataset(self.dataset, max_length=max_length)
+
+        strategy = self.tokenizer.strategy
+        tokenizer = self.tokenizer.tokenizer
+        store = TokenStore(TOKENIZATION_CONFIG['cache_dir'])
+        fingerprint = store.fingerprint(
+            tokenizer, max_length, strategy, DATASET_CONFIG, dataset_source_files(self.dataset)
+        )
+
+        if store.exists(fingerprint):
+            self.logger.log("INFO", f"Using cached token store {fingerprint}, skipping tokenization.")
+        else:
+            self.logger.log("INFO", f"Building token store {fingerprint}...")
+            store.build(
+                fingerprint,
+                {split: self.tokenizer.iter_batches(self.dataset[split], max_length) for split in self.dataset},
+                vocab_size=len(tokenizer),
+                meta={'strategy': strategy, 'max_length': max_length, 'dataset': DATASET_CONFIG}
+            )
+
+        meta = store.read_meta(fingerprint)
+        self.tokenizer.stats = ModelTokenizer.stats_from_counts(
+            {split: (info['sequences'], info['tokens']) for split, info in meta['splits'].items()},
+            strategy,
+            max_length
+        )
+        pad_to = max_length if strategy == "padding" else None
+        return store.open(fingerprint, pad_to=pad_to, pad_token_id=tokenizer.pad_token_id)
+
+    def load_streaming_datasets(self, max_length: int):
+        """Build iterable train/validation datasets over local shards; nothing is tokenized up front"""
+        train_files = resolve_shards(STREAMING_CONFIG['train_files'])
+        eval_files = resolve_shards(STREAMING_CONFIG['eval_files'])
+        self.logger.log("INFO", f"Streaming {len(train_files)} training shard(s), {len(eval_files)} validation shard(s).")
+
+        common = {
+            'tokenizer': self.tokenizer.tokenizer,
+            'max_length': max_length,
+            'text_field': STREAMING_CONFIG['text_field'],
+            'batch_size': TOKENIZATION_CONFIG['batch_size'],
+            'prefetch': STREAMING_CONFIG['prefetch'],
+            'seed': STREAMING_CONFIG['seed']
+        }
+        datasets = {
+            "train": StreamingTokenDataset(train_files, shuffle_buffer=STREAMING_CONFIG['shuffle_buffer'], **common),
+            "validation": None
+        }
+        if eval_files:
+            datasets["validation"] = StreamingTokenDataset(eval_files, **common)
+        else:
+            self.logger.log("WARNING", "No validation shards found; evaluation is disabled for this run.")
+        return datasets
+
+    def prepare_evaluation(self, validation, training_args: TrainingArguments):
+        """Fixed eval subset plus per-batch token metrics, built once and reused by every evaluation"""
+        if validation is None:
+            # Nothing to evaluate on (streaming without validation shards): Trainer refuses
+            # step evaluation and best-model tracking without an eval_dataset
+            training_args.eval_strategy = IntervalStrategy.NO
+            training_args.load_best_model_at_end = False
+            return None, None
+
+        eval_dataset = eval_subset(validation, EVAL_CONFIG['subset_size'], EVAL_CONFIG['seed'])
+        if eval_dataset is not None and eval_dataset is not validation:
+            total = f" of {len(validation)}" if hasattr(validation, '__len__') else ""
+            self.logger.log("INFO", f"Evaluating on {len(eval_dataset)}{total} validation rows.")
+
+        token_metrics = None
+        if eval_dataset is not None and EVAL_CONFIG['token_metrics']:
+            token_metrics = TokenMetrics()
+            # Hand metrics each batch as it is evaluated instead of gathering the whole eval set
+            training_args.batch_eval_metrics = True
+        return eval_dataset, token_metrics
+
+    def tune_cpu(self, train_dataset, training_args: TrainingArguments):
+        """Size threads/workers to this machine and pick bf16 by timing a few steps on the loaded model"""
+        if not CPU_PROFILE_CONFIG['enabled'] or torch.cuda.is_available():
+            return None
+        hardware = detect_hardware()
+        # Data-parallel ranks on this host share its memory
+        hardware['available_memory_mb'] /= self.world_size
+        self.logger.log("SYSTEM", (
+            f"CPU profile: {hardware['physical_cores']} physical / {hardware['logical_cores']} logical cores "
+            f"({hardware['usable_cores']} usable), {hardware['available_memory_mb'] / 1024:.1f} GB memory available"
+        ))
+        profile = CPUProfile.plan(
+            hardware,
+            worker_fraction=CPU_PROFILE_CONFIG['worker_fraction'],
+            max_workers=CPU_PROFILE_CONFIG['max_workers'],
+            worker_memory_mb=CPU_PROFILE_CONFIG['worker_memory_mb']
+        )
+        # Threads first, so calibration runs with the pool training will use
+        profile.apply(training_args)
+
+        bf16 = CPU_PROFILE_CONFIG['bf16']
+        if bf16 and not hardware['bf16']:
+            self.logger.log("SYSTEM", "bf16: no native bf16 support on this CPU, staying in fp32")
+            bf16 = False
+        # Rank 0 calibrates on its own cores while the other ranks wait for its choice
+        steps = CPU_PROFILE_CONFIG['calibration_steps'] if self.rank == 0 else 0
+        batch = first_batch(train_dataset, training_args.per_device_train_batch_size, CausalLMCollator()) if steps else None
+        if batch is not None:
+            self.logger.log("SYSTEM", f"Timing {steps} training steps per precision...")
+            calibrate_precision(profile, self.model, batch, steps, bf16)
+        else:
+            profile.bf16 = bf16 is True
+
+        if CPU_PROFILE_CONFIG['compile']:
+            profile.compile = hardware['compile']
+            if not profile.compile:
+                self.logger.log("SYSTEM", "torch.compile: not supported here (TorchDynamo or a C++ compiler is missing)")
+        profile.bf16, profile.compile = broadcast_object((profile.bf16, profile.compile))
+        profile.apply(training_args)
+        for line in profile.describe(training_args.per_device_train_batch_size):
+            self.logger.log("SYSTEM", line)
+        return profile
+
+    def find_batch_size(self, train_dataset, training_args: TrainingArguments, max_length: int):
+        """Swap the configured micro-batch size for the fastest one that fits, keeping the effective batch size"""
+        if not BATCH_FINDER_CONFIG['enabled'] or torch.cuda.is_available():
+            return None
+        world_size = training_args.world_size
+        effective = BATCH_FINDER_CONFIG['effective_batch_size'] or (
+            training_args.per_device_train_batch_size * training_args.gradient_accumulation_steps * world_size
+        )
+        finder = BatchSizeFinder(
+            BATCH_FINDER_CONFIG['cache_file'],
+            max_micro_batch=BATCH_FINDER_CONFIG['max_micro_batch'],
+            probe_steps=BATCH_FINDER_CONFIG['probe_steps'],
+            memory_fraction=BATCH_FINDER_CONFIG['memory_fraction'],
+            log_callback=self.logger.log
+        )
+        choice = None
+        if self.rank == 0:
+            choice = finder.find(self.model, train_dataset, CausalLMCollator(), max_length, effective,
+                                 bf16=training_args.bf16, world_size=world_size,
+                                 gradient_checkpointing=training_args.gradient_checkpointing)
+        # Every rank must run the same batch size and accumulation, or the gradient all-reduce hangs
+        choice = broadcast_object(choice)
+        if choice is None:
+            return None
+        finder.apply(choice, training_args)
+        self.logger.log("SYSTEM", (
+            f"Batch size: {choice['micro_batch']} x {choice['gradient_accumulation_steps']} accumulation steps "
+            f"(effective {choice['effective_batch_size']}, requested {effective}), "
+            f"{choice['tokens_per_second']:.0f} tokens/s measured"
+        ))
+        return choice
+
+    def plan_memory(self, train_dataset, training_args: TrainingArguments):
+        """Estimate what training costs in RAM and, in budget mode, make it fit (see MEMORY_CONFIG)"""
+        if not MEMORY_CONFIG['enabled'] or torch.cuda.is_available():
+            return None
+        plan = None
+        if self.rank == 0:
+            rows = take_rows(train_dataset, MEMORY_CONFIG['sample_rows'])
+            if rows:
+                # Activations grow with sequence length: measure the worst case
+                longest = max(rows, key=lambda row: len(row['input_ids']))
+                estimate = MemoryEstimate(self.model, CausalLMCollator()([longest]), dataset_bytes(train_dataset),
+                                          bf16=training_args.bf16)
+                budget = None
+                if MEMORY_CONFIG['budget']:
+                    budget = memory_budget_mb(MEMORY_CONFIG['budget_mb'], MEMORY_CONFIG['budget_fraction'],
+                                              processes=self.world_size)
+                plan = plan_memory_budget(
+                    estimate,
+                    budget,
+                    training_args.per_device_train_batch_size,
+                    training_args.gradient_accumulation_steps,
+                    gradient_checkpointing=MEMORY_CONFIG['gradient_checkpointing'],
+                    world_size=self.world_size
+                )
+                plan['breakdown'] = dict(estimate.breakdown(plan['micro_batch'], plan['gradient_checkpointing']),
+                                         budget_mb=budget)
+        # Every rank must run the same batch size, accumulation and checkpointing
+        plan = broadcast_object(plan)
+        if plan is None:
+            return None
+
+        memory = plan['breakdown']
+        dataset = f", dataset {memory['dataset_mb'] / 1024:.2f} GB (memory-mapped)" if memory['dataset_mb'] else ""
+        self.logger.log("SYSTEM", (
+            f"Memory: parameters {memory['parameters_mb'] / 1024:.2f} GB, gradients {memory['gradients_mb'] / 1024:.2f} GB, "
+            f"optimizer {memory['optimizer_mb'] / 1024:.2f} GB, activations {memory['activations_mb'] / 1024:.2f} GB "
+            f"at micro-batch {memory['micro_batch']}{dataset}"
+        ), **memory)
+        if plan['gradient_checkpointing']:
+            training_args.gradient_checkpointing = True
+            training_args.gradient_checkpointing_kwargs = {"use_reentrant": False}
+        if plan['micro_batch'] != training_args.per_device_train_batch_size:
+            self.logger.log("SYSTEM", (
+                f"Memory budget: micro-batch {training_args.per_device_train_batch_size} -> {plan['micro_batch']} "
+                f"x {plan['gradient_accumulation_steps']} accumulation steps"
+            ))
+            training_args.per_device_train_batch_size = plan['micro_batch']
+            training_args.per_device_eval_batch_size = min(training_args.per_device_eval_batch_size, plan['micro_batch'])
+            training_args.gradient_accumulation_steps = plan['gradient_accumulation_steps']
+        budget = memory['budget_mb']
+        checkpointing = "on" if plan['gradient_checkpointing'] else "off"
+        if budget is None:
+            self.logger.log("SYSTEM", f"Predicted peak RSS {memory['estimated_peak_mb'] / 1024:.2f} GB, "
+                                      f"gradient checkpointing {checkpointing}")
+        elif plan['fits']:
+            self.logger.log("SYSTEM", f"Predicted peak RSS {memory['estimated_peak_mb'] / 1024:.2f} GB of a "
+                                      f"{budget / 1024:.2f} GB budget, gradient checkpointing {checkpointing}")
+        else:
+            self.logger.log("WARNING", (
+                f"Predicted peak RSS {memory['estimated_peak_mb'] / 1024:.2f} GB exceeds the {budget / 1024:.2f} GB "
+                f"budget even at micro-batch 1 with gradient checkpointing {checkpointing}; "
+                "shorten TOKENIZATION_CONFIG['max_length'] or raise the budget"
+            ))
+        self.memory = memory
+        self.report_memory()
+        return plan
+
+    def report_memory(self):
+        """Memory breakdown plus the measured step and run peak RSS, for the dashboard's memory panel"""
+        if self.memory is None or not hasattr(self.window, 'update_memory'):
+            return
+        memory = dict(self.memory)
+        if self.memory_callback is not None and self.memory_callback.step_peak_mb:
+            memory['peak_rss_mb'] = self.memory_callback.step_peak_mb
+            memory['run_peak_rss_mb'] = self.memory_callback.run_peak_mb
+        self.window.update_memory(**memory)
+
+    def run_config(self, training_args, max_length: int) -> dict:
+        """What the run registry shows to tell runs apart"""
+        return {
+            'model': getattr(self.model.config, 'name_or_path', None) or type(self.model).__name__,
+            'dataset': DATASET_CONFIG,
+            'strategy': TOKENIZATION_CONFIG['strategy'],
+            'max_length': max_length,
+            'learning_rate': training_args.learning_rate,
+            'batch_size': training_args.per_device_train_batch_size,
+            'gradient_accumulation_steps': training_args.gradient_accumulation_steps,
+            'world_size': self.world_size,
+            'epochs': training_args.num_train_epochs,
+            'max_steps': training_args.max_steps,
+            'bf16': training_args.bf16,
+            'gradient_checkpointing': training_args.gradient_checkpointing,
+        }
+
+    def start_run_log(self, config: dict = None):
+        """Open a fresh run log, register it, and tell the window where it lives (for Export Metrics)"""
+        run_dir = os.path.join(RUN_LOG_CONFIG['dir'], time.strftime("run-%Y%m%d-%H%M%S"))
+        self.run_log = RunLog(
+            run_dir,
+            flush_rows=RUN_LOG_CONFIG['flush_rows'],
+            flush_interval=RUN_LOG_CONFIG['flush_interval']
+        )
+        RunRegistry(RUN_LOG_CONFIG['dir']).register(run_dir, config)
+        if hasattr(self.window, 'set_run_dir'):
+            self.window.set_run_dir(run_dir)
+        self.logger.log("INFO", f"Logging metrics to {run_dir}")
+        return run_dir
+
+    def show_profile(self, report: dict):
+        """Profiler results to the dashboard's profile panel, or as log lines when headless"""
+        lines = format_profile(report)
+        self.logger.log("PROFILE", lines[0], **report["phases"])
+        if hasattr(self.window, 'update_profile'):
+            self.window.update_profile(report)
+            return
+        for line in lines[1:]:
+            self.logger.log("PROFILE", line)
+
+    def close_checkpoint_writer(self):
+        """Flush pending background checkpoint writes"""
+        if self.checkpoint_writer is not None:
+            try:
+                self.checkpoint_writer.close()
+            except RuntimeError as e:
+                self.logger.log("ERROR", f"{e}: {e.__cause__}")
+            self.checkpoint_writer = None
+
+    def close_run_log(self):
+        if self.run_log is not None:
+            self.run_log.close()
+            if self.error is not None:
+                status = "failed"
+            elif self.control.stop_requested:
+                status = "stopped"
+            else:
+                status = "completed"
+            RunRegistry(RUN_LOG_CONFIG['dir']).finish(self.run_log.run_dir, status)
+            self.run_log = None
+
+    def release_model(self):
+        """Drop the model (and with the trainer, its optimizer state) while paused on a checkpoint"""
+        self.model = None
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def initialize_model(self, path: str = "gpt2"):
+        """Load the model from the hub, or from a local checkpoint directory when resuming"""
         self.logger.log("INFO", "Initializing model...")
-        self.model = GPT2LMHeadModel.from_pretrained("gpt2")
+        self.model = GPT2LMHeadModel.from_pretrained(path)
         self.logger.log("INFO", "Model initialized.")
 
     def train(self, training_args: TrainingArguments):
         try:
-            # Loading dataset (10% of progress)
-            self.load_dataset()
-            self.update_progress(10)
+            max_length = TOKENIZATION_CONFIG['max_length']
+            streaming = STREAMING_CONFIG['enabled']
 
-            # Tokenizing (20% of progress)
-            self.logger.log("INFO", "Tokenizing dataset...")
-            tokenized_datasets = self.tokenizer.tokenize_dataset(self.dataset)
-            self.logger.log("INFO", "Dataset tokenized.")
-            self.update_progress(20)
+            if streaming:
+                # Shards are tokenized on the fly, so loading and tokenizing are instant
+                tokenized_datasets = self.load_streaming_datasets(max_length)
+                if training_args.max_steps <= 0:
+                    training_args.max_steps = STREAMING_CONFIG['max_steps']
+                    self.logger.log("INFO", f"Dataset length unknown; training for {training_args.max_steps} steps.")
+                self.update_progress(30)
+            else:
+                # Data-parallel ranks wait for rank 0 to build the caches, then read them
+                with training_args.main_process_first(desc="dataset loading and tokenization"):
+                    # Loading dataset (10% of progress)
+                    self.load_dataset()
+                    self.update_progress(10)
+
+                    # Tokenizing (20% of progress)
+                    self.logger.log("INFO", "Tokenizing dataset...")
+                    tokenized_datasets = self.tokenize_dataset(max_length)
+                    self.logger.log("INFO", "Dataset tokenized.")
+                for line in self.tokenizer.summarize_stats(
+                    training_args.per_device_train_batch_size,
+                    training_args.gradient_accumulation_steps,
+                    max_length
+                ):
+                    self.logger.log("INFO", line)
+                self.update_progress(20)
+
+            eval_dataset, token_metrics = self.prepare_evaluation(tokenized_datasets["validation"], training_args)
 
             # Model initialization (10% of progress)
             self.initialize_model()
+            self.tune_cpu(tokenized_datasets["train"], training_args)
+            self.find_batch_size(tokenized_datasets["train"], training_args, max_length)
+            self.plan_memory(tokenized_datasets["train"], training_args)
             self.update_progress(10)
 
             # Training loop (60% of progress)
             self.logger.log("INFO", "Starting training...")
             num_epochs = training_args.num_train_epochs
             progress_per_epoch = 60 / num_epochs
+            if self.rank == 0:
+                self.start_run_log(self.run_config(training_args, max_length))
+            process = psutil.Process()
+            psutil.cpu_percent(None)  # Prime the counter; the first call always returns 0
+            step_timer = StepTimer(synchronize=THROUGHPUT_CONFIG['synchronize_cuda'])
+            self.throughput = ThroughputMeter(alpha=THROUGHPUT_CONFIG['ema_alpha'])
 
             class ProgressCallback(TrainerCallback):
                 def __init__(self, trainer_instance):
                     self.trainer = trainer_instance
                     self.current_epoch = 0
                     self.progress_per_epoch = progress_per_epoch
-                    self.loss_history = []
-                    self.lr_history = []
-                    self.accuracy_history = []
+                    # Array-backed histories: O(1) appends and window means, downsampled for plotting
+                    self.loss_history = MetricSeries("loss", window=50)
+                    self.lr_history = MetricSeries("learning_rate", window=None)
+                    self.accuracy_history = MetricSeries("accuracy", window=None)
+                    self.last_eval_loss = None
                     self.window_size = 10  # Number of recent values to average
+                    # Headless sinks (e.g. ConsoleLogger) only implement LoggerInterface: skip plots entirely
+                    window = trainer_instance.window
+                    self.show_plots = hasattr(window, 'update_loss_plot')
+                    self.show_metrics = hasattr(window, 'update_training_metrics')
+
+                def record_metrics(self, args, state, logs):
+                    """Append every numeric log value plus throughput and system stats to the run log"""
+                    now = time.time()
+                    row = {name: value for name, value in logs.items() if isinstance(value, (int, float))}
+                    row['step'] = state.global_step
+                    row['max_steps'] = state.max_steps
+                    row['epoch'] = state.epoch or 0.0
+                    if 'loss' in logs and self.trainer.throughput.steps:
+                        # Smoothed speed and step-time split (eval/summary rows are skipped)
+                        row.update(self.trainer.throughput.summary(state.max_steps - state.global_step))
+                        row['steps_per_second'] = 1.0 / self.trainer.throughput.step_time
+                        for rank, busy in enumerate(self.trainer.throughput.rank_step_times()):
+                            row[f'rank{rank}_step_time'] = busy
+                    row['cpu_percent'] = psutil.cpu_percent(None)
+                    row['memory_percent'] = psutil.virtual_memory().percent
+                    row['rss_mb'] = process.memory_info().rss / (1024 * 1024)
+                    memory_callback = self.trainer.memory_callback
+                    if memory_callback is not None and memory_callback.step_peak_mb:
+                        row['peak_rss_mb'] = memory_callback.step_peak_mb
+                    row['timestamp'] = now
+                    self.trainer.run_log.append(**row)
         
+                def report_throughput(self, state):
+                    meter = self.trainer.throughput
+                    if not meter.steps:
+                        return
+                    summary = meter.summary(state.max_steps - state.global_step)
+                    rank_times = meter.rank_step_times()
+                    if hasattr(self.trainer.window, 'update_throughput'):
+                        self.trainer.window.update_throughput(**summary)
+                        if rank_times and hasattr(self.trainer.window, 'update_rank_step_times'):
+                            self.trainer.window.update_rank_step_times(rank_times)
+                        return
+                    # Headless: the numbers go to the log instead of the cards
+                    split = ", ".join(f"{phase} {fraction:.0%}" for phase, fraction in meter.phase_fractions().items())
+                    eta = summary.get('eta_seconds', 0)
+                    ranks = ""
+                    if rank_times:
+                        ranks = ", ranks busy " + "/".join(f"{busy * 1000:.0f}" for busy in rank_times) + " ms"
+                    peak = ""
+                    memory_callback = self.trainer.memory_callback
+                    if memory_callback is not None and memory_callback.step_peak_mb:
+                        peak = f", peak RSS {memory_callback.step_peak_mb / 1024:.2f} GB"
+                    self.trainer.logger.log(
+                        "SPEED",
+                        f"{summary['samples_per_second']:.1f} samples/s, {summary['tokens_per_second']:.0f} tokens/s, "
+                        f"{summary['step_time'] * 1000:.0f} ms/step ({split}){ranks}{peak}, "
+                        f"ETA {int(eta // 3600)}:{int(eta % 3600 // 60):02d}:{int(eta % 60):02d}",
+                        **summary
+                    )
+
+                def on_step_end(self, args, state, control, **kwargs):
+                    self.trainer.logger.step = state.global_step
+
                 def on_epoch_end(self, args, state, control, **kwargs):
                     self.current_epoch += 1
+                    if streaming:
+                        # Epochs are meaningless without a dataset length; progress follows steps
+                        return
                     self.trainer.update_progress(self.progress_per_epoch)
                     self.trainer.logger.log("EPOCH", f"Epoch {self.current_epoch}/{num_epochs} completed")
 
                 def on_log(self, args, state, control, logs=None, **kwargs):
+                    if logs is not None and self.trainer.run_log is not None:
+                        self.record_metrics(args, state, logs)
+                    if logs is not None and 'eval_loss' in logs:
+                        self.report_evaluation(args, state, logs)
                     if logs is not None and 'loss' in logs:
                         self.loss_history.append(logs['loss'])
-                        if 'eval_accuracy' in logs:
-                            self.accuracy_history.append(logs['eval_accuracy'])
 
                         # Add learning rate tracking
                         if 'learning_rate' in logs:
-                            learning_rate = logs['learning_rate']
                             self.lr_history.append(logs['learning_rate'])
-                            self.trainer.window.update_lr_plot(self.lr_history)
+                            if self.show_plots:
+                                self.trainer.window.update_lr_plot(self.lr_history)
 
                         # Update the loss plot
-                        self.trainer.window.update_loss_plot(self.loss_history)
+                        if self.show_plots:
+                            self.trainer.window.update_loss_plot(self.loss_history)
             
-                        # Calculate running averages
-                        recent_losses = self.loss_history[-self.window_size:]
-                        avg_loss = sum(recent_losses) / len(recent_losses)
-                        total_epochs = args.num_train_epochs
-            
-                        avg_accuracy = None
-                        if self.accuracy_history:
-                            recent_accuracy = self.accuracy_history[-self.window_size:]
-                            avg_accuracy = sum(recent_accuracy) / len(recent_accuracy)
-            
-                        self.trainer.logger.log("TRAINING", f"Loss: {logs['loss']:.4f}")
+                        self.trainer.logger.log("TRAINING", f"Loss: {logs['loss']:.4f}", loss=logs['loss'],
+                                                learning_rate=logs.get('learning_rate'))
+                        self.report_throughput(state)
+                        self.trainer.report_memory()
+                        if streaming:
+                            target = 40 + 60 * state.global_step / state.max_steps
+                            self.trainer.update_progress(target - self.trainer.current_progress)
+                        self.update_metric_cards(args, state)
+
+                def report_evaluation(self, args, state, logs):
+                    accuracy = logs.get('eval_accuracy')
+                    if accuracy is not None:
+                        self.accuracy_history.append(accuracy * 100)
+                    self.last_eval_loss = logs['eval_loss']
+                    details = [f"loss {logs['eval_loss']:.4f}"]
+                    if accuracy is not None:
+                        details.append(f"token accuracy {accuracy:.2%}")
+                    if 'eval_perplexity' in logs:
+                        details.append(f"perplexity {logs['eval_perplexity']:.2f}")
+                    if 'eval_runtime' in logs:
+                        details.append(f"{logs['eval_runtime']:.1f}s")
+                    self.trainer.logger.log("EVAL", f"Step {state.global_step}: " + ", ".join(details),
+                                            **{name: value for name, value in logs.items() if name.startswith('eval_')})
+                    self.update_metric_cards(args, state)
+
+                def update_metric_cards(self, args, state):
+                    if not self.show_metrics:
+                        return
+                    metrics = dict(
+                        # Running average of training loss; accuracy is from the latest evaluation
+                        loss=self.loss_history.window_mean(self.window_size) if len(self.loss_history) else 0.0,
+                        accuracy=self.accuracy_history.last,
+                        learning_rate=self.lr_history.last or 0.0,
+                        validation_loss=self.last_eval_loss
+                    )
+                    if streaming:
+                        self.trainer.window.update_training_metrics(
+                            step=state.global_step, total_steps=state.max_steps, **metrics
+                        )
+                    else:
                         self.trainer.window.update_training_metrics(
-                            epoch=state.epoch,
-                            loss=avg_loss,
-                            accuracy=avg_accuracy,
-                            learning_rate=learning_rate,
-                            total_epochs=total_epochs
+                            epoch=state.epoch, total_epochs=args.num_train_epochs, **metrics
                         )
 
                 def on_train_begin(self, args, state, control, **kwargs):
-                    self.trainer.logger.log("TRAINING", "Training started")
+                    if state.global_step:
+                        self.trainer.logger.log("TRAINING", f"Training resumed at step {state.global_step}")
+                    else:
+                        self.trainer.logger.log("TRAINING", "Training started")
 
                 def on_train_end(self, args, state, control, **kwargs):
+                    if self.trainer.control.paused or self.trainer.control.stop_requested:
+                        return
                     self.trainer.logger.log("TRAINING", "Training completed")
 
-            trainer = Trainer(
-                model=self.model,
-                args=training_args,
-                train_dataset=tokenized_datasets["train"],
-                eval_dataset=tokenized_datasets["validation"],
-                callbacks=[ProgressCallback(self)]
+            # Built once: progress histories survive a pause that rebuilds the Trainer
+            control_callback = ControlCallback(
+                self.control,
+                self.logger.log,
+                checkpoint_on_pause=CONTROL_CONFIG['checkpoint_on_pause'],
+                checkpoint_on_stop=CONTROL_CONFIG['checkpoint_on_stop']
             )
+            callbacks = [ProgressCallback(self)]
+            if isinstance(self.control, RankControl):
+                # Ranks must agree on Pause/Stop before ControlCallback acts on them
+                callbacks.append(ControlSyncCallback(self.control))
+            callbacks.append(control_callback)
+            callbacks.append(StepTimingCallback(
+                step_timer, self.throughput, reduce_stats=gather_step_stats if self.world_size > 1 else None
+            ))
+            if MEMORY_CONFIG['enabled']:
+                self.memory_callback = PeakMemoryCallback(PeakRSSMeter())
+                callbacks.append(self.memory_callback)
+            step_profiler = None
+            if self.rank == 0:
+                # Idle until the Profile button (or PROFILER_CONFIG['at_step']) asks for a capture
+                step_profiler = StepProfiler(
+                    steps=PROFILER_CONFIG['steps'],
+                    warmup_steps=PROFILER_CONFIG['warmup_steps'],
+                    top_ops=PROFILER_CONFIG['top_ops'],
+                    record_shapes=PROFILER_CONFIG['record_shapes'],
+                    with_stack=PROFILER_CONFIG['with_stack']
+                )
+                callbacks.append(ProfilerCallback(
+                    step_profiler,
+                    self.control,
+                    trace_dir=self.run_log.run_dir if self.run_log is not None else training_args.output_dir,
+                    on_report=self.show_profile,
+                    at_step=PROFILER_CONFIG['at_step'],
+                    log=self.logger.log
+                ))
+
+            if CHECKPOINT_CONFIG['async']:
+                self.checkpoint_writer = AsyncCheckpointWriter(
+                    keep_last=CHECKPOINT_CONFIG['keep_last'],
+                    keep_best=CHECKPOINT_CONFIG['keep_best'],
+                    log_callback=self.logger.log
+                )
+
+            resume_from = None
+            while True:
+                trainer = ResumableTrainer(
+                    model=self.model,
+                    args=training_args,
+                    train_dataset=tokenized_datasets["train"],
+                    eval_dataset=eval_dataset,
+                    compute_metrics=token_metrics,
+                    preprocess_logits_for_metrics=token_metrics.preprocess_logits if token_metrics else None,
+                    data_collator=CausalLMCollator(),
+                    callbacks=callbacks,
+                    checkpoint_writer=self.checkpoint_writer,
+                    step_timer=step_timer,
+                    step_profiler=step_profiler
+                )
+                trainer.train(resume_from_checkpoint=resume_from)
 
-            trainer.train()
-            self.logger.log("INFO", "Training complete!")
-            self.update_progress(100)  # Ensure we reach 100%
+                resume_from = control_callback.take_released_checkpoint()
+                if resume_from is None:
+                    break
+                # Paused on a checkpoint: free the model and optimizer until the user resumes
+                trainer = None
+                if self.checkpoint_writer is not None:
+                    self.checkpoint_writer.wait()
+                self.release_model()
+                self.logger.log("SYSTEM", f"Paused; checkpoint saved to {resume_from}, model released from memory")
+                if not self.control.wait_until_resumed():
+                    break
+                self.logger.log("SYSTEM", f"Resuming from {resume_from}")
+                # The pause checkpoint holds the trained weights; the hub model would be thrown away
+                self.initialize_model(resume_from)
+
+            if self.control.stop_requested:
+                self.logger.log("INFO", "Training stopped.")
+            else:
+                self.logger.log("INFO", "Training complete!")
+                self.update_progress(100)  # Ensure we reach 100%
             
         except Exception as e:
             import traceback
+            self.error = e
             self.logger.log("ERROR", f"Training failed: {str(e)}\n{traceback.format_exc()}")
+        finally:
+            self.close_checkpoint_writer()
+            self.close_run_log()
+            if self.memory_callback is not None:
+                self.memory_callback.meter.close()
+            # Everything logged so far reaches the window and the log file before train() returns
+            self.logger.flush()
+
+    def close(self):
+        """Stop the log writer thread and close the log file; call once the trainer is done with"""
+        self.logger.close()
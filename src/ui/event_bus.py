@@ -0,0 +1,87 @@
+import time
+import traceback
+from collections import deque
+from tkinter import TclError
+
+
+class UIEventBus:
+    """Hands events from worker threads to the Tk main loop.
+
+    publish() only appends to a deque (atomic in CPython, no lock), so the
+    training thread never waits on the UI. The main loop drains the queue
+    with window.after at most max_fps times per second and coalesces each
+    burst: "latest" handlers receive only the newest event of their kind,
+    "batch" handlers receive every queued event in one call, and frame
+    callbacks (e.g. the canvas redraw) run once per frame that applied
+    anything.
+    """
+
+    def __init__(self, root, max_fps: int = 20):
+        self.root = root
+        self.interval_ms = max(1, int(1000 / max_fps))
+        self._events = deque()
+        self._handlers = {}
+        self._frame_callbacks = []
+        self._running = False
+        self.last_frame_time = 0.0
+
+    def register(self, kind: str, handler, batch: bool = False):
+        self._handlers[kind] = (handler, batch)
+
+    def on_frame(self, callback):
+        self._frame_callbacks.append(callback)
+
+    def publish(self, kind: str, *args, **kwargs):
+        self._events.append((kind, args, kwargs))
+
+    def pending(self) -> int:
+        return len(self._events)
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        self._running = False
+
+    def drain(self) -> int:
+        """Apply everything queued so far; returns the number of handler calls"""
+        latest = {}
+        batches = {}
+        for _ in range(len(self._events)):
+            kind, args, kwargs = self._events.popleft()
+            handler = self._handlers.get(kind)
+            if handler is None:
+                continue
+            if handler[1]:
+                batches.setdefault(kind, []).append(args)
+            else:
+                latest[kind] = (args, kwargs)
+
+        for kind, (args, kwargs) in latest.items():
+            self._handlers[kind][0](*args, **kwargs)
+        for kind, entries in batches.items():
+            self._handlers[kind][0](entries)
+
+        applied = len(latest) + len(batches)
+        if applied:
+            for callback in self._frame_callbacks:
+                callback()
+        return applied
+
+    def _tick(self):
+        if not self._running:
+            return
+        start = time.perf_counter()
+        try:
+            self.drain()
+        except TclError:
+            # Window was destroyed while events were in flight
+            self._running = False
+            return
+        except Exception:
+            # A failing handler must not stop later frames
+            traceback.print_exc()
+        self.last_frame_time = time.perf_counter() - start
+        self.root.after(self.interval_ms, self._tick)
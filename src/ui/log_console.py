@@ -0,0 +1,112 @@
+import heapq
+from array import array
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+LogEntry = Tuple[float, str, str]
+
+
+class LogStore:
+    """Append-only history of (timestamp, category, message) with a per-category index"""
+
+    def __init__(self):
+        self.timestamps = array("d")
+        self.categories: List[str] = []
+        self.messages: List[str] = []
+        self.by_category = {}
+
+    def __len__(self):
+        return len(self.messages)
+
+    def extend(self, entries: Iterable[LogEntry]):
+        for timestamp, category, message in entries:
+            index = len(self.messages)
+            self.timestamps.append(timestamp)
+            self.categories.append(category)
+            self.messages.append(message)
+            self.by_category.setdefault(category.upper(), array("l")).append(index)
+
+    def entry(self, index: int) -> LogEntry:
+        return self.timestamps[index], self.categories[index], self.messages[index]
+
+    def _candidate_indices(self, categories: Optional[Sequence[str]]):
+        """Indices newest-first, restricted to the given categories (lazy, no full scan)"""
+        if not categories:
+            return range(len(self.messages) - 1, -1, -1)
+        indexes = [reversed(self.by_category.get(category.upper(), ())) for category in categories]
+        return heapq.merge(*indexes, reverse=True)
+
+    def tail(self, limit: int, categories: Optional[Sequence[str]] = None, query: str = "") -> List[int]:
+        """Return the indices of the newest `limit` matching entries, oldest first"""
+        query = query.lower()
+        matches = []
+        for index in self._candidate_indices(categories):
+            if query and query not in self.messages[index].lower():
+                continue
+            matches.append(index)
+            if len(matches) >= limit:
+                break
+        matches.reverse()
+        return matches
+
+
+class LogConsole:
+    """Keeps the last max_lines entries in a Text widget and the full history in a LogStore.
+
+    Entries arrive in batches (one per UI frame) and are inserted with a
+    single widget call; the oldest lines are trimmed from the top so the
+    widget never grows past max_lines. Changing the category filter or
+    search query re-renders only the newest max_lines matches from the index.
+    """
+
+    def __init__(self, text_widget, max_lines: int = 1000):
+        self.text = text_widget
+        self.max_lines = max_lines
+        self.store = LogStore()
+        self.categories: Optional[List[str]] = None
+        self.query = ""
+        self.visible_lines = 0
+
+    @staticmethod
+    def format_entry(entry: LogEntry) -> str:
+        timestamp, category, message = entry
+        formatted_time = datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
+        return f"[{formatted_time}] [{category}] {message}\n"
+
+    def _matches(self, entry: LogEntry) -> bool:
+        _, category, message = entry
+        if self.categories and category.upper() not in self.categories:
+            return False
+        return not self.query or self.query in message.lower()
+
+    def append_batch(self, entries: Sequence[LogEntry]):
+        self.store.extend(entries)
+        visible = [entry for entry in entries if self._matches(entry)]
+        if not visible:
+            return
+        # Only the newest max_lines of a large burst can stay on screen anyway
+        visible = visible[-self.max_lines:]
+        self.text.insert("end", "".join(self.format_entry(entry) for entry in visible))
+        self.visible_lines += sum(entry[2].count("\n") + 1 for entry in visible)
+        self._trim()
+        self.text.see("end")
+
+    def _trim(self):
+        excess = self.visible_lines - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self.visible_lines -= excess
+
+    def set_filter(self, categories: Optional[Sequence[str]] = None, query: str = ""):
+        self.categories = [category.upper() for category in categories] if categories else None
+        self.query = query.lower()
+        self.refresh()
+
+    def refresh(self):
+        indices = self.store.tail(self.max_lines, self.categories, self.query)
+        entries = [self.store.entry(index) for index in indices]
+        self.text.delete("1.0", "end")
+        self.text.insert("end", "".join(self.format_entry(entry) for entry in entries))
+        self.visible_lines = sum(entry[2].count("\n") + 1 for entry in entries)
+        self._trim()
+        self.text.see("end")
@@ -0,0 +1,89 @@
+import time
+
+
+class BlitPlotRenderer:
+    """Redraws only the data lines of a Matplotlib figure between full renders.
+
+    The line artists are marked animated so a full canvas.draw() renders the
+    static parts (axes, ticks, labels, legends) once; the result is cached
+    from the draw_event and each frame restores it and blits the lines. A
+    full draw happens only when an axis limit changed or the canvas was
+    resized. y-limits are managed with headroom via fit_y so steadily moving
+    data does not force a full draw every frame.
+    """
+
+    def __init__(self, canvas, lines, debug_overlay: bool = False):
+        self.canvas = canvas
+        self.figure = canvas.figure
+        self.lines = list(lines)
+        self.axes = []
+        for line in self.lines:
+            line.set_animated(True)
+            if line.axes not in self.axes:
+                self.axes.append(line.axes)
+
+        self._background = None
+        self._limits = None
+        self.full_draws = 0
+        self.blits = 0
+        self.last_render_time = 0.0
+
+        self.overlay = None
+        if debug_overlay:
+            self.overlay = self.figure.text(0.01, 0.01, "", color="yellow", fontsize=8, animated=True)
+
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _current_limits(self):
+        return [(ax.get_xlim(), ax.get_ylim()) for ax in self.axes]
+
+    def _on_draw(self, event):
+        # Any full draw (ours, a resize, a theme change) refreshes the cached background
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._limits = self._current_limits()
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for line in self.lines:
+            line.axes.draw_artist(line)
+        if self.overlay is not None:
+            self.figure.draw_artist(self.overlay)
+
+    @staticmethod
+    def fit_y(ax, low, high, margin: float = 0.2, shrink_ratio: float = 4.0):
+        """Set y-limits only when data leaves the view or occupies a small part of it"""
+        if low is None or high is None:
+            return
+        view_low, view_high = ax.get_ylim()
+        # A floor relative to the magnitude keeps nearly flat series (e.g. LR) from
+        # re-fitting on every tiny change
+        span = max(high - low, 0.05 * max(abs(high), abs(low)), 1e-12)
+        outside = low < view_low or high > view_high
+        too_loose = (view_high - view_low) > shrink_ratio * span
+        if outside or too_loose:
+            ax.set_ylim(low - margin * span, high + margin * span)
+
+    def invalidate(self):
+        """Static content changed (e.g. lines or a legend added); the next render is a full draw"""
+        self._background = None
+
+    def render(self):
+        start = time.perf_counter()
+        if self._background is None or self._limits != self._current_limits():
+            mode = "full"
+            self.full_draws += 1
+            self.canvas.draw()
+        else:
+            mode = "blit"
+            self.blits += 1
+            self.canvas.restore_region(self._background)
+            self._draw_animated()
+            self.canvas.blit(self.figure.bbox)
+        self.last_render_time = time.perf_counter() - start
+
+        if self.overlay is not None:
+            # Shown on the next frame: the text is part of what it measures
+            self.overlay.set_text(
+                f"render {self.last_render_time * 1000:.1f} ms ({mode}) | full {self.full_draws} / blit {self.blits}"
+            )
+        return mode
@@ -27,5 +27,14 @@ UI_STYLES = {
         'small': 5,
         'medium': 10,
         'large': 20
+    },
+    'console': {
+        'max_lines': 1000,         # Lines kept in the log widget; full history stays indexed
+        'categories': ["All", "TRAINING", "EPOCH", "ERROR", "Tokenization", "INFO", "SYSTEM"]
+    },
+    'refresh': {
+        'max_fps': 20,             # Cap on UI frames driven by training events
+        'debug_overlay': False,    # Show per-frame plot render time on the graphs
+        'watch_interval_ms': 1000  # How often a watched run log is polled for new rows
     }
 }
\ No newline at end of file
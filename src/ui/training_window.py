@@ -2,16 +2,70 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import scrolledtext
 from datetime import datetime
-import psutil
+import numpy as np
 import time
+import threading
 from threading import Thread
 from src.ui.styles import UI_STYLES
+from src.ui.event_bus import UIEventBus
+from src.ui.plot_renderer import BlitPlotRenderer
+from src.ui.log_console import LogConsole
+from src.utils.metric_series import MetricSeries
+from src.utils.run_log import RunLogReader, export_run
+from src.utils.run_registry import RunRegistry
+from src.utils.telemetry import TelemetrySampler
+from src.config.training_config import RUN_LOG_CONFIG, TELEMETRY_CONFIG
+
+CORE_BARS = "▁▂▃▄▅▆▇█"
+# A data-parallel rank this much busier per step than the median holds the others back
+STRAGGLER_RATIO = 1.2
+# Line colours of runs overlaid for comparison (distinct from the live cyan/red/yellow lines)
+OVERLAY_COLORS = ("#4287f5", "#2ecc71", "#e67e22", "#9b59b6", "#e84393", "#95a5a6", "#1abc9c", "#f8a5c2")
+# Run log columns written by the trainer's ThroughputMeter (see update_throughput)
+THROUGHPUT_COLUMNS = ("step_time", "samples_per_second", "tokens_per_second", "data_time",
+                      "compute_time", "optimizer_time", "other_time", "eta_seconds")
 
 class TrainingProgressWindow:
     def __init__(self, title="LLM Training Dashboard"):
         self.window = self._setup_window(title)
+        # Calls from any other thread (e.g. the trainer) are queued on the event bus
+        self._ui_thread_id = threading.get_ident()
+        self.events = UIEventBus(self.window, UI_STYLES['refresh']['max_fps'])
+        self._plot_dirty = False
+        self.run_dir = None
+        self._export_thread = None
+        self.run_registry = RunRegistry(RUN_LOG_CONFIG['dir'])
+        self._compare_dialog = None
+        self.training_control = None
+        self.training_suspended = False
+        self.training_terminated = False
         self._setup_layout()
+        self._register_event_handlers()
         self.running = True
+        self.events.start()
+
+    def _on_ui_thread(self):
+        return threading.get_ident() == self._ui_thread_id
+
+    def _register_event_handlers(self):
+        self.events.register("log", self._append_log_entries, batch=True)
+        self.events.register("progress", self._set_progress)
+        self.events.register("metrics", self._apply_training_metrics)
+        self.events.register("loss", self._set_loss_data)
+        self.events.register("lr", self._set_lr_data)
+        self.events.register("telemetry", self._apply_telemetry)
+        self.events.register("throughput", self._apply_throughput)
+        self.events.register("ranks", self._apply_rank_step_times)
+        self.events.register("runs", self._show_runs)
+        self.events.register("overlay", self._apply_overlay)
+        self.events.register("profile", self._show_profile)
+        self.events.register("memory", self._apply_memory)
+        self.events.on_frame(self._redraw_if_dirty)
+
+    def _redraw_if_dirty(self):
+        if self._plot_dirty:
+            self._plot_dirty = False
+            self.renderer.render()
 
     def _setup_window(self, title):
         window = ttk.Window(title=title, themename="cyborg")
@@ -22,6 +76,8 @@ class TrainingProgressWindow:
         
         # Make window responsive
         window.bind('<Configure>', self._on_window_resize)
+        # Closing the window also stops training instead of orphaning the trainer thread
+        window.protocol("WM_DELETE_WINDOW", self.close)
         return window
 
     def _on_window_resize(self, event):
@@ -132,25 +188,26 @@ class TrainingProgressWindow:
         self._create_log_console(main_column)
 
     def _create_metrics_cards(self, parent):
-
-        metrics_frame = ttk.Frame(parent, bootstyle="dark")
-        metrics_frame.pack(fill=X, pady=10)
-
-        # Initialize metric label references
-        self.epoch_label = None
-        self.training_loss_label = None 
-        self.validation_loss_label = None
-        self.accuracy_label = None
-        self.learning_rate_label = None
-
         # Create metric cards with stored references
-        metrics = [
+        self._create_card_row(parent, [
             ("Epochs", "0/0", "epoch_label"),
             ("Training Loss", "0.000", "training_loss_label"),
             ("Validation Loss", "0.000", "validation_loss_label"), 
             ("Accuracy", "0%", "accuracy_label"),
             ("Learning Rate", "0.000", "learning_rate_label")
-        ]
+        ])
+
+        # Live speed figures, smoothed by the trainer's ThroughputMeter
+        self._create_card_row(parent, [
+            ("Samples/sec", "-", "samples_per_second_label"),
+            ("Tokens/sec", "-", "tokens_per_second_label"),
+            ("Step Time", "-", "step_time_label"),
+            ("Data / Compute / Optim", "-", "step_breakdown_label")
+        ])
+
+    def _create_card_row(self, parent, metrics):
+        metrics_frame = ttk.Frame(parent, bootstyle="dark")
+        metrics_frame.pack(fill=X, pady=10)
 
         # Create metric cards in a horizontal layout
         for label, initial_value, attr_name in metrics:
@@ -176,7 +233,9 @@ class TrainingProgressWindow:
 
     def _create_right_sidebar(self):
 
-        self._create_model_details()
+        details_frame = self._create_model_details()
+        self._create_memory_panel(details_frame)
+        self._create_profile_panel(details_frame)
 
     def _create_footer(self):
         footer = ttk.Frame(self.main_container, bootstyle="dark")
@@ -187,21 +246,23 @@ class TrainingProgressWindow:
         
         button_style = {'width': 15, 'padding': 10}
         
-        ttk.Button(
+        self.pause_button = ttk.Button(
             button_frame,
             text="Pause Training",
             bootstyle="warning",  # Removed -outline for consistency
             command=self.suspend_training,
             **button_style
-        ).pack(side=LEFT, padx=10)
+        )
+        self.pause_button.pack(side=LEFT, padx=10)
 
-        ttk.Button(
+        self.stop_button = ttk.Button(
             button_frame,
             text="Stop Training",
             bootstyle="danger-outline",
             command=self.terminate_training,
             **button_style
-        ).pack(side=LEFT, padx=10)
+        )
+        self.stop_button.pack(side=LEFT, padx=10)
 
         ttk.Button(
             button_frame,
@@ -211,25 +272,282 @@ class TrainingProgressWindow:
             **button_style
         ).pack(side=LEFT, padx=10)
 
+        ttk.Button(
+            button_frame,
+            text="Compare Runs",
+            bootstyle="info-outline",
+            command=self.open_run_comparison,
+            **button_style
+        ).pack(side=LEFT, padx=10)
+
+        ttk.Button(
+            button_frame,
+            text="Profile",
+            bootstyle="info-outline",
+            command=self.request_profile,
+            **button_style
+        ).pack(side=LEFT, padx=10)
+
+    def set_run_dir(self, run_dir: str):
+        """Remember the run log the trainer is writing so Export Metrics can read it"""
+        self.run_dir = run_dir
+
+    def watch_run(self, run_dir: str):
+        """Follow a run log written by another process (e.g. a headless run) and plot it live"""
+        self.set_run_dir(run_dir)
+        self._watch_reader = RunLogReader(run_dir)
+        self._watch_rows = 0
+        self._watch_loss = MetricSeries("loss", window=50)
+        self._watch_lr = MetricSeries("learning_rate", window=None)
+        self._watch_eval = {}
+        self.update_log("SYSTEM", f"Watching run {run_dir}")
+        self._poll_run()
+
+    def _poll_run(self):
+        if not self.running:
+            return
+        # Data-parallel runs also log each rank's busy time per step
+        rank_columns = [f"rank{rank}_step_time" for rank in range(len(self._watch_reader.columns))
+                        if f"rank{rank}_step_time" in self._watch_reader.columns]
+        columns = [name for name in ("loss", "learning_rate", "step", "max_steps", "eval_loss", "eval_accuracy")
+                   + THROUGHPUT_COLUMNS if name in self._watch_reader.columns] + rank_columns
+        latest = None
+        if "loss" in columns:
+            # Only rows appended since the last poll are read
+            for chunk in self._watch_reader.iter_chunks(columns=columns, start=self._watch_rows):
+                self._watch_rows += len(chunk["loss"])
+                trained = ~np.isnan(chunk["loss"])
+                for value in chunk["loss"][trained]:
+                    self._watch_loss.append(value)
+                if "learning_rate" in chunk:
+                    for value in chunk["learning_rate"][trained]:
+                        self._watch_lr.append(value)
+                if trained.any():
+                    latest = {name: chunk[name][trained][-1] for name in columns}
+                if "eval_loss" in chunk:
+                    # Evaluation results are logged on their own rows
+                    evaluated = ~np.isnan(chunk["eval_loss"])
+                    if evaluated.any():
+                        self._watch_eval = {name: float(chunk[name][evaluated][-1])
+                                            for name in ("eval_loss", "eval_accuracy") if name in chunk}
+
+        if latest is not None:
+            self._set_loss_data(self._watch_loss)
+            self._set_lr_data(self._watch_lr)
+            self._apply_training_metrics(
+                loss=self._watch_loss.window_mean(10),
+                learning_rate=self._watch_lr.last or 0.0,
+                step=int(latest.get("step", len(self._watch_loss))),
+                total_steps=int(latest.get("max_steps", 0)) or "?",
+                validation_loss=self._watch_eval.get("eval_loss"),
+                accuracy=self._watch_eval["eval_accuracy"] * 100 if "eval_accuracy" in self._watch_eval else None
+            )
+            throughput = {name: float(latest[name]) for name in THROUGHPUT_COLUMNS
+                          if name in latest and not np.isnan(latest[name])}
+            if "step_time" in throughput:
+                self._apply_throughput(**throughput)
+            rank_times = [float(latest[name]) for name in rank_columns if not np.isnan(latest[name])]
+            if rank_times:
+                self._apply_rank_step_times(rank_times)
+            self._redraw_if_dirty()
+        self.window.after(UI_STYLES['refresh']['watch_interval_ms'], self._poll_run)
+
     def export_metrics(self):
+        if self.run_dir is None:
+            self.update_log("SYSTEM", "No training run to export yet.")
+            return
+        if self._export_thread is not None and self._export_thread.is_alive():
+            self.update_log("SYSTEM", "An export is already running.")
+            return
         self.update_log("SYSTEM", "Exporting training metrics...")
-        # Add export functionality here
+        # Large runs take a while to write; keep the UI responsive
+        self._export_thread = Thread(target=self._export_metrics_worker, args=(self.run_dir,), daemon=True)
+        self._export_thread.start()
+
+    def _export_metrics_worker(self, run_dir):
+        start = time.perf_counter()
+        try:
+            written = export_run(run_dir, chunk_rows=RUN_LOG_CONFIG['export_chunk_rows'])
+        except Exception as e:
+            self.update_log("ERROR", f"Metrics export failed: {e}")
+            return
+        for path in written.values():
+            self.update_log("SYSTEM", f"Exported {path}")
+        self.update_log("SYSTEM", f"Metrics export finished in {time.perf_counter() - start:.1f}s")
+
+    def open_run_comparison(self):
+        """List the runs in the registry; the selected ones are overlaid on the loss and LR charts"""
+        if self._compare_dialog is not None and self._compare_dialog.winfo_exists():
+            self._compare_dialog.lift()
+            return
+        dialog = ttk.Toplevel(title="Compare Runs", transient=self.window)
+        columns = [("started", "Started", 130), ("status", "Status", 80), ("step", "Steps", 80),
+                   ("final_loss", "Final Loss", 90), ("best_eval_loss", "Best Eval", 90),
+                   ("tokens_per_second", "Tokens/s", 90), ("learning_rate", "LR", 80), ("batch", "Batch", 70)]
+        tree = ttk.Treeview(dialog, columns=[name for name, _, _ in columns], selectmode="extended", height=15)
+        tree.heading("#0", text="Run")
+        tree.column("#0", width=170)
+        for name, heading, width in columns:
+            tree.heading(name, text=heading)
+            tree.column(name, width=width, anchor=E)
+        tree.pack(fill=BOTH, expand=YES, padx=10, pady=10)
+
+        buttons = ttk.Frame(dialog)
+        buttons.pack(fill=X, padx=10, pady=(0, 10))
+        ttk.Button(buttons, text="Overlay Selected", bootstyle="info",
+                   command=self.overlay_selected_runs).pack(side=LEFT, padx=5)
+        ttk.Button(buttons, text="Clear Overlay", bootstyle="secondary-outline",
+                   command=lambda: self._apply_overlay([])).pack(side=LEFT, padx=5)
+        ttk.Button(buttons, text="Refresh", bootstyle="info-outline",
+                   command=self.refresh_runs).pack(side=LEFT, padx=5)
+        self._compare_dialog = dialog
+        self._runs_tree = tree
+        self.refresh_runs()
+
+    def refresh_runs(self):
+        # Runs changed since the last listing are re-summarized from their logs
+        Thread(target=self._list_runs_worker, daemon=True).start()
+
+    def _list_runs_worker(self):
+        try:
+            runs = self.run_registry.runs()
+        except Exception as e:
+            self.update_log("ERROR", f"Listing runs failed: {e}")
+            return
+        self.events.publish("runs", runs)
+
+    @staticmethod
+    def _format(value, spec):
+        return "-" if value is None else format(value, spec)
+
+    def _show_runs(self, runs):
+        if self._compare_dialog is None or not self._compare_dialog.winfo_exists():
+            return
+        tree = self._runs_tree
+        selected = tree.selection()
+        tree.delete(*tree.get_children())
+        for run in runs:
+            config = run.get("config", {})
+            batch = config.get("batch_size")
+            if batch is not None:
+                batch *= config.get("gradient_accumulation_steps", 1) * config.get("world_size", 1)
+            started = run.get("started")
+            tree.insert("", END, iid=run["run_dir"], text=run["name"], values=(
+                datetime.fromtimestamp(started).strftime("%Y-%m-%d %H:%M") if started else "-",
+                run.get("status", "-"),
+                self._format(run.get("step"), ".0f"),
+                self._format(run.get("final_loss"), ".4f"),
+                self._format(run.get("best_eval_loss"), ".4f"),
+                self._format(run.get("tokens_per_second"), ".0f"),
+                self._format(config.get("learning_rate"), ".1e"),
+                self._format(batch, "d"),
+            ))
+        tree.selection_set([iid for iid in selected if tree.exists(iid)])
+
+    def overlay_selected_runs(self):
+        selected = self._runs_tree.selection()
+        if not selected:
+            self.update_log("SYSTEM", "Select one or more runs to compare.")
+            return
+        runs = [(run_dir, self._runs_tree.item(run_dir, "text")) for run_dir in selected]
+        points = (self._plot_points(self.loss_ax), self._plot_points(self.lr_ax)) if self.renderer else (1000, 1000)
+        # Curves are read (memory-mapped and downsampled) off the UI thread
+        Thread(target=self._load_overlay_worker, args=(runs, points), daemon=True).start()
+
+    def _load_overlay_worker(self, runs, points):
+        curves = []
+        for run_dir, name in runs:
+            try:
+                curves.append((name, self.run_registry.curve(run_dir, "loss", points[0]),
+                               self.run_registry.curve(run_dir, "learning_rate", points[1])))
+            except (OSError, ValueError) as e:
+                self.update_log("ERROR", f"Could not load {name}: {e}")
+        self.events.publish("overlay", curves)
+
+    def _apply_overlay(self, curves):
+        """Replace the runs drawn behind the live loss and LR lines with curves [(name, loss, lr)]"""
+        if self.renderer is None:
+            self._pending_plots["overlay"] = (curves,)
+            return
+        for line in self._overlay_lines:
+            line.remove()
+        self._overlay_lines = []
+        self._overlay_bounds = {}
+        for index, (name, loss, lr) in enumerate(curves):
+            color = OVERLAY_COLORS[index % len(OVERLAY_COLORS)]
+            for ax, (steps, values) in ((self.loss_ax, loss), (self.lr_ax, lr)):
+                if not len(values):
+                    continue
+                line, = ax.plot(steps, values, color=color, linewidth=1, alpha=0.8, label=name)
+                self._overlay_lines.append(line)
+                low, high, last = self._overlay_bounds.get(ax, (np.inf, -np.inf, 0))
+                self._overlay_bounds[ax] = (min(low, values.min()), max(high, values.max()), max(last, steps[-1]))
+
+        for ax in (self.loss_ax, self.lr_ax):
+            ax.legend(facecolor=UI_STYLES['colors']['card_bg'], labelcolor='white', fontsize=8)
+            if ax in self._overlay_bounds:
+                self._extend_xlim(ax, self._overlay_bounds[ax][2])
+            live = [np.asarray(line.get_ydata(), dtype=float) for line in self.renderer.lines if line.axes is ax]
+            live = np.concatenate(live) if live else np.empty(0)
+            self._fit_y(ax, live.min() if len(live) else np.inf, live.max() if len(live) else -np.inf)
+        if curves:
+            self.update_log("SYSTEM", f"Comparing {len(curves)} run(s): {', '.join(name for name, _, _ in curves)}")
+        # Overlaid runs do not change between frames, so they are drawn into the cached background
+        self.renderer.invalidate()
+        self.renderer.render()
+        self._plot_dirty = False
+
+    def _fit_y(self, ax, low, high):
+        """fit_y over the live data together with any runs overlaid on ax"""
+        if ax in self._overlay_bounds:
+            overlay_low, overlay_high, _ = self._overlay_bounds[ax]
+            low, high = min(low, overlay_low), max(high, overlay_high)
+        if np.isfinite(low) and np.isfinite(high):
+            BlitPlotRenderer.fit_y(ax, low, high)
 
     def close(self):
           """Close the window and destroy the Tkinter instance"""
+          # Don't leave a training thread running with no window to report to;
+          # a trainer process the dashboard is attached to keeps running
+          if hasattr(self.training_control, "detach"):
+              self.training_control.detach()
+          elif self.training_control is not None:
+              self.training_control.stop()
+          self.running = False
+          self.telemetry.stop()
+          self.events.stop()
           self.window.quit()
           self.window.destroy()
 
     def update_log(self, category, message):
-          timestamp = datetime.now().strftime("%H:%M:%S")
-          log_entry = f"[{timestamp}] [{category}] {message}\n"
-          self.log_box.insert(END, log_entry)
-          self.log_box.see(END)
+          entry = (time.time(), category, message)
+          if not self._on_ui_thread():
+              self.events.publish("log", *entry)
+              return
+          self._append_log_entries([entry])
+
+    def _append_log_entries(self, entries):
+          """Insert a batch of (timestamp, category, message) entries with one widget call"""
+          self.console.append_batch(entries)
+
+    def filter_logs(self, category=None, query=None):
+        """Show only entries of one category and/or containing a search term"""
+        category = self.log_category.get() if category is None else category
+        query = self.log_search.get() if query is None else query
+        categories = None if category in ("", "All") else [category]
+        self.console.set_filter(categories, query.strip())
+
     def update_progress(self, progress_value: float):
         """Update the progress bar value"""
-        self.progress_bar['value'] = progress_value
+        if not self._on_ui_thread():
+            self.events.publish("progress", progress_value)
+            return
+        self._set_progress(progress_value)
         self.window.update_idletasks()
 
+    def _set_progress(self, progress_value: float):
+        self.progress_bar['value'] = progress_value
+
     def show_completion_message(self):
         """Display completion message and set progress to 100%"""
         self.update_log("INFO", "Training Complete! Press close button to exit.")
@@ -242,20 +560,55 @@ class TrainingProgressWindow:
 
     def update_tokenization_progress(self, current, total):
         progress_percentage = (current / total) * 100
-        self.progress_bar['value'] = progress_percentage
-        self.window.update_idletasks()  # Force UI update
+        self.update_progress(progress_percentage)
     
     def log_tokenization_status(self, message):
         self.update_log("Tokenization", message)
 
+    def set_training_control(self, control):
+        """Attach the trainer's TrainingControl so Pause/Stop reach the training loop"""
+        self.training_control = control
+
     def suspend_training(self):
-        self.training_suspended = True
-        self.update_log("System", "Training process suspended")
-    
+        """Toggle between pausing and resuming; the trainer acts at the next step boundary"""
+        if self.training_terminated:
+            return
+        self.training_suspended = not self.training_suspended
+        if self.training_suspended:
+            if self.training_control is not None:
+                self.training_control.pause()
+            self.pause_button.configure(text="Resume Training")
+            self.update_log("SYSTEM", "Pausing training after the current step...")
+        else:
+            if self.training_control is not None:
+                self.training_control.resume()
+            self.pause_button.configure(text="Pause Training")
+            self.update_log("SYSTEM", "Resuming training...")
+
+    def request_profile(self):
+        """Capture the next few training steps with torch.profiler (see PROFILER_CONFIG)"""
+        if self.training_control is None or self.training_terminated:
+            self.update_log("SYSTEM", "No training to profile")
+            return
+        self.training_control.request_profile()
+        self.update_log("SYSTEM", "Profiling from the next step...")
+
+    def update_profile(self, report):
+        """Top operators and per-phase step time of a finished profiler capture"""
+        if not self._on_ui_thread():
+            self.events.publish("profile", report)
+            return
+        self._show_profile(report)
+
     def terminate_training(self):
+        if self.training_terminated:
+            return
         self.training_terminated = True
-        self.update_log("System", "Training process terminated")
-        self.window.destroy()
+        if self.training_control is not None:
+            self.training_control.stop()
+        self.pause_button.configure(state="disabled")
+        self.stop_button.configure(state="disabled")
+        self.update_log("SYSTEM", "Stopping training after the current step...")
 
     def create_system_metrics(self, parent):
         # Create system metrics frame in the metrics dashboard
@@ -269,36 +622,120 @@ class TrainingProgressWindow:
 
         self.cpu_label = ttk.Label(system_frame, text="CPU Usage: 0%")
         self.cpu_label.pack(anchor=W)
-        
+
+        # One bar glyph per core, so a few saturated cores stand out at a glance
+        self.cores_label = ttk.Label(system_frame, text="Cores: -", font=("Courier", 10))
+        self.cores_label.pack(anchor=W)
+
         self.memory_label = ttk.Label(system_frame, text="Memory Usage: 0%")
         self.memory_label.pack(anchor=W)
-        
+
+        self.workers_label = ttk.Label(system_frame, text="Dataloader Workers: -")
+        self.workers_label.pack(anchor=W)
+
         self.disk_label = ttk.Label(system_frame, text="Disk Usage: 0%")
         self.disk_label.pack(anchor=W)
 
-        def update():
-            while self.running:
-                try:
-                    cpu_percent = psutil.cpu_percent()
-                    memory = psutil.virtual_memory()
-                    memory_percent = memory.percent
-                    
-                    # Schedule UI updates on main thread
-                    self.window.after(0, lambda: self.cpu_label.configure(text=f"CPU Usage: {cpu_percent}%"))
-                    self.window.after(0, lambda: self.memory_label.configure(text=f"Memory Usage: {memory_percent}%"))
-                    time.sleep(1)
-                except Exception:
-                    break
-        
         self.running = True
-        self.metrics_thread = Thread(target=update, daemon=True)
-        self.metrics_thread.start()
+        self.telemetry = TelemetrySampler(
+            interval=TELEMETRY_CONFIG['interval'],
+            history=TELEMETRY_CONFIG['history'],
+            watch_path=TELEMETRY_CONFIG['watch_path'],
+            # Sampled off the UI thread; the event bus applies only the newest reading per frame
+            callback=lambda sample, per_core: self.events.publish("telemetry", sample, per_core)
+        )
+        self.telemetry.start()
+
+    def _apply_telemetry(self, sample, per_core):
+        self.cpu_label.configure(
+            text=f"CPU Usage: {sample['system_cpu']:.0f}% ({sample['cores_busy']}/{len(per_core)} cores busy) | "
+                 f"Trainer {sample['process_cpu']:.0f}%, {sample['process_threads']} threads"
+        )
+        self.cores_label.configure(
+            text="Cores: " + "".join(CORE_BARS[min(int(percent / 100 * len(CORE_BARS)), len(CORE_BARS) - 1)]
+                                     for percent in per_core)
+        )
+        self.memory_label.configure(
+            text=f"Memory Usage: {sample['memory_percent']:.0f}% | Trainer RSS {sample['process_rss_mb']:.0f} MB | "
+                 f"Swap {sample['swap_percent']:.0f}%"
+        )
+        workers_text = (f"Dataloader Workers: {sample['workers']} | CPU {sample['workers_cpu']:.0f}% | "
+                        f"RSS {sample['workers_rss_mb']:.0f} MB")
+        if sample['workers'] and sample['cores_busy'] >= len(per_core):
+            # Every core is busy: workers are competing with the trainer's compute threads
+            workers_text += " | CPU saturated"
+        self.workers_label.configure(text=workers_text)
+        self.disk_label.configure(
+            text=f"Disk Usage: {sample['disk_percent']:.0f}% | Read {sample['disk_read_mbps']:.1f} MB/s | "
+                 f"Write {sample['disk_write_mbps']:.1f} MB/s"
+        )
+
+    def update_training_metrics(self, epoch=0, loss=0.0, accuracy=None, learning_rate=0.0, total_epochs=3,
+                                step=None, total_steps=None, validation_loss=None):
+        metrics = dict(epoch=epoch, loss=loss, accuracy=accuracy, learning_rate=learning_rate,
+                       total_epochs=total_epochs, step=step, total_steps=total_steps,
+                       validation_loss=validation_loss)
+        if not self._on_ui_thread():
+            # Only the newest metrics of a burst are applied
+            self.events.publish("metrics", **metrics)
+            return
+        self._apply_training_metrics(**metrics)
+
+    def update_throughput(self, step_time=0.0, samples_per_second=0.0, tokens_per_second=0.0,
+                          data_time=0.0, compute_time=0.0, optimizer_time=0.0, other_time=0.0, eta_seconds=None):
+        throughput = dict(step_time=step_time, samples_per_second=samples_per_second,
+                          tokens_per_second=tokens_per_second, data_time=data_time, compute_time=compute_time,
+                          optimizer_time=optimizer_time, other_time=other_time, eta_seconds=eta_seconds)
+        if not self._on_ui_thread():
+            self.events.publish("throughput", **throughput)
+            return
+        self._apply_throughput(**throughput)
 
-    def update_training_metrics(self, epoch=0, loss=0.0, accuracy=None, learning_rate=0.0, total_epochs=3):
-        # Update labels with current metrics
-        formatted_epoch = f"{epoch:.2f}/{total_epochs}"
+    def update_rank_step_times(self, step_times):
+        """Per-rank busy time per step of a data-parallel run (see DistributedLauncher)"""
+        if not self._on_ui_thread():
+            self.events.publish("ranks", list(step_times))
+            return
+        self._apply_rank_step_times(step_times)
+
+    def _apply_rank_step_times(self, step_times):
+        median = float(np.median(step_times))
+        lines = []
+        for rank, busy in enumerate(step_times):
+            slow = median and busy > STRAGGLER_RATIO * median
+            lines.append(f"rank {rank}: {busy * 1000:.0f} ms" + (" (straggler)" if slow else ""))
+        self.rank_times_label.config(text="\n".join(lines))
+
+    def _apply_throughput(self, step_time=0.0, samples_per_second=0.0, tokens_per_second=0.0,
+                          data_time=0.0, compute_time=0.0, optimizer_time=0.0, other_time=0.0, eta_seconds=None):
+        self.samples_per_second_label.config(text=f"{samples_per_second:.1f}")
+        self.tokens_per_second_label.config(text=f"{tokens_per_second:,.0f}")
+        self.step_time_label.config(text=f"{step_time * 1000:.0f} ms")
+        if step_time:
+            self.step_breakdown_label.config(
+                text=" / ".join(f"{phase / step_time:.0%}" for phase in (data_time, compute_time, optimizer_time))
+            )
+
+        now = datetime.now()
+        if self.training_start_time is None:
+            self.training_start_time = now
+            self.start_time_label.config(text=now.strftime("%I:%M %p, %b %d"))
+        if eta_seconds is not None:
+            finish = datetime.fromtimestamp(now.timestamp() + eta_seconds)
+            minutes = int(eta_seconds // 60)
+            self.eta_label.config(text=f"{finish.strftime('%I:%M %p, %b %d')} ({minutes // 60}h {minutes % 60:02d}m left)")
+
+    def _apply_training_metrics(self, epoch=0, loss=0.0, accuracy=None, learning_rate=0.0, total_epochs=3,
+                                step=None, total_steps=None, validation_loss=None):
+        # Update labels with current metrics; streaming runs have no epoch count, so show steps
+        if total_steps is not None:
+            formatted_epoch = f"Step {step}/{total_steps}"
+        else:
+            formatted_epoch = f"{epoch:.2f}/{total_epochs}"
         self.epoch_label.config(text=formatted_epoch)
         self.training_loss_label.config(text=f"{loss:.4f}")
+        if validation_loss is not None:
+            self.validation_loss_label.config(text=f"{validation_loss:.4f}")
     
         # Handle accuracy which might be None
         accuracy_text = f"{accuracy:.2f}%" if accuracy is not None else "N/A"
@@ -307,11 +744,25 @@ class TrainingProgressWindow:
         self.learning_rate_label.config(text=f"{learning_rate:.4f}")
 
     def _create_graphs_section(self, parent):
+        graphs_frame = ttk.LabelFrame(parent, text="Training Progress", bootstyle="info", padding=10)
+        graphs_frame.pack(fill=X, pady=10)
+
+        self.renderer = None
+        self._pending_plots = {}
+        self._overlay_lines = []
+        self._overlay_bounds = {}
+        self.current_step = 0
+        self._graphs_placeholder = ttk.Label(graphs_frame, text="Loading charts...")
+        self._graphs_placeholder.pack(pady=20)
+        # Importing Matplotlib takes about half a second; build the charts once the window has painted
+        self.window.after(50, lambda: self._build_graphs(graphs_frame))
+
+    def _build_graphs(self, graphs_frame):
+        start = time.perf_counter()
         from matplotlib.figure import Figure
         from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
-        graphs_frame = ttk.LabelFrame(parent, text="Training Progress", bootstyle="info", padding=10)
-        graphs_frame.pack(fill=X, pady=10)
+        self._graphs_placeholder.destroy()
 
         # Create figure with two subplots side by side
         self.fig = Figure(figsize=(12, 4), facecolor=UI_STYLES['colors']['card_bg'])
@@ -336,14 +787,30 @@ class TrainingProgressWindow:
         self.lr_ax.legend(facecolor=UI_STYLES['colors']['card_bg'], labelcolor='white')
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=graphs_frame)
+        # Static parts are drawn once; updates only blit the three data lines
+        self.renderer = BlitPlotRenderer(
+            self.canvas,
+            [self.loss_line, self.avg_loss_line, self.lr_line],
+            debug_overlay=UI_STYLES['refresh']['debug_overlay']
+        )
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(fill=BOTH, expand=True)
 
         # Initialize tracking variables
-        self.current_step = 0
         self.loss_ax.set_xlim(0, 100)
         self.lr_ax.set_xlim(0, 100)
 
+        # Apply plot updates that arrived while the charts were being built
+        pending, self._pending_plots = self._pending_plots, {}
+        if "loss" in pending:
+            self._set_loss_data(*pending["loss"])
+        if "lr" in pending:
+            self._set_lr_data(*pending["lr"])
+        if "overlay" in pending:
+            self._apply_overlay(*pending["overlay"])
+        self._redraw_if_dirty()
+        self.update_log("STARTUP", f"Charts ready in {time.perf_counter() - start:.2f}s")
+
     def _style_subplot(self, ax):
         ax.set_facecolor(UI_STYLES['colors']['card_bg'])
         ax.tick_params(colors='white')
@@ -355,57 +822,102 @@ class TrainingProgressWindow:
         ax.grid(True, color='gray', alpha=0.2)
 
     def update_loss_plot(self, losses, window_size=50):
-        if losses:
-            self.current_step += 1
-            steps = list(range(self.current_step))
-        
-            # Calculate moving average
-            moving_avg = []
-            for i in range(len(losses)):
-                start_idx = max(0, i - window_size + 1)
-                moving_avg.append(sum(losses[start_idx:i+1]) / (i - start_idx + 1))
-
-            # Update plot data
-            self.loss_line.set_data(steps, losses)
-            self.avg_loss_line.set_data(steps, moving_avg)
-        
+        if not self._on_ui_thread():
+            self.events.publish("loss", losses, window_size)
+            return
+        if self._set_loss_data(losses, window_size):
+            self.renderer.render()
+            self._plot_dirty = False
+
+    def _plot_points(self, ax):
+        """About one point per horizontal pixel of the axes"""
+        return max(int(ax.bbox.width), 100)
+
+    @staticmethod
+    def _extend_xlim(ax, last_step):
+        # Grow by at least 100 steps and by half the current range, so limit changes
+        # (which force a full redraw) get rarer as the run gets longer
+        x_min, x_max = ax.get_xlim()
+        if last_step >= x_max:
+            ax.set_xlim(0, max(x_max + 100, last_step * 1.5))
+
+    def _set_loss_data(self, losses, window_size=50):
+        if self.renderer is None:
+            # Charts not built yet; only the newest series matters
+            self._pending_plots["loss"] = (losses, window_size)
+            return False
+        # The trainer passes a MetricSeries; plain lists are wrapped for other callers
+        if not isinstance(losses, MetricSeries):
+            losses = MetricSeries.from_values(losses, window=window_size)
+        if len(losses):
+            self.current_step = len(losses)
+            max_points = self._plot_points(self.loss_ax)
+
+            # Update plot data with min/max downsampled views, never the full history
+            steps, values = losses.downsample(max_points)
+            avg_steps, avg_values = losses.average.downsample(max_points)
+            self.loss_line.set_data(steps, values)
+            self.avg_loss_line.set_data(avg_steps, avg_values)
+
             # Update x-axis range if current_step exceeds current limit
-            x_min, x_max = self.loss_ax.get_xlim()
-            if self.current_step >= x_max:
-                self.loss_ax.set_xlim(0, x_max + 100)
-        
-            # Update y-axis limits
-            self.loss_ax.relim()
-            self.loss_ax.autoscale_view(scalex=False)  # Only autoscale y-axis
-        
-            # Refresh canvas
-            self.canvas.draw()    
-            
+            self._extend_xlim(self.loss_ax, self.current_step)
+
+            # Update y-axis limits only when the data leaves the view (forces a full redraw)
+            self._fit_y(self.loss_ax, min(values.min(), avg_values.min()), max(values.max(), avg_values.max()))
+            self._plot_dirty = True
+        return bool(len(losses))
+
     def update_lr_plot(self, learning_rates):
-        if learning_rates:
-            # Create matching steps array
-            steps = list(range(len(learning_rates)))
-            
-            # Now both arrays will have the same length
-            self.lr_line.set_data(steps, learning_rates)
-            
+        if not self._on_ui_thread():
+            self.events.publish("lr", learning_rates)
+            return
+        if self._set_lr_data(learning_rates):
+            self.renderer.render()
+            self._plot_dirty = False
+
+    def _set_lr_data(self, learning_rates):
+        if self.renderer is None:
+            self._pending_plots["lr"] = (learning_rates,)
+            return False
+        if not isinstance(learning_rates, MetricSeries):
+            learning_rates = MetricSeries.from_values(learning_rates, window=None)
+        if len(learning_rates):
+            steps, values = learning_rates.downsample(self._plot_points(self.lr_ax))
+            self.lr_line.set_data(steps, values)
+
             # Update x-axis range if needed
-            x_min, x_max = self.lr_ax.get_xlim()
-            if len(steps) >= x_max:
-                self.lr_ax.set_xlim(0, x_max + 100)
-            
-            # Update y-axis limits
-            self.lr_ax.relim()
-            self.lr_ax.autoscale_view(scalex=False)
-            
-            # Refresh canvas
-            self.canvas.draw()
-            
+            self._extend_xlim(self.lr_ax, len(learning_rates))
+
+            # Update y-axis limits only when the data leaves the view
+            self._fit_y(self.lr_ax, values.min(), values.max())
+            self._plot_dirty = True
+        return bool(len(learning_rates))
+
     def _create_log_console(self, parent):
         # Create log console frame
         log_frame = ttk.LabelFrame(parent, text="Training Logs", bootstyle="info", padding=10)
         log_frame.pack(fill=BOTH, expand=YES, pady=10)
 
+        # Category filter and search; both re-render from the indexed history
+        filter_frame = ttk.Frame(log_frame)
+        filter_frame.pack(fill=X, pady=(0, 5))
+
+        ttk.Label(filter_frame, text="Category", bootstyle="info").pack(side=LEFT, padx=(0, 5))
+        self.log_category = ttk.Combobox(
+            filter_frame,
+            values=UI_STYLES['console']['categories'],
+            state="readonly",
+            width=15
+        )
+        self.log_category.set("All")
+        self.log_category.pack(side=LEFT)
+        self.log_category.bind("<<ComboboxSelected>>", lambda event: self.filter_logs())
+
+        ttk.Label(filter_frame, text="Search", bootstyle="info").pack(side=LEFT, padx=(20, 5))
+        self.log_search = ttk.Entry(filter_frame, width=30)
+        self.log_search.pack(side=LEFT, fill=X, expand=YES)
+        self.log_search.bind("<Return>", lambda event: self.filter_logs())
+
         # Create scrolled text widget for logs
         self.log_box = scrolledtext.ScrolledText(
             log_frame,
@@ -416,6 +928,7 @@ class TrainingProgressWindow:
             fg=UI_STYLES['colors']['text_primary']
         )
         self.log_box.pack(fill=BOTH, expand=YES)
+        self.console = LogConsole(self.log_box, UI_STYLES['console']['max_lines'])
 
         # Add initial log message
         self.update_log("SYSTEM", "Training console initialized and ready")
@@ -426,14 +939,17 @@ class TrainingProgressWindow:
         details_frame.pack(side=RIGHT, fill=Y, padx=20, pady=10)
 
         # Create a grid for model information
+        # Start time and ETA are filled in once training reports its speed
         details = [
-            ("Model Name:", "LLM_Version1"),
-            ("Dataset Used:", "Dataset_XYZ"),
-            ("Start Time:", "10:00 AM, Nov 27"),
-            ("Estimated Completion:", "12:30 PM, Nov 27")
+            ("Model Name:", "LLM_Version1", None),
+            ("Dataset Used:", "Dataset_XYZ", None),
+            ("Start Time:", "-", "start_time_label"),
+            ("Estimated Completion:", "-", "eta_label"),
+            ("Rank Step Times:", "-", "rank_times_label")
         ]
+        self.training_start_time = None
 
-        for label, value in details:
+        for label, value, attr_name in details:
             row_frame = ttk.Frame(details_frame)
             row_frame.pack(fill=X, pady=5)
             
@@ -444,11 +960,106 @@ class TrainingProgressWindow:
                 bootstyle="info"
             ).pack(side=LEFT, padx=10)
             
-            ttk.Label(
+            value_label = ttk.Label(
                 row_frame,
                 text=value,
                 font=UI_STYLES['fonts']['content']
-            ).pack(side=LEFT, padx=10)
+            )
+            value_label.pack(side=LEFT, padx=10)
+            if attr_name:
+                setattr(self, attr_name, value_label)
+        return details_frame
+
+    def _create_memory_panel(self, parent):
+        memory_frame = ttk.LabelFrame(parent, text="Memory", bootstyle="info", padding=10)
+        memory_frame.pack(fill=X, pady=(10, 0))
+
+        # Estimated before training starts (see MEMORY_CONFIG); the peaks are measured every step
+        rows = [
+            ("Parameters:", "memory_parameters_label"),
+            ("Gradients:", "memory_gradients_label"),
+            ("Optimizer State:", "memory_optimizer_label"),
+            ("Activations:", "memory_activations_label"),
+            ("Dataset:", "memory_dataset_label"),
+            ("Estimated Peak:", "memory_estimate_label"),
+            ("Step Peak RSS:", "memory_peak_label")
+        ]
+        for label, attr_name in rows:
+            row_frame = ttk.Frame(memory_frame)
+            row_frame.pack(fill=X, pady=1)
+            ttk.Label(row_frame, text=label, font=UI_STYLES['fonts']['content'], bootstyle="info").pack(side=LEFT)
+            value_label = ttk.Label(row_frame, text="-", font=UI_STYLES['fonts']['content'])
+            value_label.pack(side=RIGHT)
+            setattr(self, attr_name, value_label)
+
+    def update_memory(self, parameters_mb=0.0, gradients_mb=0.0, optimizer_mb=0.0, activations_mb=0.0,
+                      dataset_mb=None, baseline_mb=0.0, estimated_peak_mb=0.0, micro_batch=1,
+                      gradient_checkpointing=False, budget_mb=None, peak_rss_mb=None, run_peak_rss_mb=None):
+        """Host-memory breakdown of the run (see ModelTrainer.plan_memory) and its measured peaks"""
+        memory = dict(parameters_mb=parameters_mb, gradients_mb=gradients_mb, optimizer_mb=optimizer_mb,
+                      activations_mb=activations_mb, dataset_mb=dataset_mb, baseline_mb=baseline_mb,
+                      estimated_peak_mb=estimated_peak_mb, micro_batch=micro_batch,
+                      gradient_checkpointing=gradient_checkpointing, budget_mb=budget_mb,
+                      peak_rss_mb=peak_rss_mb, run_peak_rss_mb=run_peak_rss_mb)
+        if not self._on_ui_thread():
+            self.events.publish("memory", **memory)
+            return
+        self._apply_memory(**memory)
+
+    @staticmethod
+    def _gb(megabytes):
+        return "-" if megabytes is None else f"{megabytes / 1024:.2f} GB"
+
+    def _apply_memory(self, parameters_mb=0.0, gradients_mb=0.0, optimizer_mb=0.0, activations_mb=0.0,
+                      dataset_mb=None, baseline_mb=0.0, estimated_peak_mb=0.0, micro_batch=1,
+                      gradient_checkpointing=False, budget_mb=None, peak_rss_mb=None, run_peak_rss_mb=None):
+        self.memory_parameters_label.config(text=self._gb(parameters_mb))
+        self.memory_gradients_label.config(text=self._gb(gradients_mb))
+        self.memory_optimizer_label.config(text=self._gb(optimizer_mb))
+        checkpointed = ", checkpointed" if gradient_checkpointing else ""
+        self.memory_activations_label.config(text=f"{self._gb(activations_mb)} (batch {micro_batch}{checkpointed})")
+        self.memory_dataset_label.config(text=self._gb(dataset_mb) + (" (mmap)" if dataset_mb is not None else ""))
+        budget = f" of {self._gb(budget_mb)}" if budget_mb is not None else ""
+        self.memory_estimate_label.config(text=self._gb(estimated_peak_mb) + budget)
+        if peak_rss_mb is not None:
+            self.memory_peak_label.config(text=f"{self._gb(peak_rss_mb)} (max {self._gb(run_peak_rss_mb)})")
+
+    def _create_profile_panel(self, parent):
+        profile_frame = ttk.LabelFrame(parent, text="Profiler", bootstyle="info", padding=10)
+        profile_frame.pack(fill=BOTH, expand=YES, pady=(10, 0))
+
+        self.profile_phases_label = ttk.Label(
+            profile_frame,
+            text="Press Profile to capture a few training steps",
+            font=UI_STYLES['fonts']['content'],
+            justify=LEFT
+        )
+        self.profile_phases_label.pack(anchor=W, pady=(0, 5))
+
+        columns = [("calls", "Calls/step", 70), ("self_ms", "ms/step", 70), ("share", "Self %", 60)]
+        tree = ttk.Treeview(profile_frame, columns=[name for name, _, _ in columns], height=12)
+        tree.heading("#0", text="Operator")
+        tree.column("#0", width=200)
+        for name, heading, width in columns:
+            tree.heading(name, text=heading)
+            tree.column(name, width=width, anchor=E)
+        tree.pack(fill=BOTH, expand=YES)
+        self.profile_tree = tree
+
+        self.profile_trace_label = ttk.Label(profile_frame, text="", font=UI_STYLES['fonts']['content'],
+                                             wraplength=380)
+        self.profile_trace_label.pack(anchor=W, pady=(5, 0))
+
+    def _show_profile(self, report):
+        steps = report["steps"]
+        first = report["start_step"] + 1
+        phases = "\n".join(f"{name}: {ms:.1f} ms/step" for name, ms in report["phases"].items())
+        self.profile_phases_label.configure(text=f"Steps {first}-{first + steps - 1}\n{phases}")
+        tree = self.profile_tree
+        tree.delete(*tree.get_children())
+        for name, calls, self_ms, total_ms, share in report["operators"]:
+            tree.insert("", END, text=name, values=(f"{calls / steps:.0f}", f"{self_ms / steps:.1f}", f"{share:.1%}"))
+        self.profile_trace_label.configure(text=f"Trace: {report['trace']}" if report.get("trace") else "")
 
 
 
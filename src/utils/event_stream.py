@@ -0,0 +1,522 @@
+import os
+import queue
+import socket
+import struct
+import threading
+import traceback
+from array import array
+from collections import deque
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .metric_series import MetricSeries
+
+# Window methods a trainer may call on its sink. On the wire a method is its index
+# in this tuple, so new methods are only ever appended
+WINDOW_METHODS = (
+    "update_log", "update_progress", "update_training_metrics", "update_throughput", "update_rank_step_times",
+    "update_loss_plot", "update_lr_plot", "set_run_dir", "update_tokenization_progress", "log_tokenization_status",
+    "update_profile", "update_memory",
+)
+# Calls kept as a bounded history for late subscribers; of every other call only the newest is kept
+LOG_METHODS = ("update_log", "log_tokenization_status")
+
+# Frame: kind (uint8) and payload length (uint32), little-endian, then the payload
+FRAME_HEADER = struct.Struct("<BI")
+CALL, SNAPSHOT_END, CONTROL = 1, 2, 3
+CONTROL_COMMANDS = {b"p": "pause", b"r": "resume", b"s": "stop", b"f": "request_profile"}
+
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_COUNT = struct.Struct("<I")
+
+
+class SeriesPoints:
+    """Points of a MetricSeries on the wire: the whole series on attach, afterwards only new points"""
+
+    def __init__(self, name: str, window: Optional[int], steps, values):
+        self.name = name
+        self.window = window
+        self.steps = np.asarray(steps, dtype="<f8")
+        self.values = np.asarray(values, dtype="<f8")
+
+    @classmethod
+    def since(cls, series: MetricSeries, start: int) -> "SeriesPoints":
+        """The points series gained after its first start points"""
+        return cls(series.name, series.window, series.steps.view(start), series.values.view(start))
+
+
+class SeriesRebuilder:
+    """Receiving side of SeriesPoints: appends them to a MetricSeries kept per name and returns it"""
+
+    def __init__(self):
+        self._series: Dict[str, MetricSeries] = {}
+
+    def clear(self):
+        self._series = {}
+
+    def decode(self, value):
+        if not isinstance(value, SeriesPoints):
+            return value
+        series = self._series.get(value.name)
+        if series is None:
+            series = self._series[value.name] = MetricSeries(value.name, window=value.window)
+        for step, point in zip(value.steps.tolist(), value.values.tolist()):
+            series.append(point, step)
+        return series
+
+
+def _encode_value(value, out: bytearray):
+    """Append a tagged value: None, bool, int, float, str, list/tuple, dict or SeriesPoints"""
+    if value is None:
+        out += b"N"
+    elif isinstance(value, (bool, np.bool_)):
+        out += b"T" if value else b"F"
+    elif isinstance(value, (int, np.integer)):
+        out += b"i" + _INT.pack(int(value))
+    elif isinstance(value, (float, np.floating)):
+        out += b"d" + _FLOAT.pack(float(value))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out += b"s" + _COUNT.pack(len(data)) + data
+    elif isinstance(value, SeriesPoints):
+        out += b"S"
+        _encode_value(value.name, out)
+        _encode_value(value.window, out)
+        out += _COUNT.pack(len(value.values))
+        out += value.steps.tobytes() + value.values.tobytes()
+    elif isinstance(value, (list, tuple)):
+        out += b"l" + _COUNT.pack(len(value))
+        for item in value:
+            _encode_value(item, out)
+    elif isinstance(value, dict):
+        out += b"m" + _COUNT.pack(len(value))
+        for key, item in value.items():
+            _encode_value(key, out)
+            _encode_value(item, out)
+    else:
+        raise TypeError(f"Cannot stream a {type(value).__name__}")
+
+
+def _decode_value(data: memoryview, offset: int):
+    """(value, offset after it) for the tagged value at offset"""
+    tag = data[offset:offset + 1].tobytes()
+    offset += 1
+    if tag == b"N":
+        return None, offset
+    if tag in (b"T", b"F"):
+        return tag == b"T", offset
+    if tag == b"i":
+        return _INT.unpack_from(data, offset)[0], offset + _INT.size
+    if tag == b"d":
+        return _FLOAT.unpack_from(data, offset)[0], offset + _FLOAT.size
+    if tag == b"s":
+        length = _COUNT.unpack_from(data, offset)[0]
+        offset += _COUNT.size
+        return str(data[offset:offset + length], "utf-8"), offset + length
+    if tag == b"S":
+        name, offset = _decode_value(data, offset)
+        window, offset = _decode_value(data, offset)
+        count = _COUNT.unpack_from(data, offset)[0]
+        offset += _COUNT.size
+        steps = np.frombuffer(data, dtype="<f8", count=count, offset=offset)
+        values = np.frombuffer(data, dtype="<f8", count=count, offset=offset + 8 * count)
+        return SeriesPoints(name, window, steps, values), offset + 16 * count
+    if tag in (b"l", b"m"):
+        count = _COUNT.unpack_from(data, offset)[0]
+        offset += _COUNT.size
+        items = []
+        for _ in range(count * (2 if tag == b"m" else 1)):
+            item, offset = _decode_value(data, offset)
+            items.append(item)
+        if tag == b"m":
+            return dict(zip(items[::2], items[1::2])), offset
+        return items, offset
+    raise ValueError(f"Unknown value tag {tag!r}")
+
+
+def encode_frame(kind: int, payload: bytes = b"") -> bytes:
+    return FRAME_HEADER.pack(kind, len(payload)) + payload
+
+
+def encode_call(name: str, args: Sequence = (), kwargs: Optional[dict] = None) -> bytes:
+    payload = bytearray([WINDOW_METHODS.index(name)])
+    _encode_value(list(args), payload)
+    _encode_value(kwargs or {}, payload)
+    return encode_frame(CALL, bytes(payload))
+
+
+def decode_call(payload: bytes) -> Tuple[str, list, dict]:
+    data = memoryview(payload)
+    args, offset = _decode_value(data, 1)
+    kwargs, _ = _decode_value(data, offset)
+    return WINDOW_METHODS[payload[0]], args, kwargs
+
+
+def read_frame(stream) -> Optional[Tuple[int, bytes]]:
+    """Next (kind, payload) from a buffered socket file, or None once the peer has gone"""
+    header = stream.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+    kind, length = FRAME_HEADER.unpack(header)
+    payload = stream.read(length)
+    if len(payload) < length:
+        return None
+    return kind, payload
+
+
+def parse_address(address: str) -> Tuple[int, object]:
+    """(family, sockaddr) for a Unix socket path or a loopback "host:port" """
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit() and "/" not in address and os.sep not in address:
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    if not hasattr(socket, "AF_UNIX"):
+        raise ValueError(f"Unix sockets are not available here; use a loopback host:port instead of {address}")
+    return socket.AF_UNIX, address
+
+
+def connect(address: str, timeout: Optional[float] = None) -> socket.socket:
+    family, sockaddr = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(sockaddr)
+    except OSError:
+        sock.close()
+        raise
+    sock.settimeout(None)
+    return sock
+
+
+def is_serving(address: str) -> bool:
+    """Whether an EventPublisher is listening on address"""
+    try:
+        connect(address, timeout=0.5).close()
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+class _Subscriber:
+    """One attached dashboard: a bounded frame queue drained onto its socket by a sender thread"""
+
+    def __init__(self, sock: socket.socket, buffer: int):
+        self.sock = sock
+        self.frames = queue.Queue(maxsize=buffer)
+        self.sender = threading.Thread(target=self._send_frames, daemon=True)
+
+    def offer(self, frame: bytes) -> bool:
+        try:
+            self.frames.put_nowait(frame)
+            return True
+        except queue.Full:
+            return False
+
+    def _send_frames(self):
+        try:
+            while True:
+                frame = self.frames.get()
+                if frame is None:
+                    return
+                self.sock.sendall(frame)
+        except OSError:
+            pass
+        finally:
+            self.sock.close()
+
+    def close(self):
+        try:
+            # Wakes the sender (in sendall) and the control reader (in recv)
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.offer(None)
+
+
+class EventPublisher:
+    """Window stand-in for a trainer process: streams its calls to dashboards attached over a socket.
+
+    Each call is encoded once into a frame and queued for every subscriber;
+    a thread per subscriber does the socket writes, so the trainer never
+    waits on a dashboard. A subscriber whose queue fills up (stalled or
+    gone) is disconnected instead; it can simply attach again. On attach a
+    subscriber is first sent a snapshot: the last log_tail log lines, the
+    newest of every other call (progress, metrics, throughput, ...) and
+    the full loss/learning-rate series, then the live tail. Snapshot and
+    registration happen under the lock publishing takes, so no call is
+    missed or sent twice. MetricSeries arguments travel as the points
+    appended since the previous call. Pause/Resume/Stop frames from any
+    subscriber go to the training control the trainer registers. Calls
+    are also passed to echo (e.g. a ConsoleLogger) when it implements them.
+    """
+
+    def __init__(self, address: str, echo=None, log_tail: int = 1000, client_buffer: int = 4096,
+                 methods: Sequence[str] = WINDOW_METHODS):
+        self.address = address
+        self.echo = echo
+        self.client_buffer = client_buffer
+        self.training_control = None
+        self._methods = set(methods)
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._log = deque(maxlen=log_tail)
+        self._latest: Dict[str, bytes] = {}
+        self._series_calls: Dict[str, tuple] = {}
+        # name -> (window, steps, values): everything published so far, for snapshots
+        self._series: Dict[str, tuple] = {}
+        self._server = None
+        self._running = False
+        self._accept_thread = None
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name not in self._methods:
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self._publish(name, args, kwargs)
+
+    def set_training_control(self, control):
+        self.training_control = control
+
+    @property
+    def subscribers(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def start(self):
+        family, sockaddr = parse_address(self.address)
+        if family == socket.AF_UNIX:
+            directory = os.path.dirname(sockaddr)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if os.path.exists(sockaddr):
+                if is_serving(self.address):
+                    raise RuntimeError(f"A trainer is already streaming on {self.address}")
+                # Left behind by a trainer process that did not exit cleanly
+                os.unlink(sockaddr)
+        server = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(sockaddr)
+        if family == socket.AF_INET:
+            # Port 0 binds a free port
+            self.address = f"{sockaddr[0]}:{server.getsockname()[1]}"
+        server.listen()
+        # accept() is polled so close() does not depend on a platform waking it up
+        server.settimeout(0.5)
+        self._server = server
+        self._running = True
+        self._accept_thread = threading.Thread(target=self._accept, daemon=True)
+        self._accept_thread.start()
+
+    def _accept(self):
+        while self._running:
+            try:
+                sock, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            sock.settimeout(None)
+            subscriber = _Subscriber(sock, self.client_buffer)
+            with self._lock:
+                snapshot = self._snapshot()
+                subscriber.offer(b"".join(snapshot) + encode_frame(SNAPSHOT_END, _COUNT.pack(len(snapshot))))
+                self._subscribers.append(subscriber)
+            subscriber.sender.start()
+            threading.Thread(target=self._read_control, args=(subscriber,), daemon=True).start()
+
+    def _snapshot(self):
+        frames = list(self._log) + list(self._latest.values())
+        for name, (args, kwargs) in self._series_calls.items():
+            frames.append(encode_call(name, [self._all_points(arg) for arg in args],
+                                      {key: self._all_points(value) for key, value in kwargs.items()}))
+        return frames
+
+    def _all_points(self, value):
+        if not isinstance(value, SeriesPoints):
+            return value
+        window, steps, values = self._series[value.name]
+        return SeriesPoints(value.name, window, np.frombuffer(steps, dtype="<f8"), np.frombuffer(values, dtype="<f8"))
+
+    def _new_points(self, value):
+        if not isinstance(value, MetricSeries):
+            return value
+        stored = self._series.get(value.name)
+        if stored is None:
+            stored = self._series[value.name] = (value.window, array("d"), array("d"))
+        points = SeriesPoints.since(value, len(stored[2]))
+        stored[1].frombytes(points.steps.tobytes())
+        stored[2].frombytes(points.values.tobytes())
+        return points
+
+    def _publish(self, name, args, kwargs):
+        if self.echo is not None and hasattr(self.echo, name):
+            getattr(self.echo, name)(*args, **kwargs)
+        with self._lock:
+            args = tuple(self._new_points(arg) for arg in args)
+            kwargs = {key: self._new_points(value) for key, value in kwargs.items()}
+            frame = encode_call(name, args, kwargs)
+            if name in LOG_METHODS:
+                self._log.append(frame)
+            elif any(isinstance(value, SeriesPoints) for value in args + tuple(kwargs.values())):
+                self._series_calls[name] = (args, kwargs)
+            else:
+                self._latest[name] = frame
+            for subscriber in list(self._subscribers):
+                if not subscriber.offer(frame):
+                    # Too far behind to catch up without slowing training; it can re-attach
+                    self._subscribers.remove(subscriber)
+                    subscriber.close()
+
+    def _read_control(self, subscriber: _Subscriber):
+        try:
+            with subscriber.sock.makefile("rb") as stream:
+                while True:
+                    frame = read_frame(stream)
+                    if frame is None:
+                        break
+                    kind, payload = frame
+                    command = CONTROL_COMMANDS.get(payload)
+                    if kind == CONTROL and command and self.training_control is not None:
+                        getattr(self.training_control, command)()
+        except (OSError, ValueError):
+            pass
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+        subscriber.close()
+
+    def close(self, timeout: float = 5.0):
+        """Stop accepting, give subscribers up to timeout seconds to receive what is queued, then disconnect"""
+        self._running = False
+        if self._accept_thread is not None:
+            self._accept_thread.join()
+        if self._server is not None:
+            # Closed first: the kernel would otherwise complete new connections nobody accepts
+            self._server.close()
+            family, sockaddr = parse_address(self.address)
+            if family == socket.AF_UNIX and os.path.exists(sockaddr):
+                os.unlink(sockaddr)
+            self._server = None
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for subscriber in subscribers:
+            subscriber.offer(None)
+        for subscriber in subscribers:
+            subscriber.sender.join(timeout)
+            subscriber.close()
+
+
+class EventSubscriber:
+    """Dashboard side of an EventPublisher: applies the streamed calls to a window (or any sink).
+
+    Connects in a background thread and reconnects every retry_interval
+    seconds, so the dashboard may open before the trainer is listening and
+    follows it across restarts; every connection starts from the
+    publisher's snapshot. It also serves as the window's training control:
+    pause/resume/stop are sent to the trainer, while detach() (the window
+    closing) only disconnects and leaves the trainer running.
+    """
+
+    def __init__(self, address: str, target, retry_interval: float = 0.5):
+        self.address = address
+        self.target = target
+        self.retry_interval = retry_interval
+        self.attached = threading.Event()
+        self._series = SeriesRebuilder()
+        self._sock = None
+        self._send_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+
+    def _log(self, category: str, message: str):
+        if hasattr(self.target, "update_log"):
+            self.target.update_log(category, message)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def run(self):
+        waiting_logged = False
+        while not self._closed.is_set():
+            try:
+                sock = connect(self.address)
+            except OSError:
+                if not waiting_logged:
+                    self._log("SYSTEM", f"Waiting for a trainer at {self.address}...")
+                    waiting_logged = True
+                self._closed.wait(self.retry_interval)
+                continue
+            self._sock = sock
+            # The snapshot resends every series in full
+            self._series.clear()
+            try:
+                with sock.makefile("rb") as stream:
+                    self._receive(stream)
+            except (OSError, ValueError):
+                pass
+            finally:
+                self._sock = None
+                sock.close()
+            if self.attached.is_set() and not self._closed.is_set():
+                self._log("SYSTEM", f"Trainer at {self.address} disconnected")
+                waiting_logged = False
+            self.attached.clear()
+
+    def _receive(self, stream):
+        while True:
+            frame = read_frame(stream)
+            if frame is None:
+                return
+            kind, payload = frame
+            if kind == SNAPSHOT_END:
+                self._log("SYSTEM", f"Attached to trainer at {self.address} "
+                                    f"({_COUNT.unpack(payload)[0]} events caught up)")
+                self.attached.set()
+            elif kind == CALL:
+                name, args, kwargs = decode_call(payload)
+                if not hasattr(self.target, name):
+                    continue
+                try:
+                    getattr(self.target, name)(*[self._series.decode(arg) for arg in args],
+                                               **{key: self._series.decode(value) for key, value in kwargs.items()})
+                except Exception:
+                    # A failing handler must not cut the dashboard off from the trainer
+                    traceback.print_exc()
+
+    def _send_control(self, command: bytes) -> bool:
+        sock = self._sock
+        if sock is None:
+            self._log("SYSTEM", "Not attached to a trainer")
+            return False
+        try:
+            with self._send_lock:
+                sock.sendall(encode_frame(CONTROL, command))
+            return True
+        except OSError:
+            return False
+
+    def pause(self):
+        self._send_control(b"p")
+
+    def resume(self):
+        self._send_control(b"r")
+
+    def stop(self):
+        self._send_control(b"s")
+
+    def request_profile(self):
+        self._send_control(b"f")
+
+    def detach(self):
+        """Disconnect for good; the trainer keeps running"""
+        self._closed.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
@@ -1,17 +1,311 @@
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
 from datetime import datetime
-from typing import Protocol
+from typing import Dict, List, Optional, Protocol, Sequence, TextIO
 
 class LoggerInterface(Protocol):
     def update_log(self, category: str, message: str) -> None: ...
     def update_progress(self, progress_value: float) -> None: ...
 
+class LogSink(Protocol):
+    def emit(self, records: List[dict]) -> None: ...
+    def close(self) -> None: ...
+
+class LoggerSink:
+    """Shows records on anything with update_log: the window, a ConsoleLogger, a RemoteWindow..."""
+
+    def __init__(self, target: LoggerInterface):
+        self.target = target
+
+    def emit(self, records: List[dict]) -> None:
+        for record in records:
+            message = record["message"]
+            if record.get("suppressed"):
+                message += f" ({record['suppressed']} similar suppressed)"
+            self.target.update_log(record["category"], message)
+
+    def close(self) -> None:
+        pass
+
+class JSONLFileSink:
+    """Appends records as JSON lines; the file is rotated before it would exceed max_bytes.
+
+    Rotation renames path to path.1 (path.1 to path.2, ...) and keeps
+    backup_count old files.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+        self.size = self.file.tell()
+
+    def emit(self, records: List[dict]) -> None:
+        for record in records:
+            line = json.dumps(record, default=str) + "\n"
+            if self.size and self.size + len(line) > self.max_bytes:
+                self._rotate()
+            self.file.write(line)
+            self.size += len(line)
+        self.file.flush()
+
+    def _rotate(self):
+        self.file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+            self.file = open(self.path, "a", encoding="utf-8")
+        else:
+            self.file = open(self.path, "w", encoding="utf-8")
+        self.size = 0
+
+    def close(self) -> None:
+        self.file.close()
+
+class RateLimiter:
+    """Token bucket per category: at most rate messages per second, in bursts of up to one second's worth.
+
+    A message over the limit is held back, replacing any message of its
+    category already held. The held message goes out, with the number of
+    messages it stands for, as soon as the bucket refills (or on flush), so
+    a noisy category still shows its latest state, just less often.
+    Categories without a rate are never limited.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None):
+        self.rates = dict(rates or {})
+        self._tokens: Dict[str, float] = {}
+        self._updated: Dict[str, float] = {}
+        self._held: Dict[str, tuple] = {}  # category -> (record, messages suppressed before it)
+
+    def _refill(self, category: str, now: float) -> float:
+        rate = self.rates[category]
+        capacity = max(1.0, rate)
+        elapsed = now - self._updated.get(category, now)
+        tokens = min(capacity, self._tokens.get(category, capacity) + elapsed * rate)
+        self._tokens[category] = tokens
+        self._updated[category] = now
+        return tokens
+
+    def admit(self, record: dict, now: float) -> List[dict]:
+        """Records to emit now for a new record: itself, or none while its category is over the limit"""
+        category = record["category"]
+        if category not in self.rates:
+            return [record]
+        held = self._held.pop(category, None)
+        if self._refill(category, now) >= 1:
+            self._tokens[category] -= 1
+            if held is not None:
+                record["suppressed"] = held[1] + 1
+            return [record]
+        self._held[category] = (record, held[1] + 1 if held is not None else 0)
+        return []
+
+    def release(self, now: float, force: bool = False) -> List[dict]:
+        """Held records whose bucket has refilled (all of them with force)"""
+        released = []
+        for category in list(self._held):
+            if force or self._refill(category, now) >= 1:
+                if not force:
+                    self._tokens[category] -= 1
+                record, suppressed = self._held.pop(category)
+                if suppressed:
+                    record["suppressed"] = suppressed
+                released.append(record)
+        return released
+
+    def next_release(self, now: float) -> Optional[float]:
+        """Seconds until the first held record can go out, or None if nothing is held"""
+        waits = [max(0.0, (1 - self._refill(category, now)) / self.rates[category]) for category in self._held]
+        return min(waits) if waits else None
+
+class _Progress:
+    """Queued progress update, delivered to on_progress in order with the records around it"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: float):
+        self.value = value
+
+class AsyncLogWriter:
+    """Background thread that turns queued log entries into records and fans them out to sinks.
+
+    Entries are drained in batches, so a burst reaches each sink in one
+    emit() call. A sink that raises is reported on stderr and skipped for
+    that batch; the other sinks still get it. Progress updates go to
+    on_progress from the same thread.
+    """
+
+    def __init__(self, sinks: Sequence[LogSink], rate_limits: Optional[Dict[str, float]] = None,
+                 on_progress=None):
+        self.sinks = list(sinks)
+        self.limiter = RateLimiter(rate_limits)
+        self.on_progress = on_progress
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, entry: tuple):
+        self._queue.put(entry)
+
+    def put_progress(self, value: float):
+        self._queue.put(_Progress(value))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything logged so far (held records included) has reached the sinks"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    @staticmethod
+    def _record(entry: tuple) -> dict:
+        timestamp, category, step, message, payload = entry
+        record = {"time": timestamp, "category": category, "step": step, "message": message}
+        if payload:
+            record["data"] = payload
+        return record
+
+    def _emit(self, records: List[dict]):
+        if not records:
+            return
+        for sink in self.sinks:
+            try:
+                sink.emit(records)
+            except Exception:
+                traceback.print_exc()
+
+    def _report_progress(self, value: float):
+        try:
+            self.on_progress(value)
+        except Exception:
+            traceback.print_exc()
+
+    def _run(self):
+        while True:
+            try:
+                entries = [self._queue.get(timeout=self.limiter.next_release(time.time()))]
+            except queue.Empty:
+                entries = []
+            while True:
+                try:
+                    entries.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            now = time.time()
+            records, waiters, closing = [], [], False
+            for entry in entries:
+                if entry is None:
+                    closing = True
+                elif isinstance(entry, threading.Event):
+                    waiters.append(entry)
+                elif isinstance(entry, _Progress):
+                    # Records logged before the update reach the sinks first
+                    self._emit(records)
+                    records = []
+                    self._report_progress(entry.value)
+                else:
+                    records.extend(self.limiter.admit(self._record(entry), now))
+            records.extend(self.limiter.release(now, force=bool(waiters) or closing))
+            self._emit(records)
+            for waiter in waiters:
+                waiter.set()
+            if closing:
+                for sink in self.sinks:
+                    sink.close()
+                return
+
 class TrainingLogger:
-    def __init__(self, ui_logger: LoggerInterface):
+    """Structured, asynchronous logging for the trainer.
+
+    log() only timestamps the message and puts it on a queue, so the
+    training loop never waits on the window, the terminal or the disk. An
+    AsyncLogWriter builds the records (time, category, step, message and
+    any keyword payload) and hands them to ui_logger, to a size-rotated
+    JSONL file when log_file is set, and to any extra sinks. Categories in
+    rate_limits are limited to that many messages per second. Progress
+    updates are queued the same way and reach ui_logger in order with the
+    records; without a ui_logger they are dropped.
+    """
+
+    def __init__(self, ui_logger: Optional[LoggerInterface], log_file: Optional[str] = None,
+                 max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                 rate_limits: Optional[Dict[str, float]] = None, sinks: Sequence[LogSink] = ()):
         self.ui_logger = ui_logger
+        # Optimizer step the records are tagged with; kept current by the trainer's callbacks
+        self.step = None
+        all_sinks = [LoggerSink(ui_logger)] if ui_logger is not None else []
+        if log_file:
+            all_sinks.append(JSONLFileSink(log_file, max_bytes, backup_count))
+        self.writer = AsyncLogWriter(all_sinks + list(sinks), rate_limits,
+                                     on_progress=ui_logger.update_progress if ui_logger is not None else None)
+
+    def log(self, category: str, message: str, **payload):
+        self.writer.put((time.time(), category, self.step, message, payload))
 
-    def log(self, category: str, message: str):
-        self.ui_logger.update_log(category, message)
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        return self.writer.flush(timeout)
+
+    def close(self):
+        self.writer.close()
 
     def update_progress(self, progress: float):
-        progress = max(0, min(100, progress))
-        self.ui_logger.update_progress(progress) 
\ No newline at end of file
+        if self.ui_logger is None:
+            return
+        self.writer.put_progress(max(0, min(100, progress)))
+
+class ConsoleLogger:
+    """LoggerInterface sink for headless runs: plain log lines to a stream and/or a file.
+
+    Progress is only printed when it moved by at least progress_step percent,
+    so frequent updates from the trainer cost nothing but a comparison.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = sys.stderr, log_file: Optional[str] = None,
+                 progress_step: float = 1.0):
+        self.stream = stream
+        self.file = open(log_file, "a", buffering=1) if log_file else None
+        self.progress_step = progress_step
+        self.last_progress = None
+        self._lock = threading.Lock()
+
+    def _write(self, line: str):
+        with self._lock:
+            for out in (self.stream, self.file):
+                if out is not None:
+                    out.write(line)
+
+    def update_log(self, category: str, message: str) -> None:
+        formatted_time = datetime.now().strftime("%H:%M:%S")
+        self._write(f"[{formatted_time}] [{category}] {message}\n")
+
+    def update_progress(self, progress_value: float) -> None:
+        last = self.last_progress
+        if last is not None:
+            if progress_value == last:
+                return
+            if abs(progress_value - last) < self.progress_step and progress_value < 100:
+                return
+        self.last_progress = progress_value
+        self.update_log("PROGRESS", f"{progress_value:.0f}%")
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,174 @@
+import numpy as np
+
+
+class _GrowableArray:
+    """Append-only float64 array that doubles its capacity when full"""
+
+    def __init__(self, capacity: int = 1024):
+        self._data = np.empty(max(1, capacity), dtype=np.float64)
+        self._size = 0
+
+    def append(self, value: float):
+        if self._size == len(self._data):
+            grown = np.empty(len(self._data) * 2, dtype=np.float64)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size] = value
+        # Size is published last so a reader on another thread never sees an unwritten slot
+        self._size += 1
+
+    def view(self, start: int = 0, end: int = None) -> np.ndarray:
+        size = self._size
+        end = size if end is None else min(end, size)
+        return self._data[start:end]
+
+    def __getitem__(self, index):
+        return self._data[:self._size][index]
+
+    def __len__(self):
+        return self._size
+
+
+class _MinMaxLevel:
+    """One pyramid level: min/max/first-step of each completed block plus a partial block"""
+
+    def __init__(self):
+        self.steps = _GrowableArray()
+        self.mins = _GrowableArray()
+        self.maxs = _GrowableArray()
+        # Completed blocks readers may use; see add()
+        self.size = 0
+        self.count = 0
+        self.partial = None  # [first_step, min, max]
+
+    def add(self, step: float, low: float, high: float, block_size: int):
+        """Fold one child entry in; returns the completed block when it fills up"""
+        if self.partial is None:
+            self.partial = [step, low, high]
+        else:
+            self.partial[1] = min(self.partial[1], low)
+            self.partial[2] = max(self.partial[2], high)
+        self.count += 1
+
+        if self.count < block_size:
+            return None
+        completed = self.partial
+        self.steps.append(completed[0])
+        self.mins.append(completed[1])
+        self.maxs.append(completed[2])
+        # Published once all three arrays hold the block, so a reader on another
+        # thread never sees them at different lengths
+        self.size += 1
+        self.partial = None
+        self.count = 0
+        return completed
+
+
+class MetricSeries:
+    """Step/value history with O(1) appends, running averages and a min/max pyramid.
+
+    Values live in growable NumPy arrays instead of Python lists. A prefix sum
+    makes any trailing-window mean O(1), and a running mean and EMA are kept
+    incrementally. Each pyramid level summarizes block_size entries of the
+    level below as (min, max), so downsample() can hand a plot roughly one
+    point per pixel by reading a single level, whatever the series length.
+    """
+
+    def __init__(self, name: str = "", window: int = 50, ema_alpha: float = 0.1,
+                 block_size: int = 2, capacity: int = 1024):
+        self.name = name
+        self.window = window
+        self.ema_alpha = ema_alpha
+        self.block_size = block_size
+        self.steps = _GrowableArray(capacity)
+        self.values = _GrowableArray(capacity)
+        self._cumsum = _GrowableArray(capacity)
+        self.levels = []
+        self.ema = None
+        self.total = 0.0
+        # Trailing-window mean of every point, kept as its own series for plotting
+        self.average = None if window is None else MetricSeries(
+            f"{name} (avg)", window=None, block_size=block_size, capacity=capacity
+        )
+
+    @classmethod
+    def from_values(cls, values, **kwargs):
+        series = cls(**kwargs)
+        for value in values:
+            series.append(value)
+        return series
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def last(self):
+        return self.values[-1] if len(self.values) else None
+
+    @property
+    def running_mean(self):
+        return self.total / len(self.values) if len(self.values) else None
+
+    def window_mean(self, window: int = None) -> float:
+        """Mean of the last `window` values in O(1) using the prefix sum"""
+        size = len(self._cumsum)
+        if size == 0:
+            return None
+        window = min(window or self.window or size, size)
+        previous = self._cumsum[size - window - 1] if size > window else 0.0
+        return (self._cumsum[size - 1] - previous) / window
+
+    def append(self, value: float, step: float = None):
+        value = float(value)
+        step = float(len(self.values) if step is None else step)
+
+        self.total += value
+        self._cumsum.append(self.total)
+        self.steps.append(step)
+        self.values.append(value)
+        self.ema = value if self.ema is None else self.ema + self.ema_alpha * (value - self.ema)
+
+        if self.average is not None:
+            self.average.append(self.window_mean(), step)
+
+        # Fold the point up the pyramid; a level is added when the top one completes a block
+        entry = (step, value, value)
+        depth = 0
+        while entry is not None:
+            if depth == len(self.levels):
+                self.levels.append(_MinMaxLevel())
+            entry = self.levels[depth].add(*entry, self.block_size)
+            depth += 1
+
+    def downsample(self, max_points: int):
+        """Return (steps, values) with at most ~max_points points preserving min/max spikes"""
+        size = len(self.values)
+        if size <= max_points:
+            return self.steps.view(0, size).copy(), self.values.view(0, size).copy()
+
+        # Pick the finest level whose (min, max) pairs fit in max_points
+        for depth, level in enumerate(self.levels):
+            if 2 * (level.size + 1) <= max_points:
+                break
+
+        count = level.size
+        steps = level.steps.view(0, count)
+        lows = level.mins.view(0, count)
+        highs = level.maxs.view(0, count)
+
+        # Points not yet folded into a completed block at this level sit in the
+        # partial blocks of this and every finer level; merge them as one tail segment.
+        # Each partial is read once: the writer may complete (and clear) it meanwhile
+        partials = [lvl.partial for lvl in self.levels[:depth + 1]]
+        tail = [partial for partial in partials if partial is not None]
+        if tail:
+            steps = np.append(steps, min(partial[0] for partial in tail))
+            lows = np.append(lows, min(partial[1] for partial in tail))
+            highs = np.append(highs, max(partial[2] for partial in tail))
+
+        # Each block becomes a vertical min-max segment at its first step
+        xs = np.repeat(steps, 2)
+        ys = np.empty(len(xs), dtype=np.float64)
+        ys[0::2] = lows
+        ys[1::2] = highs
+        return xs, ys
@@ -0,0 +1,206 @@
+import json
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+COLUMN_SUFFIX = ".f64"
+DEFAULT_CHUNK_ROWS = 65536
+
+
+class RunLog:
+    """Append-only columnar metrics log for one training run.
+
+    Every column is a flat float64 file under <run_dir>/metrics/ (missing
+    values are NaN), so appending is a sequential write and readers can
+    memory-map any column without parsing. append() only puts the row on a
+    queue; a background thread buffers rows and writes them in blocks of
+    flush_rows or every flush_interval seconds. Columns may appear at any
+    step; earlier rows are back-filled with NaN.
+    """
+
+    def __init__(self, run_dir: str, flush_rows: int = 1024, flush_interval: float = 2.0):
+        self.run_dir = run_dir
+        self.metrics_dir = os.path.join(run_dir, "metrics")
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._columns: List[str] = []
+        self._files = {}
+        self.rows_written = 0
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def append(self, **values):
+        """Queue one row; never blocks the caller on disk IO"""
+        values.setdefault("timestamp", time.time())
+        self._queue.put(values)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+    def _open_column(self, name: str):
+        f = open(os.path.join(self.metrics_dir, name + COLUMN_SUFFIX), "ab")
+        if self.rows_written:
+            # Back-fill a column that first appears mid-run
+            np.full(self.rows_written, np.nan).tofile(f)
+        self._files[name] = f
+        self._columns.append(name)
+        # Replaced atomically: live readers (watch mode, the run registry) poll the schema
+        schema_path = os.path.join(self.metrics_dir, "schema.json")
+        with open(schema_path + ".tmp", "w") as schema:
+            json.dump({"columns": self._columns, "dtype": "float64"}, schema)
+        os.replace(schema_path + ".tmp", schema_path)
+
+    def _flush(self, rows: List[Dict]):
+        if not rows:
+            return
+        for row in rows:
+            for name in row:
+                if name not in self._files:
+                    self._open_column(name)
+        for name in self._columns:
+            column = np.array([row.get(name, np.nan) for row in rows], dtype=np.float64)
+            column.tofile(self._files[name])
+            self._files[name].flush()
+        self.rows_written += len(rows)
+
+    def _write_loop(self):
+        rows = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ...
+            if item is None:
+                self._flush(rows)
+                return
+            if item is not ...:
+                rows.append(item)
+            if len(rows) >= self.flush_rows or time.monotonic() >= deadline:
+                self._flush(rows)
+                rows = []
+                deadline = time.monotonic() + self.flush_interval
+
+
+class RunLogReader:
+    """Chunked, memory-mapped access to a RunLog directory (also while it is being written)"""
+
+    def __init__(self, run_dir: str):
+        self.run_dir = run_dir
+        self.metrics_dir = os.path.join(run_dir, "metrics")
+
+    @property
+    def columns(self) -> List[str]:
+        schema_path = os.path.join(self.metrics_dir, "schema.json")
+        if not os.path.exists(schema_path):
+            return []
+        with open(schema_path) as f:
+            return json.load(f)["columns"]
+
+    def _path(self, column: str) -> str:
+        return os.path.join(self.metrics_dir, column + COLUMN_SUFFIX)
+
+    def __len__(self):
+        # Columns are written one after another, so the shortest one bounds complete rows
+        sizes = [os.path.getsize(self._path(column)) for column in self.columns]
+        return min(sizes) // 8 if sizes else 0
+
+    def column(self, name: str, rows: Optional[int] = None) -> np.ndarray:
+        rows = len(self) if rows is None else rows
+        if rows == 0:
+            return np.empty(0, dtype=np.float64)
+        return np.memmap(self._path(name), dtype=np.float64, mode="r", shape=(rows,))
+
+    def iter_chunks(self, chunk_rows: int = DEFAULT_CHUNK_ROWS, columns: Optional[List[str]] = None,
+                    start: int = 0) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield {column: array} blocks of complete rows from `start` on (for tailing a live run)"""
+        columns = columns or self.columns
+        rows = len(self)
+        mapped = {name: self.column(name, rows) for name in columns}
+        for offset in range(start, rows, chunk_rows):
+            yield {name: np.asarray(data[offset:offset + chunk_rows]) for name, data in mapped.items()}
+
+
+def export_csv(reader: RunLogReader, path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    columns = reader.columns
+    with open(path, "w", newline="") as f:
+        f.write(",".join(columns) + "\n")
+        for chunk in reader.iter_chunks(chunk_rows, columns):
+            # Format whole columns at once; NaN becomes an empty field
+            formatted = [
+                np.where(np.isnan(chunk[name]), "", np.char.mod("%.15g", chunk[name])).tolist()
+                for name in columns
+            ]
+            f.write("".join(",".join(row) + "\n" for row in zip(*formatted)))
+    return path
+
+
+def export_json(reader: RunLogReader, path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """Write a JSON array of row objects, streaming one chunk at a time"""
+    columns = reader.columns
+    with open(path, "w") as f:
+        f.write("[")
+        first = True
+        for chunk in reader.iter_chunks(chunk_rows, columns):
+            values = [chunk[name].tolist() for name in columns]
+            # NaN (value != value) marks a metric that was not logged at that step
+            records = [
+                {name: value for name, value in zip(columns, row) if value == value}
+                for row in zip(*values)
+            ]
+            if records:
+                f.write(("" if first else ",") + json.dumps(records)[1:-1])
+                first = False
+        f.write("]\n")
+    return path
+
+
+def export_numpy(reader: RunLogReader, path: str):
+    """Save every column into one .npz; columns are memory-mapped, not loaded up front"""
+    rows = len(reader)
+    np.savez(path, **{name: reader.column(name, rows) for name in reader.columns})
+    return path
+
+
+def export_parquet(reader: RunLogReader, path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """Write a Parquet file one row group per chunk; returns None if pyarrow is unavailable"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+
+    columns = reader.columns
+    schema = pa.schema([(name, pa.float64()) for name in columns])
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in reader.iter_chunks(chunk_rows, columns):
+            writer.write_table(pa.table({name: chunk[name] for name in columns}, schema=schema))
+    return path
+
+
+def export_run(run_dir: str, export_dir: Optional[str] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Dict[str, str]:
+    """Export a run log to CSV, JSON, NumPy and (when available) Parquet"""
+    reader = RunLogReader(run_dir)
+    export_dir = export_dir or os.path.join(run_dir, "export")
+    os.makedirs(export_dir, exist_ok=True)
+
+    written = {
+        "csv": export_csv(reader, os.path.join(export_dir, "metrics.csv"), chunk_rows),
+        "json": export_json(reader, os.path.join(export_dir, "metrics.json"), chunk_rows),
+        "npz": export_numpy(reader, os.path.join(export_dir, "metrics.npz")),
+    }
+    parquet_path = export_parquet(reader, os.path.join(export_dir, "metrics.parquet"), chunk_rows)
+    if parquet_path:
+        written["parquet"] = parquet_path
+    return written
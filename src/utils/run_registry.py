@@ -0,0 +1,218 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .run_log import COLUMN_SUFFIX, DEFAULT_CHUNK_ROWS, RunLogReader
+
+RUN_FILE = "run.json"
+INDEX_FILE = "index.json"
+# Loss, step and throughput are read from the end of the log; eval rows in between are NaN
+SUMMARY_COLUMNS = ("loss", "step", "samples_per_second", "tokens_per_second")
+
+
+def _write_json(path: str, data):
+    """Replace path atomically, so a reader never sees a half-written file"""
+    # Per-process temporary name: the trainer and a dashboard may update the index at once
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(temporary, path)
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def last_valid(column: np.ndarray, block_rows: int = 4096) -> Optional[float]:
+    """Newest non-NaN value of a (memory-mapped) column, reading backwards block by block"""
+    end = len(column)
+    while end > 0:
+        block = np.asarray(column[max(0, end - block_rows):end])
+        valid = block[~np.isnan(block)]
+        if len(valid):
+            return float(valid[-1])
+        end -= block_rows
+    return None
+
+
+def summarize_run(run_dir: str) -> dict:
+    """Rows, last step, final loss, latest throughput and best eval loss of a run log"""
+    reader = RunLogReader(run_dir)
+    columns = reader.columns
+    rows = len(reader)
+    summary = {"rows": rows}
+    for name in SUMMARY_COLUMNS:
+        summary[name] = last_valid(reader.column(name, rows)) if name in columns and rows else None
+    summary["final_loss"] = summary.pop("loss")
+    summary["best_eval_loss"] = None
+    if "eval_loss" in columns and rows:
+        eval_loss = reader.column("eval_loss", rows)
+        if not np.isnan(eval_loss).all():
+            summary["best_eval_loss"] = float(np.nanmin(eval_loss))
+    if "timestamp" in columns and rows:
+        timestamps = reader.column("timestamp", rows)
+        summary["first_timestamp"] = float(timestamps[0])
+        summary["last_timestamp"] = float(timestamps[-1])
+    return summary
+
+
+def load_curve(reader: RunLogReader, column: str, max_points: int, x_column: str = "step",
+               chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+    """(x, y) of a run log column with NaN rows dropped, at most about max_points long.
+
+    Longer columns are cut into max_points / 2 buckets of consecutive rows and
+    each bucket keeps its minimum and maximum, in the order they occur, so
+    spikes survive downsampling. The column is memory-mapped and read a
+    chunk at a time, so a multi-million-row log never sits in memory whole.
+    """
+    rows = len(reader)
+    if column not in reader.columns or rows == 0:
+        return np.empty(0), np.empty(0)
+    y_all = reader.column(column, rows)
+    x_all = reader.column(x_column, rows) if x_column in reader.columns else None
+    buckets = max(1, max_points // 2)
+    bucket_rows = math.ceil(rows / buckets)
+    chunk_rows = bucket_rows * max(1, chunk_rows // bucket_rows)
+
+    xs, ys = [], []
+    for start in range(0, rows, chunk_rows):
+        y = np.asarray(y_all[start:start + chunk_rows], dtype=np.float64)
+        x = (np.asarray(x_all[start:start + chunk_rows], dtype=np.float64) if x_all is not None
+             else np.arange(start, start + len(y), dtype=np.float64))
+        if bucket_rows == 1:
+            valid = ~np.isnan(y) & ~np.isnan(x)
+            xs.append(x[valid])
+            ys.append(y[valid])
+            continue
+        pad = -len(y) % bucket_rows
+        if pad:
+            y = np.concatenate([y, np.full(pad, np.nan)])
+            x = np.concatenate([x, np.full(pad, np.nan)])
+        y = y.reshape(-1, bucket_rows)
+        x = x.reshape(-1, bucket_rows)
+        valid = ~np.isnan(y)
+        low = np.where(valid, y, np.inf).argmin(axis=1)
+        high = np.where(valid, y, -np.inf).argmax(axis=1)
+        order = np.stack([np.minimum(low, high), np.maximum(low, high)], axis=1)
+        keep = valid.any(axis=1)
+        index = np.arange(len(y))[:, None]
+        xs.append(x[index, order][keep].ravel())
+        ys.append(y[index, order][keep].ravel())
+    x = np.concatenate(xs)
+    y = np.concatenate(ys)
+    valid = ~np.isnan(x)
+    return x[valid], y[valid]
+
+
+class RunRegistry:
+    """Index of the run logs under one directory, for listing and comparing runs.
+
+    The trainer registers each run with its configuration and marks it
+    finished; both are kept in the run's run.json. Listing reads a single
+    index.json holding every run's configuration and summary (final loss,
+    throughput, best eval loss). An entry is only re-summarized when the
+    run's log or run.json changed since it was indexed, so runs logged
+    before the registry existed are picked up too. Curves are loaded on
+    demand, downsampled, and kept in a small LRU cache that is refreshed
+    when a live run has grown.
+    """
+
+    def __init__(self, root: str, cache_curves: int = 64):
+        self.root = root
+        self.index_file = os.path.join(root, INDEX_FILE)
+        self.cache_curves = cache_curves
+        self._curves = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, run_dir: str, config: Optional[dict] = None):
+        os.makedirs(run_dir, exist_ok=True)
+        _write_json(os.path.join(run_dir, RUN_FILE), {
+            "started": time.time(),
+            "status": "running",
+            "config": config or {},
+        })
+
+    def finish(self, run_dir: str, status: str = "completed"):
+        """Record how the run ended and refresh its index entry"""
+        path = os.path.join(run_dir, RUN_FILE)
+        run = _read_json(path) or {"config": {}}
+        run.update(status=status, finished=time.time())
+        _write_json(path, run)
+        self.runs()
+
+    @staticmethod
+    def _stamp(run_dir: str) -> list:
+        """Changes whenever rows are appended to the run log or run.json is rewritten"""
+        stamp = []
+        for path in (os.path.join(run_dir, RUN_FILE),
+                     os.path.join(run_dir, "metrics", "timestamp" + COLUMN_SUFFIX)):
+            try:
+                stat = os.stat(path)
+                stamp += [stat.st_mtime_ns, stat.st_size]
+            except OSError:
+                stamp += [0, 0]
+        return stamp
+
+    def _entry(self, name: str, run_dir: str, stamp: list) -> dict:
+        run = _read_json(os.path.join(run_dir, RUN_FILE)) or {}
+        summary = summarize_run(run_dir)
+        return dict(
+            summary,
+            name=name,
+            run_dir=run_dir,
+            stamp=stamp,
+            config=run.get("config", {}),
+            status=run.get("status", "unknown"),
+            # Runs logged before registration existed start at their first row
+            started=run.get("started", summary.get("first_timestamp")),
+            finished=run.get("finished"),
+        )
+
+    def runs(self) -> List[dict]:
+        """Every run under root, newest first; only changed runs are re-read"""
+        if not os.path.isdir(self.root):
+            return []
+        index = _read_json(self.index_file) or {}
+        entries = {}
+        changed = False
+        for name in os.listdir(self.root):
+            run_dir = os.path.join(self.root, name)
+            if not os.path.isdir(os.path.join(run_dir, "metrics")):
+                continue
+            stamp = self._stamp(run_dir)
+            entry = index.get(name)
+            if entry is None or entry.get("stamp") != stamp:
+                entry = self._entry(name, run_dir, stamp)
+                changed = True
+            entries[name] = entry
+        if changed or set(entries) != set(index):
+            _write_json(self.index_file, entries)
+        return sorted(entries.values(), key=lambda entry: entry.get("started") or 0, reverse=True)
+
+    def curve(self, run_dir: str, column: str, max_points: int, x_column: str = "step"):
+        """Downsampled (x, y) of one column of a run; cached until the run log grows"""
+        reader = RunLogReader(run_dir)
+        rows = len(reader)
+        key = (run_dir, column, max_points, x_column)
+        with self._lock:
+            cached = self._curves.get(key)
+            if cached is not None and cached[0] == rows:
+                self._curves.move_to_end(key)
+                return cached[1]
+        curve = load_curve(reader, column, max_points, x_column)
+        with self._lock:
+            self._curves[key] = (rows, curve)
+            self._curves.move_to_end(key)
+            while len(self._curves) > self.cache_curves:
+                self._curves.popitem(last=False)
+        return curve
@@ -0,0 +1,83 @@
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+import psutil
+
+# "import time: self [us] | cumulative | imported package", indented by nesting depth
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| *(\S+)$")
+
+
+def seconds_since_launch() -> float:
+    """Wall-clock time since the interpreter process was created (includes Python's own startup)"""
+    return max(0.0, time.time() - psutil.Process().create_time())
+
+
+class StartupTimer:
+    """Times named startup phases and optionally reports each one as it starts and ends"""
+
+    def __init__(self, log_callback=None):
+        self.log_callback = log_callback
+        self.phases: List[Tuple[str, float]] = []
+
+    def _log(self, message: str):
+        if self.log_callback:
+            self.log_callback("STARTUP", message)
+
+    @contextmanager
+    def phase(self, name: str):
+        self._log(f"{name}...")
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        self.phases.append((name, elapsed))
+        self._log(f"{name} took {elapsed:.2f}s")
+
+    def mark(self, name: str) -> float:
+        """Record a milestone (e.g. first frame) as seconds since launch"""
+        elapsed = seconds_since_launch()
+        self.phases.append((name, elapsed))
+        self._log(f"{name} {elapsed:.2f}s after launch")
+        return elapsed
+
+    def report(self) -> List[str]:
+        return [f"{name:<32} {elapsed:8.3f}s" for name, elapsed in self.phases]
+
+
+def import_times(module: str, python: Optional[str] = None) -> List[Tuple[str, float, int]]:
+    """Import `module` in a fresh interpreter with -X importtime.
+
+    Returns (package, seconds, modules) per top-level package, slowest first.
+    Time is the sum of each submodule's self time, so the entries add up to
+    the total import cost and a slow package is charged for its own code only.
+    """
+    result = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    totals = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            package = match.group(3).split(".")[0]
+            seconds, count = totals.get(package, (0.0, 0))
+            totals[package] = (seconds + int(match.group(1)) / 1e6, count + 1)
+    return sorted(((name, seconds, count) for name, (seconds, count) in totals.items()),
+                  key=lambda entry: entry[1], reverse=True)
+
+
+def import_time_report(modules: List[str], top: int = 10) -> List[str]:
+    """Per-package import-time breakdown for each module, for catching time-to-first-frame regressions"""
+    lines = []
+    for module in modules:
+        entries = import_times(module)
+        lines.append(f"{module}: {sum(seconds for _, seconds, _ in entries):.3f}s total")
+        for name, seconds, count in entries[:top]:
+            lines.append(f"  {name:<24} {seconds:8.3f}s  ({count} modules)")
+    return lines
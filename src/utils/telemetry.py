@@ -0,0 +1,226 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import psutil
+
+# Scalar readings per sample; per-core CPU is kept in a separate 2-D ring
+TELEMETRY_FIELDS = (
+    "timestamp",
+    "process_cpu",        # trainer process, % of one core
+    "process_rss_mb",
+    "process_threads",
+    "workers",            # child processes (dataloader workers)
+    "workers_cpu",        # summed over workers, % of one core
+    "workers_rss_mb",
+    "process_write_mbps", # trainer + workers
+    "system_cpu",         # mean over cores
+    "cores_busy",         # cores at or above the busy threshold
+    "memory_percent",
+    "swap_percent",
+    "disk_percent",
+    "disk_read_mbps",
+    "disk_write_mbps",
+    "overhead_percent",   # sampler thread CPU time / wall time
+)
+
+BUSY_CORE_PERCENT = 90.0
+
+
+class TelemetryRing:
+    """Fixed-capacity ring of telemetry samples stored as float64 columns"""
+
+    def __init__(self, capacity: int, cores: int):
+        self.capacity = max(1, capacity)
+        self._values = np.full((self.capacity, len(TELEMETRY_FIELDS)), np.nan)
+        self._cores = np.full((self.capacity, max(1, cores)), np.nan)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def append(self, sample: Dict[str, float], per_core):
+        with self._lock:
+            row = self._count % self.capacity
+            self._values[row] = [sample.get(name, np.nan) for name in TELEMETRY_FIELDS]
+            self._cores[row, :len(per_core)] = per_core
+            self._count += 1
+
+    def _order(self):
+        if self._count <= self.capacity:
+            return np.arange(self._count)
+        start = self._count % self.capacity
+        return np.concatenate([np.arange(start, self.capacity), np.arange(start)])
+
+    def column(self, name: str) -> np.ndarray:
+        """Oldest-to-newest copy of one field"""
+        with self._lock:
+            return self._values[self._order(), TELEMETRY_FIELDS.index(name)]
+
+    def per_core(self) -> np.ndarray:
+        """Oldest-to-newest copy of per-core CPU, shape (samples, cores)"""
+        with self._lock:
+            return self._cores[self._order()]
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+
+def _disk_name_for_path(path: str) -> Optional[str]:
+    """Block device name (as used by disk_io_counters) holding path, if it can be found"""
+    path = os.path.realpath(path)
+    best = None
+    for partition in psutil.disk_partitions(all=False):
+        mountpoint = partition.mountpoint
+        if path == mountpoint or path.startswith(mountpoint.rstrip(os.sep) + os.sep):
+            if best is None or len(mountpoint) > len(best.mountpoint):
+                best = partition
+    return os.path.basename(best.device) if best is not None else None
+
+
+def _existing_parent(path: str) -> str:
+    path = os.path.abspath(path)
+    while not os.path.exists(path) and os.path.dirname(path) != path:
+        path = os.path.dirname(path)
+    return path
+
+
+class TelemetrySampler:
+    """Samples trainer process, worker, per-core CPU, swap and disk telemetry on a thread.
+
+    Every reading goes into a TelemetryRing and, if given, to callback(sample,
+    per_core) as one dict so a UI can apply it in a single update. Readings
+    are rate-based (CPU % and MB/s since the previous sample), so the first
+    one after start() reports zeros. psutil.Process objects are cached per
+    pid because their cpu_percent() is measured between calls on the same
+    object. The sampler's own cost is reported as overhead_percent.
+    """
+
+    def __init__(self, interval: float = 1.0, history: int = 600, watch_path: str = "./results",
+                 callback: Optional[Callable] = None, pid: Optional[int] = None):
+        self.interval = interval
+        self.watch_path = watch_path
+        self.callback = callback
+        self.process = psutil.Process(pid)
+        self.cores = psutil.cpu_count() or 1
+        self.ring = TelemetryRing(history, self.cores)
+        self._workers: Dict[int, psutil.Process] = {}
+        self._disk_name = _disk_name_for_path(_existing_parent(watch_path))
+        self._previous = None  # (time, disk read, disk write, process write)
+        self._stop = threading.Event()
+        self._thread = None
+        self.latest = None
+
+        # Prime the delta-based counters so the first real sample covers one interval
+        self.process.cpu_percent(None)
+        psutil.cpu_percent(percpu=True)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except psutil.Error:
+                # The trainer process went away; nothing left to observe
+                return
+
+    def _worker_processes(self):
+        children = {child.pid: child for child in self.process.children(recursive=True)}
+        for pid in list(self._workers):
+            if pid not in children:
+                del self._workers[pid]
+        for pid, child in children.items():
+            if pid not in self._workers:
+                self._workers[pid] = child
+                child.cpu_percent(None)  # first call only starts the measurement
+        return list(self._workers.values())
+
+    def _disk_counters(self):
+        if self._disk_name is not None:
+            counters = psutil.disk_io_counters(perdisk=True).get(self._disk_name)
+            if counters is not None:
+                return counters
+        return psutil.disk_io_counters()
+
+    @staticmethod
+    def _write_bytes(process) -> int:
+        try:
+            return process.io_counters().write_bytes
+        except (psutil.Error, AttributeError):
+            # io_counters is missing on macOS and denied for some processes
+            return 0
+
+    def sample(self) -> Dict[str, float]:
+        """Take one reading now, store it and pass it to the callback"""
+        cpu_start = time.thread_time()
+        now = time.time()
+
+        with self.process.oneshot():
+            process_cpu = self.process.cpu_percent(None)
+            process_rss = self.process.memory_info().rss
+            process_threads = self.process.num_threads()
+            process_write = self._write_bytes(self.process)
+
+        workers_cpu = workers_rss = 0.0
+        workers = self._worker_processes()
+        for worker in workers:
+            try:
+                with worker.oneshot():
+                    workers_cpu += worker.cpu_percent(None)
+                    workers_rss += worker.memory_info().rss
+                    process_write += self._write_bytes(worker)
+            except psutil.Error:
+                # Worker exited between listing and reading
+                continue
+
+        per_core = psutil.cpu_percent(percpu=True)
+        disk = self._disk_counters()
+        disk_read = disk.read_bytes if disk else 0
+        disk_write = disk.write_bytes if disk else 0
+
+        rates = (0.0, 0.0, 0.0)
+        if self._previous is not None:
+            elapsed = max(now - self._previous[0], 1e-6)
+            rates = tuple(max(0, current - previous) / elapsed / 2 ** 20 for current, previous in
+                          zip((disk_read, disk_write, process_write), self._previous[1:]))
+        self._previous = (now, disk_read, disk_write, process_write)
+
+        try:
+            disk_percent = psutil.disk_usage(_existing_parent(self.watch_path)).percent
+        except OSError:
+            disk_percent = float("nan")
+
+        sample = {
+            "timestamp": now,
+            "process_cpu": process_cpu,
+            "process_rss_mb": process_rss / 2 ** 20,
+            "process_threads": process_threads,
+            "workers": len(workers),
+            "workers_cpu": workers_cpu,
+            "workers_rss_mb": workers_rss / 2 ** 20,
+            "process_write_mbps": rates[2],
+            "system_cpu": float(np.mean(per_core)) if per_core else 0.0,
+            "cores_busy": sum(1 for percent in per_core if percent >= BUSY_CORE_PERCENT),
+            "memory_percent": psutil.virtual_memory().percent,
+            "swap_percent": psutil.swap_memory().percent,
+            "disk_percent": disk_percent,
+            "disk_read_mbps": rates[0],
+            "disk_write_mbps": rates[1],
+        }
+        sample["overhead_percent"] = (time.thread_time() - cpu_start) / max(self.interval, 1e-6) * 100
+        self.ring.append(sample, per_core)
+        self.latest = sample
+        if self.callback:
+            self.callback(sample, per_core)
+        return sample
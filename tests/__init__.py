@@ -1,7 +1,59 @@
 from .training.test_trainer import TestModelTrainer
+from .training.test_tokenizer import TestModelTokenizer, TestCausalLMCollator, TestTokenizationProgress
+from .training.test_token_store import TestTokenStore
+from .training.test_streaming import TestStreamingTokenDataset
 from .ui.test_training_window import TestTrainingWindow
+from .ui.test_event_bus import TestUIEventBus
+from .ui.test_plot_renderer import TestBlitPlotRenderer
+from .ui.test_log_console import TestLogConsole, TestLogStore
+from .utils.test_metric_series import TestMetricSeries
+from .utils.test_run_log import TestRunLog
+from .utils.test_run_registry import TestRunRegistry
+from .utils.test_logger import TestConsoleLogger, TestTrainingLogger
+from .utils.test_startup import TestStartup
+from .utils.test_telemetry import TestTelemetry
+from .utils.test_event_stream import TestEventStream
+from .training.test_control import TestTrainingControl, TestResumableRandomSampler, TestResumableTrainer
+from .training.test_checkpoint import TestAsyncCheckpointWriter
+from .training.test_throughput import TestThroughput
+from .training.test_evaluation import TestEvaluation
+from .training.test_cpu_profile import TestCPUProfile
+from .training.test_batch_finder import TestBatchSizeFinder
+from .training.test_distributed import TestDistributed
+from .training.test_profiler import TestStepProfiler
+from .training.test_memory import TestMemory
+from .benchmarks.test_suite import TestBenchmarkSuite
 
 __all__ = [
     'TestModelTrainer',
-    'TestTrainingWindow'
+    'TestModelTokenizer',
+    'TestCausalLMCollator',
+    'TestTokenizationProgress',
+    'TestTokenStore',
+    'TestStreamingTokenDataset',
+    'TestTrainingWindow',
+    'TestUIEventBus',
+    'TestBlitPlotRenderer',
+    'TestLogConsole',
+    'TestLogStore',
+    'TestMetricSeries',
+    'TestRunLog',
+    'TestRunRegistry',
+    'TestConsoleLogger',
+    'TestTrainingLogger',
+    'TestStartup',
+    'TestTelemetry',
+    'TestEventStream',
+    'TestTrainingControl',
+    'TestResumableRandomSampler',
+    'TestResumableTrainer',
+    'TestAsyncCheckpointWriter',
+    'TestThroughput',
+    'TestEvaluation',
+    'TestCPUProfile',
+    'TestBatchSizeFinder',
+    'TestDistributed',
+    'TestStepProfiler',
+    'TestMemory',
+    'TestBenchmarkSuite'
 ]
\ No newline at end of file
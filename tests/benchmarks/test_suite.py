@@ -0,0 +1,32 @@
+import unittest
+from benchmarks.fixtures import build_tokenizer, synthetic_corpus
+from benchmarks.suite import compare
+
+
+def results(**metrics):
+    return {"results": {"trainer.step": metrics}}
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_flags_slower_times_and_lower_throughput(self):
+        baseline = results(step_median_ms=50.0, samples_per_sec=100.0, wall_s=1.0)
+        current = results(step_median_ms=70.0, samples_per_sec=70.0, wall_s=1.1)
+        regressions = compare(current, baseline, tolerance=0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("trainer.step step_median_ms"))
+        self.assertIn("samples_per_sec", regressions[1])
+
+    def test_ignores_noise_max_and_new_metrics(self):
+        baseline = results(append_median_ms=0.002, step_max_ms=10.0, path="headless")
+        current = results(append_median_ms=0.02, step_max_ms=100.0, path="window", tokens_per_sec=5.0)
+        self.assertEqual(compare(current, baseline), [])
+
+    def test_fixtures_build_offline(self):
+        tokenizer = build_tokenizer(vocab_size=400)
+        self.assertEqual(tokenizer.pad_token, tokenizer.eos_token)
+        line = next(text for text in synthetic_corpus(50) if text)
+        self.assertEqual(tokenizer.decode(tokenizer(line)["input_ids"]), line)
+
+
+if __name__ == '__main__':
+    unittest.main()
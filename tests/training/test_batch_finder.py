@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+import torch
+from transformers import GPT2Config, GPT2LMHeadModel
+from src.training.batch_finder import BatchSizeFinder, accumulation_for
+from src.training.tokenizer import CausalLMCollator
+
+
+class TestBatchSizeFinder(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.test_dir, "batch_size.json")
+        torch.manual_seed(0)
+        self.model = GPT2LMHeadModel(GPT2Config(vocab_size=50, n_positions=16, n_embd=16, n_layer=1, n_head=2))
+        self.rows = [{"input_ids": list(range(i, i + 16)), "attention_mask": [1] * 16} for i in range(8)]
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_accumulation_for(self):
+        self.assertEqual(accumulation_for(2, 8), 4)
+        self.assertEqual(accumulation_for(3, 8), 3)  # rounds up: at least the requested batch
+        self.assertEqual(accumulation_for(16, 8), 1)
+        self.assertEqual(accumulation_for(2, 8, world_size=2), 2)
+
+    def test_choose_respects_effective_batch(self):
+        probes = [{"micro_batch": size, "tokens_per_second": tps} for size, tps in ((1, 100), (2, 180), (4, 300))]
+        self.assertEqual(BatchSizeFinder.choose(probes, per_device_limit=8)["micro_batch"], 4)
+        self.assertEqual(BatchSizeFinder.choose(probes, per_device_limit=2)["micro_batch"], 2)
+
+    def test_find_probes_once_then_uses_cache(self):
+        finder = BatchSizeFinder(self.cache_file, max_micro_batch=4, probe_steps=1)
+        weights = {name: value.clone() for name, value in self.model.state_dict().items()}
+
+        choice = finder.find(self.model, self.rows, CausalLMCollator(), 16, effective_batch_size=8)
+        self.assertIn(choice["micro_batch"], (1, 2, 4))
+        self.assertEqual(choice["micro_batch"] * choice["gradient_accumulation_steps"], 8)
+        for name, value in self.model.state_dict().items():
+            self.assertTrue(torch.equal(value, weights[name]), name)
+
+        with open(self.cache_file) as f:
+            cache = json.load(f)
+        key = BatchSizeFinder.cache_key(self.model, 16, bf16=False)
+        self.assertIn(key, cache)
+        self.assertTrue(all(probe["peak_rss_mb"] > 0 for probe in cache[key]["probes"]))
+
+        # A cached table is reused without probing; only the accumulation is re-solved
+        cache[key]["probes"] = [{"micro_batch": 2, "tokens_per_second": 1.0, "step_seconds": 1.0, "peak_rss_mb": 1.0}]
+        with open(self.cache_file, "w") as f:
+            json.dump(cache, f)
+        choice = finder.find(self.model, [], CausalLMCollator(), 16, effective_batch_size=16)
+        self.assertEqual((choice["micro_batch"], choice["gradient_accumulation_steps"]), (2, 8))
+
+        args = SimpleNamespace()
+        finder.apply(choice, args)
+        self.assertEqual((args.per_device_train_batch_size, args.gradient_accumulation_steps), (2, 8))
+
+    def test_cache_key_separates_checkpointing_and_processes(self):
+        keys = {
+            BatchSizeFinder.cache_key(self.model, 16, bf16=False),
+            BatchSizeFinder.cache_key(self.model, 16, bf16=False, gradient_checkpointing=True),
+            BatchSizeFinder.cache_key(self.model, 16, bf16=False, processes=2),
+        }
+        self.assertEqual(len(keys), 3)
+
+    def test_checkpointed_probe_leaves_model_as_found(self):
+        finder = BatchSizeFinder(self.cache_file, max_micro_batch=2, probe_steps=1)
+        probes = finder.probe(self.model, self.rows, CausalLMCollator(), gradient_checkpointing=True)
+        self.assertTrue(probes)
+        self.assertFalse(self.model.is_gradient_checkpointing)
+
+    def test_memory_budget_stops_probing(self):
+        finder = BatchSizeFinder(self.cache_file, max_micro_batch=8, probe_steps=1, memory_fraction=0.0)
+        probes = finder.probe(self.model, self.rows, CausalLMCollator())
+        # The smallest size is always kept so training can start
+        self.assertEqual([probe["micro_batch"] for probe in probes], [1])
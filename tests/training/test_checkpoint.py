@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+import torch
+from src.training.checkpoint import AsyncCheckpointWriter, CheckpointSnapshot, to_host, list_checkpoints
+
+
+class _FakeModel:
+    def save_pretrained(self, directory, state_dict=None):
+        torch.save(state_dict, os.path.join(directory, "model.pt"))
+
+
+class _FailingModel:
+    def save_pretrained(self, directory, state_dict=None):
+        raise OSError("disk full")
+
+
+def _snapshot(run_dir, step, model=None, best=None):
+    return CheckpointSnapshot(
+        run_dir=run_dir,
+        output_dir=os.path.join(run_dir, f"checkpoint-{step}"),
+        model=model or _FakeModel(),
+        model_state={"weight": torch.ones(2)},
+        optimizer_state={"state": {}},
+        scheduler_state={"last_epoch": step},
+        scaler_state=None,
+        rng_state={"cpu": torch.random.get_rng_state()},
+        trainer_state_json='{"global_step": %d}\n' % step,
+        training_args=None,
+        best_checkpoint=best
+    )
+
+
+class TestAsyncCheckpointWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.run_dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_to_host_copies_and_keeps_sharing(self):
+        weight = torch.randn(3, 2)
+        state = {"embed": weight, "head": weight, "nested": [{"step": torch.tensor(4.0)}], "lr": 0.1}
+        copy = to_host(state)
+        self.assertIs(copy["embed"], copy["head"])
+        self.assertIsNot(copy["embed"], weight)
+        weight.add_(1.0)
+        self.assertFalse(torch.equal(copy["embed"], weight))
+        self.assertEqual(copy["nested"][0]["step"].item(), 4.0)
+        self.assertEqual(copy["lr"], 0.1)
+
+    def test_writes_complete_checkpoint(self):
+        writer = AsyncCheckpointWriter(keep_last=3)
+        writer.submit(_snapshot(self.run_dir, 5))
+        writer.close()
+        files = set(os.listdir(os.path.join(self.run_dir, "checkpoint-5")))
+        self.assertTrue({"model.pt", "optimizer.pt", "scheduler.pt", "rng_state.pth", "trainer_state.json"} <= files)
+        self.assertNotIn("scaler.pt", files)
+        self.assertFalse(os.path.exists(os.path.join(self.run_dir, "checkpoint-5.tmp")))
+
+    def test_rotation_keeps_last_and_best(self):
+        writer = AsyncCheckpointWriter(keep_last=2, keep_best=True)
+        best = os.path.join(self.run_dir, "checkpoint-2")
+        for step in range(1, 6):
+            writer.submit(_snapshot(self.run_dir, step, best=best if step >= 2 else None))
+        writer.close()
+        self.assertEqual([step for step, _ in list_checkpoints(self.run_dir)], [2, 4, 5])
+
+    def test_error_is_raised_on_wait(self):
+        logs = []
+        writer = AsyncCheckpointWriter(log_callback=lambda category, message: logs.append(category))
+        writer.submit(_snapshot(self.run_dir, 1, model=_FailingModel()))
+        with self.assertRaises(RuntimeError):
+            writer.wait()
+        writer.close()
+        self.assertEqual(list_checkpoints(self.run_dir), [])
+        self.assertIn("CHECKPOINT", logs)
+
+
+if __name__ == '__main__':
+    unittest.main()
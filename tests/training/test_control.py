@@ -0,0 +1,150 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+import torch
+from transformers import GPT2Config, GPT2LMHeadModel, TrainerCallback, TrainingArguments
+from src.training.control import TrainingControl, ControlCallback
+from src.training.resume import ResumableRandomSampler, ResumableTrainer
+
+
+def _step(global_step=3):
+    args = SimpleNamespace(output_dir="./results")
+    state = SimpleNamespace(global_step=global_step)
+    control = SimpleNamespace(should_training_stop=False, should_save=False)
+    return args, state, control
+
+
+class TestTrainingControl(unittest.TestCase):
+    def test_running_by_default(self):
+        callback = ControlCallback(TrainingControl())
+        args, state, control = _step()
+        callback.on_step_end(args, state, control)
+        self.assertFalse(control.should_training_stop)
+        self.assertFalse(control.should_save)
+
+    def test_stop(self):
+        training_control = TrainingControl()
+        callback = ControlCallback(training_control, checkpoint_on_stop=True)
+        training_control.stop()
+        args, state, control = _step()
+        callback.on_step_end(args, state, control)
+        self.assertTrue(control.should_training_stop)
+        self.assertTrue(control.should_save)
+
+    def test_pause_with_checkpoint_exits_after_save(self):
+        training_control = TrainingControl()
+        callback = ControlCallback(training_control, checkpoint_on_pause=True)
+        training_control.pause()
+        args, state, control = _step(7)
+
+        callback.on_step_end(args, state, control)
+        self.assertTrue(control.should_save)
+        self.assertFalse(control.should_training_stop)
+
+        callback.on_save(args, state, control)
+        self.assertTrue(control.should_training_stop)
+        self.assertTrue(callback.take_released_checkpoint().endswith("checkpoint-7"))
+        self.assertIsNone(callback.take_released_checkpoint())
+
+    def test_pause_in_place_blocks_until_resumed(self):
+        training_control = TrainingControl()
+        callback = ControlCallback(training_control, checkpoint_on_pause=False)
+        training_control.pause()
+        args, state, control = _step()
+
+        worker = threading.Thread(target=callback.on_step_end, args=(args, state, control))
+        worker.start()
+        worker.join(0.1)
+        self.assertTrue(worker.is_alive())
+
+        training_control.resume()
+        worker.join(5)
+        self.assertFalse(worker.is_alive())
+        self.assertFalse(control.should_training_stop)
+
+    def test_stop_while_paused(self):
+        training_control = TrainingControl()
+        callback = ControlCallback(training_control, checkpoint_on_pause=False)
+        training_control.pause()
+        threading.Timer(0.05, training_control.stop).start()
+        args, state, control = _step()
+        callback.on_step_end(args, state, control)
+        self.assertTrue(control.should_training_stop)
+
+
+class TestResumableRandomSampler(unittest.TestCase):
+    def test_order_depends_on_seed_and_epoch(self):
+        sampler = ResumableRandomSampler(50, seed=1)
+        first = list(sampler)
+        self.assertEqual(sorted(first), list(range(50)))
+        self.assertEqual(list(ResumableRandomSampler(50, seed=1)), first)
+        sampler.set_epoch(1)
+        self.assertNotEqual(list(sampler), first)
+
+    def test_resume_at_sample_index(self):
+        sampler = ResumableRandomSampler(50, seed=1)
+        sampler.set_epoch(2)
+        full = list(sampler)
+
+        sampler.resume_at(epoch=2, start_index=20)
+        self.assertEqual(list(sampler), full[20:])
+        # Only the resumed epoch is shortened
+        self.assertEqual(list(sampler), full)
+        self.assertEqual(len(sampler), 50)
+
+
+class _TokenDataset(torch.utils.data.Dataset):
+    def __init__(self, samples=10):
+        self.input_ids = torch.randint(0, 50, (samples, 8), generator=torch.Generator().manual_seed(0))
+
+    def __len__(self):
+        return len(self.input_ids)
+
+    def __getitem__(self, index):
+        return {"input_ids": self.input_ids[index], "labels": self.input_ids[index]}
+
+
+class _StepRecorder(TrainerCallback):
+    def __init__(self):
+        self.steps = []
+
+    def on_step_end(self, args, state, control, **kwargs):
+        self.steps.append((state.global_step, round(state.epoch, 4)))
+
+
+class TestResumableTrainer(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _train(self, resume_from_checkpoint=None):
+        torch.manual_seed(0)
+        model = GPT2LMHeadModel(GPT2Config(vocab_size=50, n_positions=8, n_embd=16, n_layer=1, n_head=2))
+        args = TrainingArguments(
+            output_dir=self.test_dir, per_device_train_batch_size=1, gradient_accumulation_steps=4,
+            num_train_epochs=2, save_strategy="steps", save_steps=1, report_to=[], use_cpu=True,
+            disable_tqdm=True
+        )
+        recorder = _StepRecorder()
+        trainer = ResumableTrainer(model=model, args=args, train_dataset=_TokenDataset(), callbacks=[recorder])
+        trainer.train(resume_from_checkpoint=resume_from_checkpoint)
+        return recorder.steps, [parameter.detach().clone() for parameter in model.parameters()]
+
+    def test_mid_epoch_resume_matches_uninterrupted_run(self):
+        # 10 batches per epoch with 4 accumulation steps: each epoch ends on a partial accumulation
+        steps, weights = self._train()
+        self.assertEqual(steps, [(1, 0.4), (2, 0.8), (3, 1.0), (4, 1.4), (5, 1.8), (6, 2.0)])
+
+        resumed_steps, resumed_weights = self._train(os.path.join(self.test_dir, "checkpoint-1"))
+        self.assertEqual(resumed_steps, steps[1:])
+        for expected, actual in zip(weights, resumed_weights):
+            self.assertTrue(torch.allclose(expected, actual))
+
+
+if __name__ == '__main__':
+    unittest.main()
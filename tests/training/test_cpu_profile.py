@@ -0,0 +1,72 @@
+import unittest
+from types import SimpleNamespace
+import torch
+from transformers import GPT2Config, GPT2LMHeadModel
+from src.training.cpu_profile import CPUProfile, detect_hardware, first_batch, time_training_step, calibrate_precision
+from src.training.tokenizer import CausalLMCollator
+
+
+def hardware(cores, memory_mb=64 * 1024):
+    return {"usable_cores": cores, "available_memory_mb": memory_mb, "bf16": False, "compile": False}
+
+
+class TestCPUProfile(unittest.TestCase):
+    def test_detect_hardware(self):
+        info = detect_hardware()
+        self.assertGreaterEqual(info["usable_cores"], 1)
+        self.assertLessEqual(info["usable_cores"], info["logical_cores"])
+        self.assertGreater(info["available_memory_mb"], 0)
+
+    def test_plan_splits_cores(self):
+        profile = CPUProfile.plan(hardware(16), worker_fraction=0.125, max_workers=8)
+        self.assertEqual((profile.workers, profile.compute_threads), (2, 14))
+        self.assertEqual(profile.interop_threads, 2)
+
+        # Never more workers than max_workers, or than memory allows
+        self.assertEqual(CPUProfile.plan(hardware(64), worker_fraction=0.5, max_workers=8).workers, 8)
+        self.assertEqual(CPUProfile.plan(hardware(16, memory_mb=1500), worker_memory_mb=1024).workers, 1)
+
+        # A single core is left entirely to compute
+        single = CPUProfile.plan(hardware(1), worker_fraction=0.5)
+        self.assertEqual((single.workers, single.compute_threads), (0, 1))
+
+    def test_apply_updates_args(self):
+        threads = torch.get_num_threads()
+        args = SimpleNamespace(dataloader_num_workers=8, dataloader_persistent_workers=False,
+                               dataloader_pin_memory=True, bf16=False, use_cpu=False, mixed_precision="no",
+                               torch_compile=False, torch_compile_backend=None)
+        try:
+            CPUProfile(compute_threads=1, interop_threads=1, workers=2, bf16=True, compile=True).apply(args)
+            self.assertEqual(torch.get_num_threads(), 1)
+        finally:
+            torch.set_num_threads(threads)
+        self.assertEqual(args.dataloader_num_workers, 2)
+        self.assertTrue(args.dataloader_persistent_workers)
+        self.assertFalse(args.dataloader_pin_memory)
+        self.assertEqual(args.mixed_precision, "bf16")
+        self.assertEqual((args.torch_compile, args.torch_compile_backend), (True, "inductor"))
+
+    def test_calibration_leaves_model_untouched(self):
+        torch.manual_seed(0)
+        model = GPT2LMHeadModel(GPT2Config(vocab_size=50, n_positions=16, n_embd=16, n_layer=1, n_head=2))
+        model.eval()
+        rows = [{"input_ids": list(range(i, i + 16)), "attention_mask": [1] * 16} for i in range(3)]
+        batch = first_batch(rows, 2, CausalLMCollator())
+        self.assertEqual(batch["input_ids"].shape, (2, 16))
+        # Iterable datasets contribute their first rows too
+        self.assertEqual(first_batch(iter(rows), 2, CausalLMCollator())["input_ids"].shape, (2, 16))
+
+        weights = {name: value.clone() for name, value in model.state_dict().items()}
+        rng_state = torch.get_rng_state()
+        self.assertGreater(time_training_step(model, batch, steps=2), 0)
+        for name, value in model.state_dict().items():
+            self.assertTrue(torch.equal(value, weights[name]), name)
+        self.assertTrue(all(param.grad is None for param in model.parameters()))
+        self.assertTrue(torch.equal(torch.get_rng_state(), rng_state))
+        self.assertFalse(model.training)
+
+        profile = CPUProfile(compute_threads=1, interop_threads=1, workers=0)
+        calibrate_precision(profile, model, batch, steps=1, bf16=False)
+        self.assertEqual(list(profile.step_times), ["fp32"])
+        self.assertFalse(profile.bf16)
+        self.assertTrue(any("samples/s (chosen)" in line for line in profile.describe(2)))
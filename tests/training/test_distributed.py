@@ -0,0 +1,99 @@
+import os
+import queue
+import shutil
+import tempfile
+import unittest
+import torch.distributed as dist
+from src.training.distributed import (
+    ProcessTrainingControl, RankControl, RemoteWindow, WindowPump, gather_step_stats, parse_cpulist, rank_cpus
+)
+from src.training.throughput import ThroughputMeter
+from src.utils.metric_series import MetricSeries
+
+
+class RecordingWindow:
+    def __init__(self):
+        self.calls = []
+
+    def update_log(self, category, message):
+        self.calls.append(("update_log", category, message))
+
+    def update_loss_plot(self, series):
+        self.calls.append(("update_loss_plot", len(series), series.last))
+
+
+class TestDistributed(unittest.TestCase):
+    def test_cpu_assignment(self):
+        self.assertEqual(parse_cpulist("0-3,8,10-11\n"), [0, 1, 2, 3, 8, 10, 11])
+        cpus = list(range(8))
+        self.assertEqual([rank_cpus(rank, 3, cpus) for rank in range(3)], [[0, 1], [2, 3, 4], [5, 6, 7]])
+        self.assertIsNone(rank_cpus(0, 4, [0, 1]))
+
+    def test_process_control_flags(self):
+        control = ProcessTrainingControl()
+        self.assertFalse(control.paused)
+        control.pause()
+        self.assertTrue(control.paused)
+        control.resume()
+        self.assertFalse(control.paused)
+        self.assertTrue(control.wait_until_resumed(timeout=0.01))
+        control.stop()
+        self.assertTrue(control.stop_requested)
+        self.assertFalse(control.wait_until_resumed(timeout=0.01))
+
+    def test_remote_window_forwards_series_increments(self):
+        events = queue.Queue()
+        target = RecordingWindow()
+        remote = RemoteWindow(events, ["update_log", "update_loss_plot"])
+        # Only what the real window supports is visible to the trainer
+        self.assertFalse(hasattr(remote, "update_throughput"))
+
+        series = MetricSeries("loss", window=2)
+        for value in (3.0, 2.0):
+            series.append(value)
+        remote.update_loss_plot(series)
+        series.append(1.0)
+        remote.update_loss_plot(series)
+        # The second call only carries the new point
+        points = events.queue[-1][1][0]
+        self.assertEqual((points.steps.tolist(), points.values.tolist()), ([2.0], [1.0]))
+
+        other_rank = RemoteWindow(events, ["update_log", "update_progress"], rank=1, log_categories=["ERROR"])
+        other_rank.update_log("INFO", "dropped")
+        other_rank.update_progress(50)
+        other_rank.update_log("ERROR", "failed")
+
+        pump = WindowPump(target, events)
+        pump.start()
+        pump.stop()
+        self.assertEqual(target.calls, [
+            ("update_loss_plot", 2, 2.0),
+            ("update_loss_plot", 3, 1.0),
+            ("update_log", "ERROR", "[rank 1] failed"),
+        ])
+
+    def test_single_rank_collectives(self):
+        store_dir = tempfile.mkdtemp()
+        dist.init_process_group("gloo", init_method=f"file://{os.path.join(store_dir, 'store')}",
+                                rank=0, world_size=1)
+        try:
+            merged = gather_step_stats({"wall": 0.5, "cpu": 10.0, "samples": 4, "tokens": 400,
+                                        "data": 0.1, "compute": 0.3, "optimizer": 0.05, "other": 0.05})
+            self.assertEqual((merged["samples"], merged["tokens"], merged["wall"]), (4, 400, 0.5))
+            # Busy time is capped at the wall time
+            self.assertEqual(merged["rank0_step_time"], 0.5)
+            meter = ThroughputMeter()
+            meter.update(merged)
+            self.assertEqual(meter.rank_step_times(), [0.5])
+
+            shared = ProcessTrainingControl()
+            rank_control = RankControl(shared)
+            shared.pause()
+            self.assertFalse(rank_control.paused)
+            rank_control.sync()
+            self.assertTrue(rank_control.paused)
+            shared.stop()
+            self.assertFalse(rank_control.wait_until_resumed(timeout=0.01))
+        finally:
+            dist.destroy_process_group()
+            shutil.rmtree(store_dir)
@@ -0,0 +1,54 @@
+import math
+import unittest
+from types import SimpleNamespace
+import torch
+from datasets import Dataset
+from src.training.evaluation import TokenMetrics, eval_subset
+
+
+class TestEvaluation(unittest.TestCase):
+    def test_subset_is_fixed_and_ordered(self):
+        dataset = Dataset.from_dict({"input_ids": [[i] for i in range(100)]})
+        first = eval_subset(dataset, 10, seed=1)
+        second = eval_subset(dataset, 10, seed=1)
+        self.assertEqual(len(first), 10)
+        self.assertEqual(first["input_ids"], second["input_ids"])
+        self.assertEqual(first["input_ids"], sorted(first["input_ids"]))
+        self.assertIs(eval_subset(dataset, 0), dataset)
+        self.assertIs(eval_subset(dataset, 500), dataset)
+
+    def test_subset_of_other_datasets(self):
+        rows = [{"input_ids": torch.tensor([i])} for i in range(20)]
+        self.assertEqual(len(eval_subset(rows, 5)), 5)
+
+        class Stream(torch.utils.data.IterableDataset):
+            def __iter__(self):
+                for i in range(1000):
+                    yield {"input_ids": torch.tensor([i])}
+
+        blocks = eval_subset(Stream(), 3)
+        self.assertEqual([int(block["input_ids"]) for block in blocks], [0, 1, 2])
+
+    def test_token_metrics_match_direct_computation(self):
+        torch.manual_seed(0)
+        logits = torch.randn(4, 6, 11)
+        labels = torch.randint(0, 11, (4, 6))
+        labels[1, 4:] = -100  # padding
+
+        metrics = TokenMetrics()
+        # Two batches, reported at the last one
+        for rows in (slice(0, 2), slice(2, 4)):
+            reduced = metrics.preprocess_logits(logits[rows], labels[rows])
+            self.assertEqual(reduced.shape, (2, 3))
+            result = metrics(SimpleNamespace(predictions=reduced), compute_result=rows.start == 2)
+
+        shifted_logits, targets = logits[:, :-1].reshape(-1, 11), labels[:, 1:].reshape(-1)
+        mask = targets != -100
+        expected_accuracy = (shifted_logits.argmax(-1) == targets)[mask].float().mean().item()
+        expected_loss = torch.nn.functional.cross_entropy(shifted_logits, targets, ignore_index=-100).item()
+        self.assertAlmostEqual(result["accuracy"], expected_accuracy, places=6)
+        self.assertAlmostEqual(result["perplexity"], math.exp(expected_loss), places=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import numpy as np
+import psutil
+import torch
+from transformers import GPT2Config, GPT2LMHeadModel
+from src.training.memory import (
+    MB, MemoryEstimate, PeakRSSMeter, activation_bytes, measure_activations, plan_memory_budget
+)
+
+
+class LinearEstimate:
+    """Peak of fixed + per-sample cost, the shape MemoryEstimate.peak_mb has"""
+
+    checkpointing_supported = True
+
+    def __init__(self, fixed_mb, per_sample_mb, checkpointed_per_sample_mb):
+        self.fixed_mb = fixed_mb
+        self.per_sample_mb = {False: per_sample_mb, True: checkpointed_per_sample_mb}
+
+    def peak_mb(self, micro_batch, checkpointing=False):
+        return self.fixed_mb + self.per_sample_mb[checkpointing] * micro_batch
+
+
+class TestMemory(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.config = GPT2Config(vocab_size=500, n_positions=128, n_embd=64, n_layer=3, n_head=4)
+        self.model = GPT2LMHeadModel(self.config)
+        input_ids = torch.randint(0, 500, (2, 128))
+        self.batch = {"input_ids": input_ids, "labels": input_ids, "attention_mask": torch.ones_like(input_ids)}
+
+    def test_activations_are_measured_per_block(self):
+        weights = [parameter.detach().clone() for parameter in self.model.parameters()]
+        measured = measure_activations(self.model, self.batch)
+
+        self.assertEqual(len(measured["blocks"]), self.config.n_layer)
+        self.assertTrue(all(saved > 0 for saved in measured["blocks"]))
+        # Each block's input is the (batch, sequence, hidden) fp32 hidden state
+        self.assertEqual(measured["block_inputs"], [2 * 128 * 64 * 4] * self.config.n_layer)
+        self.assertGreater(measured["total"], sum(measured["blocks"]))
+        self.assertLess(activation_bytes(measured, True), activation_bytes(measured, False))
+        for before, after in zip(weights, self.model.parameters()):
+            self.assertTrue(torch.equal(before, after))
+            self.assertIsNone(after.grad)
+
+    def test_estimate_breakdown(self):
+        estimate = MemoryEstimate(self.model, self.batch, dataset_size=10 * MB)
+        parameters = sum(parameter.numel() for parameter in self.model.parameters())
+        breakdown = estimate.breakdown(4)
+
+        self.assertAlmostEqual(breakdown["parameters_mb"], parameters * 4 / MB)
+        self.assertAlmostEqual(breakdown["optimizer_mb"], 2 * breakdown["gradients_mb"])
+        self.assertEqual(breakdown["dataset_mb"], 10.0)
+        # Measured on a batch of two; scaled per sample
+        self.assertAlmostEqual(estimate.activations_mb(4), 2 * estimate.activations_mb(2))
+        self.assertTrue(estimate.checkpointing_supported)
+        self.assertLess(estimate.peak_mb(4, True), estimate.peak_mb(4))
+
+    def test_budget_plan_tries_checkpointing_before_smaller_batches(self):
+        estimate = LinearEstimate(fixed_mb=1000, per_sample_mb=100, checkpointed_per_sample_mb=40)
+
+        plan = plan_memory_budget(estimate, 2000, micro_batch=8, accumulation=2)
+        self.assertEqual((plan["gradient_checkpointing"], plan["micro_batch"], plan["fits"]), (False, 8, True))
+
+        plan = plan_memory_budget(estimate, 1500, micro_batch=8, accumulation=2)
+        self.assertEqual((plan["gradient_checkpointing"], plan["micro_batch"]), (True, 8))
+
+        # Checkpointing is not enough: halve the micro-batch, keep the effective batch of 16
+        plan = plan_memory_budget(estimate, 1200, micro_batch=8, accumulation=2)
+        self.assertEqual((plan["gradient_checkpointing"], plan["micro_batch"], plan["gradient_accumulation_steps"]),
+                         (True, 4, 4))
+        self.assertTrue(plan["fits"])
+
+        plan = plan_memory_budget(estimate, 1500, micro_batch=8, accumulation=2, gradient_checkpointing=False)
+        self.assertEqual((plan["gradient_checkpointing"], plan["micro_batch"], plan["gradient_accumulation_steps"]),
+                         (False, 4, 4))
+
+        plan = plan_memory_budget(estimate, 1000, micro_batch=8, accumulation=2)
+        self.assertEqual((plan["micro_batch"], plan["gradient_accumulation_steps"], plan["fits"]), (1, 16, False))
+
+        # Without a budget only a forced checkpointing setting changes anything
+        plan = plan_memory_budget(estimate, None, micro_batch=8, accumulation=2, gradient_checkpointing=True)
+        self.assertEqual((plan["gradient_checkpointing"], plan["micro_batch"], plan["fits"]), (True, 8, True))
+
+    def test_peak_rss_meter_catches_a_freed_spike(self):
+        meter = PeakRSSMeter()
+        try:
+            meter.take()
+            before = psutil.Process().memory_info().rss / MB
+            spike = np.ones(256 * MB // 8)
+            del spike
+            self.assertGreater(meter.take(), before + 200)
+            # The next interval starts from the current, lower RSS
+            self.assertLess(meter.take(), before + 200)
+        finally:
+            meter.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import nullcontext
+from types import SimpleNamespace
+import torch
+from src.training.control import TrainingControl
+from src.training.profiler import PROFILE_PHASES, ProfilerCallback, StepProfiler, format_profile
+
+
+class TestStepProfiler(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.model = torch.nn.Sequential(torch.nn.Linear(32, 64), torch.nn.ReLU(), torch.nn.Linear(64, 1))
+        self.optimizer = torch.optim.SGD(self.model.parameters(), lr=0.01)
+        self.reports = []
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _callback(self, training_control, steps=2, at_step=None):
+        profiler = StepProfiler(steps=steps, warmup_steps=1, top_ops=5)
+        callback = ProfilerCallback(profiler, training_control, self.test_dir, self.reports.append, at_step=at_step)
+        return profiler, callback
+
+    def _train(self, profiler, callback, steps, first_step=0):
+        """Mimics one optimizer step per iteration the way ResumableTrainer and Trainer mark it"""
+        state = SimpleNamespace(global_step=first_step)
+        for _ in range(steps):
+            with profiler.phase("dataloader"):
+                inputs = torch.randn(16, 32)
+            with profiler.phase("forward"):
+                loss = self.model(inputs).pow(2).mean()
+            with profiler.phase("backward"):
+                loss.backward()
+            callback.on_pre_optimizer_step(None, state, None)
+            self.optimizer.step()
+            callback.on_optimizer_step(None, state, None)
+            self.optimizer.zero_grad()
+            state.global_step += 1
+            callback.on_step_end(None, state, None)
+        return state
+
+    def test_idle_profiler_records_nothing(self):
+        profiler, callback = self._callback(TrainingControl())
+        self._train(profiler, callback, 3)
+        self.assertFalse(profiler.active)
+        self.assertIsInstance(profiler.phase("forward"), nullcontext)
+        self.assertEqual(self.reports, [])
+        self.assertEqual(os.listdir(self.test_dir), [])
+
+    def test_requested_capture_reports_phases_and_trace(self):
+        training_control = TrainingControl()
+        profiler, callback = self._callback(training_control, steps=2)
+        self._train(profiler, callback, 1)
+        training_control.request_profile()
+        # Picked up at the end of step 2: step 3 warms up, steps 4-5 are recorded
+        self._train(profiler, callback, 5, first_step=1)
+
+        self.assertFalse(profiler.active)
+        self.assertFalse(training_control.profile_requested)
+        self.assertEqual(len(self.reports), 1)
+        report = self.reports[0]
+        self.assertEqual((report["start_step"], report["steps"]), (3, 2))
+        self.assertEqual(list(report["phases"]), list(PROFILE_PHASES))
+        self.assertTrue(all(ms > 0 for ms in report["phases"].values()))
+        self.assertLessEqual(len(report["operators"]), 5)
+        self.assertTrue(any(row[0] == "aten::addmm" for row in report["operators"]))
+        self.assertEqual(report["trace"], os.path.join(self.test_dir, "profile-step4-5.json"))
+        with open(report["trace"]) as f:
+            self.assertIn("traceEvents", json.load(f))
+        self.assertTrue(format_profile(report)[0].startswith("Steps 4-5 per step: dataloader"))
+
+    def test_capture_cut_short_by_end_of_training(self):
+        profiler, callback = self._callback(TrainingControl(), steps=5, at_step=1)
+        state = self._train(profiler, callback, 3)
+        self.assertTrue(profiler.active)
+        callback.on_train_end(None, state, None)
+
+        self.assertFalse(profiler.active)
+        self.assertEqual((self.reports[0]["start_step"], self.reports[0]["steps"]), (2, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from src.training.streaming import StreamingTokenDataset, resolve_shards
+
+
+class FakeTokenizer:
+    """Maps each word to its length so packed blocks are easy to predict"""
+    eos_token_id = 0
+
+    def __call__(self, texts, add_special_tokens=True):
+        return {"input_ids": [[len(word) for word in text.split()] for text in texts]}
+
+
+class TestStreamingTokenDataset(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.data_dir, "a.txt"), "w") as f:
+            f.write("a bb\n\nccc\n")
+        with open(os.path.join(self.data_dir, "b.jsonl"), "w") as f:
+            f.write(json.dumps({"text": "dddd e"}) + "\n")
+            f.write(json.dumps({"text": ""}) + "\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def _blocks(self, pattern="*", **kwargs):
+        files = resolve_shards(os.path.join(self.data_dir, pattern))
+        dataset = StreamingTokenDataset(files, FakeTokenizer(), max_length=3, **kwargs)
+        return [item["input_ids"].tolist() for item in dataset]
+
+    def test_resolve_shards(self):
+        files = resolve_shards([os.path.join(self.data_dir, "*.txt"), os.path.join(self.data_dir, "*")])
+        self.assertEqual([os.path.basename(path) for path in files], ["a.txt", "b.jsonl"])
+
+    def test_packs_across_batches_and_shards(self):
+        """Partial blocks carry over; empty lines and records are skipped"""
+        # a bb <eos> ccc <eos> dddd e <eos> -> 1 2 0 | 3 0 4 | 1 0
+        self.assertEqual(self._blocks(batch_size=1), [[1, 2, 0], [3, 0, 4]])
+
+    def test_shuffle_keeps_blocks(self):
+        with open(os.path.join(self.data_dir, "a.txt"), "a") as f:
+            f.write("\n".join(" ".join("x" * n for _ in range(3)) for n in range(1, 9)))
+
+        ordered = self._blocks("a.txt", batch_size=1)
+        shuffled = self._blocks("a.txt", batch_size=1, shuffle_buffer=4, seed=3)
+        self.assertEqual(sorted(shuffled), sorted(ordered))
+        self.assertNotEqual(shuffled, ordered)
+
+    def test_workers_split_lines_of_a_single_shard(self):
+        """One shard, two workers: each tokenizes every other line instead of one doing it all"""
+        path = os.path.join(self.data_dir, "single", "c.txt")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write("a\nbb\nccc\ndddd\n")
+        dataset = StreamingTokenDataset([path], FakeTokenizer(), max_length=1)
+        tokens = {}
+        for worker_id in range(2):
+            worker = SimpleNamespace(id=worker_id, num_workers=2)
+            with patch('src.training.streaming.get_worker_info', return_value=worker):
+                tokens[worker_id] = [item["input_ids"].item() for item in dataset]
+        self.assertEqual(tokens, {0: [1, 0, 3, 0], 1: [2, 0, 4, 0]})
+
+        # With as many shards as workers each keeps whole shards
+        files = resolve_shards(os.path.join(self.data_dir, "*"))
+        dataset = StreamingTokenDataset(files, FakeTokenizer(), max_length=1)
+        with patch('src.training.streaming.get_worker_info', return_value=SimpleNamespace(id=1, num_workers=2)):
+            self.assertEqual([item["input_ids"].item() for item in dataset], [4, 1, 0])
+
+    def test_requires_files(self):
+        with self.assertRaises(ValueError):
+            StreamingTokenDataset([], FakeTokenizer())
@@ -0,0 +1,59 @@
+import time
+import unittest
+from types import SimpleNamespace
+import torch
+from src.training.throughput import StepTimer, ThroughputMeter, StepTimingCallback, STEP_PHASES
+
+
+class TestThroughput(unittest.TestCase):
+    def test_step_breakdown(self):
+        timer = StepTimer(synchronize=False)
+        timer.reset()
+        with timer.measure("data"):
+            time.sleep(0.01)
+        timer.count_batches([
+            {"input_ids": torch.zeros(2, 4, dtype=torch.long),
+             "attention_mask": torch.tensor([[1, 1, 1, 0], [1, 1, 0, 0]])},
+            {"input_ids": torch.zeros(3, 4, dtype=torch.long)}
+        ])
+        with timer.measure("compute"):
+            time.sleep(0.02)
+        timer.start_optimizer()
+        timer.stop_optimizer()
+        stats = timer.finish_step()
+
+        self.assertEqual(stats["samples"], 5)
+        self.assertEqual(stats["tokens"], 5 + 12)  # non-pad tokens, unmasked batch counts in full
+        self.assertGreaterEqual(stats["data"], 0.01)
+        self.assertGreaterEqual(stats["compute"], 0.02)
+        self.assertAlmostEqual(sum(stats[phase] for phase in STEP_PHASES), stats["wall"], places=6)
+        # Counters start over for the next step
+        self.assertEqual(timer.finish_step()["samples"], 0)
+
+    def test_meter_ema_and_eta(self):
+        meter = ThroughputMeter(alpha=0.5)
+        self.assertIsNone(meter.eta_seconds(10))
+        meter.update({"wall": 1.0, "samples": 8, "tokens": 800, "data": 0.5})
+        meter.update({"wall": 2.0, "samples": 8, "tokens": 800, "data": 0.5})
+        self.assertAlmostEqual(meter.step_time, 1.5)
+        self.assertAlmostEqual(meter.samples_per_second, 8 / 1.5)
+        self.assertAlmostEqual(meter.eta_seconds(10), 15.0)
+        self.assertAlmostEqual(meter.phase_fractions()["data"], 0.5 / 1.5)
+        summary = meter.summary(remaining_steps=4)
+        self.assertAlmostEqual(summary["eta_seconds"], 6.0)
+        self.assertAlmostEqual(summary["tokens_per_second"], 800 / 1.5)
+
+    def test_callback_skips_warmup_step(self):
+        meter = ThroughputMeter()
+        callback = StepTimingCallback(StepTimer(synchronize=False), meter)
+        args, state, control = SimpleNamespace(), SimpleNamespace(), SimpleNamespace()
+        callback.on_train_begin(args, state, control)
+        for _ in range(3):
+            callback.on_pre_optimizer_step(args, state, control)
+            callback.on_optimizer_step(args, state, control)
+            callback.on_step_end(args, state, control)
+        self.assertEqual(meter.steps, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from src.training.token_store import TokenStore, token_dtype
+
+
+class FakeTokenizer:
+    name_or_path = "fake"
+    eos_token_id = 0
+
+    def __len__(self):
+        return 100
+
+
+class TestTokenStore(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.cache_dir, "source.arrow")
+        with open(self.source, "wb") as f:
+            f.write(b"wikitext")
+        self.store = TokenStore(self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def _fingerprint(self, max_length=4):
+        return self.store.fingerprint(FakeTokenizer(), max_length, "padding", {"name": "test"}, [self.source])
+
+    def test_fingerprint_changes_with_inputs(self):
+        """Cache key covers max_length and source file contents"""
+        fingerprint = self._fingerprint()
+        self.assertEqual(fingerprint, self._fingerprint())
+        self.assertNotEqual(fingerprint, self._fingerprint(max_length=8))
+
+        with open(self.source, "ab") as f:
+            f.write(b"-changed")
+        self.assertNotEqual(fingerprint, self._fingerprint())
+
+    def test_unchanged_sources_are_not_rehashed(self):
+        fingerprint = self._fingerprint()
+        with patch('src.training.token_store._hash_file') as hash_file:
+            self.assertEqual(self._fingerprint(), fingerprint)
+            hash_file.assert_not_called()
+
+        # A new mtime is enough to hash the file again
+        stat = os.stat(self.source)
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        with patch('src.training.token_store._hash_file', return_value="rehashed"):
+            self.assertEqual(self.store.source_hash(self.source), "rehashed")
+
+    def test_build_and_read(self):
+        """Sequences round-trip through the uint16 file and offsets index"""
+        fingerprint = self._fingerprint()
+        self.assertFalse(self.store.exists(fingerprint))
+
+        meta = self.store.build(fingerprint, {"train": iter([[[5, 6, 7], [8]], [[9, 10]]])}, vocab_size=100)
+        self.assertTrue(self.store.exists(fingerprint))
+        self.assertEqual(meta["dtype"], "uint16")
+        self.assertEqual(meta["splits"]["train"], {"sequences": 3, "tokens": 6})
+
+        dataset = self.store.open(fingerprint)["train"]
+        self.assertEqual(len(dataset), 3)
+        self.assertEqual(dataset.num_tokens, 6)
+        self.assertEqual(dataset[0]["input_ids"].tolist(), [5, 6, 7])
+        self.assertEqual(os.path.getsize(dataset.tokens_path), 6 * 2)
+
+    def test_padding_on_read(self):
+        fingerprint = self._fingerprint()
+        self.store.build(fingerprint, {"train": [[[5, 6]]]}, vocab_size=100)
+        item = self.store.open(fingerprint, pad_to=4, pad_token_id=0)["train"][0]
+
+        self.assertEqual(item["input_ids"].tolist(), [5, 6, 0, 0])
+        self.assertEqual(item["attention_mask"].tolist(), [1, 1, 0, 0])
+
+    def test_pickle_drops_mapping(self):
+        """Workers re-map the file instead of receiving a copy of the tokens"""
+        fingerprint = self._fingerprint()
+        self.store.build(fingerprint, {"train": [[[1, 2, 3]]]}, vocab_size=100)
+        dataset = self.store.open(fingerprint)["train"]
+        dataset[0]
+
+        clone = pickle.loads(pickle.dumps(dataset))
+        self.assertIsNone(clone._tokens)
+        self.assertEqual(clone[0]["input_ids"].tolist(), [1, 2, 3])
+
+    def test_large_vocab_dtype(self):
+        self.assertEqual(token_dtype(50257), np.uint16)
+        self.assertEqual(token_dtype(100000), np.uint32)
@@ -0,0 +1,123 @@
+import unittest
+from unittest.mock import patch
+from datasets import Dataset, DatasetDict
+from src.training.tokenizer import ModelTokenizer, CausalLMCollator, TokenizationProgress
+
+
+class FakeGPT2Tokenizer:
+    """Whitespace tokenizer standing in for GPT-2 so tests run offline"""
+    eos_token = "<eos>"
+    eos_token_id = 0
+
+    def __init__(self):
+        self.pad_token = None
+
+    @classmethod
+    def from_pretrained(cls, name):
+        return cls()
+
+    def __call__(self, texts, padding=False, truncation=False, max_length=None, add_special_tokens=True, **kwargs):
+        input_ids, attention_mask = [], []
+        for text in texts:
+            ids = [len(word) for word in text.split()]
+            if truncation and max_length:
+                ids = ids[:max_length]
+            mask = [1] * len(ids)
+            if padding == "max_length":
+                mask += [0] * (max_length - len(ids))
+                ids += [self.eos_token_id] * (max_length - len(ids))
+            input_ids.append(ids)
+            attention_mask.append(mask)
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+
+@patch('src.training.tokenizer.GPT2TokenizerFast', FakeGPT2Tokenizer)
+class TestModelTokenizer(unittest.TestCase):
+    def setUp(self):
+        lines = ["a bb ccc", "", "dddd", "   ", "e ff ggg hhhh iiiii", "jj"]
+        self.dataset = DatasetDict({"train": Dataset.from_dict({"text": lines})})
+
+    def test_padding_strategy(self):
+        """Padding keeps one row per non-empty line and reports the pad ratio"""
+        tokenizer = ModelTokenizer(strategy="padding")
+        tokenized = tokenizer.tokenize_dataset(self.dataset, max_length=8)
+
+        self.assertEqual(len(tokenized["train"]), 4)
+        self.assertNotIn("labels", tokenized["train"].column_names)
+        stats = tokenizer.stats["train"]
+        self.assertEqual(stats["tokens"], 10)
+        self.assertAlmostEqual(stats["padding_ratio"], 1 - 10 / 32)
+
+    def test_packing_strategy(self):
+        """Packing drops empty lines, joins with EOS and emits dense blocks"""
+        tokenizer = ModelTokenizer(strategy="packing")
+        tokenized = tokenizer.tokenize_dataset(self.dataset, max_length=4)
+
+        # 10 tokens + 4 EOS = 14 -> 3 full blocks, 2 tokens dropped
+        blocks = tokenized["train"]["input_ids"]
+        self.assertEqual(blocks, [[1, 2, 3, 0], [4, 0, 1, 2], [3, 4, 5, 0]])
+        self.assertEqual(tokenizer.stats["train"]["padding_ratio"], 0.0)
+
+    def test_summarize_stats(self):
+        """Effective tokens per step scale with the padding ratio"""
+        tokenizer = ModelTokenizer(strategy="packing")
+        tokenizer.tokenize_dataset(self.dataset, max_length=4)
+        lines = tokenizer.summarize_stats(batch_size=2, gradient_accumulation_steps=4, max_length=4)
+
+        self.assertEqual(len(lines), 1)
+        self.assertIn("padding ratio 0.0%", lines[0])
+        self.assertEqual(tokenizer.stats["train"]["effective_tokens_per_step"], 32)
+
+    def test_progress_hooks(self):
+        """Progress reaches the total and throughput is logged once per run"""
+        progress, logs = [], []
+        tokenizer = ModelTokenizer(
+            progress_callback=lambda current, total: progress.append((current, total)),
+            log_callback=lambda category, message: logs.append((category, message)),
+            strategy="packing",
+            batch_size=2
+        )
+        batches = list(tokenizer.iter_batches(self.dataset["train"], max_length=4))
+
+        self.assertEqual(len(batches), 3)
+        self.assertEqual(progress[-1], (6, 6))
+        self.assertEqual(tokenizer.throughput["lines"], 6)
+        # Only the repeated progress lines use the rate-limited "Tokenization" category
+        self.assertTrue(any(category == "INFO" and "lines/sec" in message for category, message in logs))
+        self.assertTrue(all(message.startswith("Processed") for category, message in logs if category == "Tokenization"))
+
+    def test_process_pool_matches_single_process(self):
+        """Spawned encode workers yield the same batches, in order"""
+        dataset = Dataset.from_dict({"text": [" ".join("x" * (n % 5 + 1) for _ in range(n % 3 + 1)) for n in range(40)]})
+        single = list(ModelTokenizer(strategy="packing", batch_size=8).iter_batches(dataset, max_length=4))
+        pooled = list(ModelTokenizer(strategy="packing", batch_size=8, num_proc=2).iter_batches(dataset, max_length=4))
+        self.assertEqual(pooled, single)
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            ModelTokenizer(strategy="bucketing")
+
+
+class TestCausalLMCollator(unittest.TestCase):
+    def test_labels_mask_padding(self):
+        batch = CausalLMCollator()([
+            {"input_ids": [5, 6, 0], "attention_mask": [1, 1, 0]},
+            {"input_ids": [7, 8, 9], "attention_mask": [1, 1, 1]},
+        ])
+        self.assertEqual(batch["labels"].tolist(), [[5, 6, -100], [7, 8, 9]])
+
+    def test_packed_labels_share_input_ids(self):
+        batch = CausalLMCollator()([{"input_ids": [1, 2]}, {"input_ids": [3, 4]}])
+        self.assertIs(batch["labels"], batch["input_ids"])
+
+
+class TestTokenizationProgress(unittest.TestCase):
+    def test_combines_worker_reports(self):
+        with TokenizationProgress(total_lines=30) as progress:
+            progress.queue.put((1, 10, 100))
+            progress.queue.put((2, 20, 300))
+
+        self.assertEqual(progress.lines, 30)
+        self.assertEqual(progress.tokens, 400)
+        self.assertEqual(sorted(progress.workers), [1, 2])
+        self.assertGreater(progress.throughput()["tokens_per_sec"], 0)
@@ -1,7 +1,12 @@
+import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 from src.training.trainer import ModelTrainer
-from transformers import TrainingArguments
+from src.config.training_config import get_training_args
+import torch
+from transformers import GPT2Config, GPT2LMHeadModel, TrainingArguments
 import warnings
 
 # Add this at the top of your test file
@@ -9,8 +14,15 @@ warnings.filterwarnings("ignore", category=DeprecationWarning)
 
 class TestModelTrainer(unittest.TestCase):
     def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
         self.mock_window = MagicMock()
-        self.trainer = ModelTrainer(self.mock_window)
+        # Keep the structured log out of the working directory
+        with patch.dict('src.training.trainer.LOGGING_CONFIG', {'file': os.path.join(self.test_dir, 'training.jsonl')}):
+            self.trainer = ModelTrainer(self.mock_window)
+
+    def tearDown(self):
+        self.trainer.close()
+        shutil.rmtree(self.test_dir)
     
     def test_progress_tracking(self):
         """Test progress updates during training"""
@@ -34,6 +46,16 @@ class TestModelTrainer(unittest.TestCase):
         self.trainer.initialize_model()
         mock_gpt2.from_pretrained.assert_called_once_with("gpt2")
 
+    def test_model_initialization_from_checkpoint(self):
+        """Resuming after a pause reloads the weights the pause checkpoint saved"""
+        model = GPT2LMHeadModel(GPT2Config(vocab_size=50, n_positions=8, n_embd=16, n_layer=1, n_head=2))
+        checkpoint = os.path.join(self.test_dir, "checkpoint-10")
+        model.save_pretrained(checkpoint)
+
+        self.trainer.initialize_model(checkpoint)
+        for saved, loaded in zip(model.parameters(), self.trainer.model.parameters()):
+            self.assertTrue(torch.equal(saved, loaded))
+
     def test_training_args_integration(self):
         """Test training arguments integration"""
         args = TrainingArguments(
@@ -43,10 +65,52 @@ class TestModelTrainer(unittest.TestCase):
             per_device_eval_batch_size=8
         )
         
-        with patch('src.training.trainer.Trainer') as mock_trainer:
+        with patch('src.training.trainer.ResumableTrainer') as mock_trainer:
             self.trainer.train(args)
             mock_trainer.assert_called()
 
+    def test_default_training_args(self):
+        """The configured arguments build with the installed transformers"""
+        args = get_training_args()
+        self.assertEqual(args.eval_strategy, "steps")
+        self.assertTrue(args.load_best_model_at_end)
+        self.assertEqual(args.gradient_accumulation_steps, 4)
+
+    def test_no_validation_disables_evaluation(self):
+        """Streaming without validation shards must not leave step evaluation on"""
+        args = TrainingArguments(
+            output_dir="./test_output",
+            eval_strategy="steps",
+            save_strategy="steps",
+            load_best_model_at_end=True
+        )
+        eval_dataset, token_metrics = self.trainer.prepare_evaluation(None, args)
+        self.assertIsNone(eval_dataset)
+        self.assertIsNone(token_metrics)
+        self.assertEqual(args.eval_strategy, "no")
+        self.assertFalse(args.load_best_model_at_end)
+
+    def test_tokenizer_log_categories_pass_through(self):
+        """Only tokenization progress goes through the rate-limited category"""
+        for index in range(5):
+            self.trainer.tokenizer.update_log("INFO", f"summary {index}")
+        self.trainer.logger.flush()
+        logged = [call.args for call in self.mock_window.update_log.call_args_list]
+        self.assertEqual(logged, [("INFO", f"summary {index}") for index in range(5)])
+
+    @patch('src.training.trainer.load_dataset', side_effect=OSError("offline"))
+    def test_logger_outlives_train(self, mock_load_dataset):
+        """train() leaves the logger open, so the trainer can log and train again"""
+        args = TrainingArguments(output_dir=self.test_dir, report_to=[])
+        self.trainer.train(args)
+        self.assertIsInstance(self.trainer.error, OSError)
+        self.trainer.logger.log("SYSTEM", "still logging")
+        self.trainer.logger.flush()
+        self.mock_window.update_log.assert_called_with("SYSTEM", "still logging")
+
+        self.trainer.close()
+        self.assertFalse(self.trainer.logger.writer._thread.is_alive())
+
     def test_logger_initialization(self):
         """Test logger initialization"""
         self.assertIsNotNone(self.trainer.logger)
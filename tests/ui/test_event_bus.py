@@ -0,0 +1,76 @@
+import threading
+import unittest
+from src.ui.event_bus import UIEventBus
+
+
+class FakeRoot:
+    """Records after() callbacks instead of running a Tk main loop"""
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay, callback):
+        self.scheduled.append((delay, callback))
+
+    def run_pending(self):
+        scheduled, self.scheduled = self.scheduled, []
+        for _, callback in scheduled:
+            callback()
+
+
+class TestUIEventBus(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.bus = UIEventBus(self.root, max_fps=20)
+        self.metrics = []
+        self.logs = []
+        self.frames = 0
+        self.bus.register("metrics", lambda **kwargs: self.metrics.append(kwargs))
+        self.bus.register("log", self.logs.append, batch=True)
+        self.bus.on_frame(self._count_frame)
+
+    def _count_frame(self):
+        self.frames += 1
+
+    def test_coalesces_bursts(self):
+        """Only the latest metrics are applied, logs arrive as one batch, one frame callback"""
+        for step in range(100):
+            self.bus.publish("metrics", step=step)
+            self.bus.publish("log", "TRAINING", f"step {step}")
+
+        self.assertEqual(self.bus.drain(), 2)
+        self.assertEqual(self.metrics, [{"step": 99}])
+        self.assertEqual(len(self.logs), 1)
+        self.assertEqual(len(self.logs[0]), 100)
+        self.assertEqual(self.frames, 1)
+
+    def test_idle_frame_skips_redraw(self):
+        self.assertEqual(self.bus.drain(), 0)
+        self.assertEqual(self.frames, 0)
+
+    def test_frame_rate_cap(self):
+        """Draining is driven by after() at the configured interval"""
+        self.bus.start()
+        self.assertEqual(self.root.scheduled[0][0], 50)
+
+        self.bus.publish("metrics", step=1)
+        self.root.run_pending()
+        self.assertEqual(self.metrics, [{"step": 1}])
+        self.assertEqual(len(self.root.scheduled), 1)
+
+        self.bus.stop()
+        self.root.run_pending()
+        self.assertEqual(self.root.scheduled, [])
+
+    def test_publish_from_threads(self):
+        def produce():
+            for step in range(1000):
+                self.bus.publish("log", "TRAINING", step)
+
+        threads = [threading.Thread(target=produce) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.bus.drain()
+        self.assertEqual(len(self.logs[0]), 4000)
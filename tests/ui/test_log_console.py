@@ -0,0 +1,70 @@
+import unittest
+from src.ui.log_console import LogConsole, LogStore
+
+
+class FakeText:
+    """Minimal line-based stand-in for a Tk Text widget"""
+    def __init__(self):
+        self.lines = []
+        self.inserts = 0
+
+    def insert(self, index, text):
+        self.inserts += 1
+        self.lines.extend(text.splitlines())
+
+    def delete(self, start, end):
+        if end == "end":
+            self.lines = []
+        else:
+            del self.lines[:int(end.split(".")[0]) - 1]
+
+    def see(self, index):
+        pass
+
+
+def entries(category, count, start=0):
+    return [(1700000000.0 + i, category, f"{category.lower()} message {i}") for i in range(start, start + count)]
+
+
+class TestLogConsole(unittest.TestCase):
+    def setUp(self):
+        self.text = FakeText()
+        self.console = LogConsole(self.text, max_lines=5)
+
+    def test_batched_insert_is_bounded(self):
+        """A burst is one insert and the widget keeps only the newest lines"""
+        self.console.append_batch(entries("TRAINING", 3))
+        self.console.append_batch(entries("TRAINING", 4, start=3))
+
+        self.assertEqual(self.text.inserts, 2)
+        self.assertEqual(len(self.text.lines), 5)
+        self.assertTrue(self.text.lines[-1].endswith("training message 6"))
+        self.assertEqual(len(self.console.store), 7)
+
+    def test_category_filter(self):
+        self.console.append_batch(entries("TRAINING", 10) + entries("ERROR", 2) + entries("Tokenization", 3))
+        self.console.set_filter(["ERROR", "TOKENIZATION"])
+
+        self.assertEqual(len(self.text.lines), 5)
+        self.assertTrue(all("[ERROR]" in line or "[Tokenization]" in line for line in self.text.lines))
+
+        # New lines respect the active filter
+        self.console.append_batch(entries("TRAINING", 1) + entries("ERROR", 1, start=50))
+        self.assertTrue(self.text.lines[-1].endswith("error message 50"))
+
+    def test_search(self):
+        self.console.append_batch(entries("TRAINING", 20))
+        self.console.set_filter(query="MESSAGE 1")
+        self.assertEqual(len(self.text.lines), 5)
+        self.assertTrue(all("message 1" in line for line in self.text.lines))
+
+        self.console.set_filter()
+        self.assertTrue(self.text.lines[-1].endswith("training message 19"))
+
+
+class TestLogStore(unittest.TestCase):
+    def test_tail_merges_categories_newest_last(self):
+        store = LogStore()
+        store.extend([(0.0, "A", "a0"), (1.0, "B", "b1"), (2.0, "A", "a2"), (3.0, "C", "c3"), (4.0, "B", "b4")])
+        self.assertEqual(store.tail(3, ["A", "B"]), [1, 2, 4])
+        self.assertEqual(store.tail(10, ["missing"]), [])
@@ -0,0 +1,49 @@
+import unittest
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from src.ui.plot_renderer import BlitPlotRenderer
+
+
+class TestBlitPlotRenderer(unittest.TestCase):
+    def setUp(self):
+        self.fig = Figure(figsize=(4, 2))
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot(111)
+        self.line, = self.ax.plot([], [])
+        self.ax.set_xlim(0, 100)
+        self.ax.set_ylim(0, 1)
+        self.renderer = BlitPlotRenderer(self.canvas, [self.line], debug_overlay=True)
+
+    def test_blits_until_limits_change(self):
+        self.assertEqual(self.renderer.render(), "full")
+
+        self.line.set_data([0, 1, 2], [0.5, 0.4, 0.3])
+        self.assertEqual(self.renderer.render(), "blit")
+
+        self.ax.set_xlim(0, 200)
+        self.assertEqual(self.renderer.render(), "full")
+        self.assertEqual((self.renderer.full_draws, self.renderer.blits), (2, 1))
+        self.assertIn("ms", self.renderer.overlay.get_text())
+
+    def test_invalidate_forces_full_draw(self):
+        self.renderer.render()
+        self.ax.plot([0, 50], [0.2, 0.8])
+        self.renderer.invalidate()
+        self.assertEqual(self.renderer.render(), "full")
+        self.assertEqual(self.renderer.render(), "blit")
+
+    def test_fit_y_headroom(self):
+        """Limits only move when data leaves the view or fills a small part of it"""
+        BlitPlotRenderer.fit_y(self.ax, 0.2, 0.9)
+        self.assertEqual(self.ax.get_ylim(), (0, 1))
+
+        BlitPlotRenderer.fit_y(self.ax, 0.2, 1.5)
+        low, high = self.ax.get_ylim()
+        self.assertLess(low, 0.2)
+        self.assertGreater(high, 1.5)
+
+        BlitPlotRenderer.fit_y(self.ax, 0.50, 0.51)
+        low, high = self.ax.get_ylim()
+        self.assertLess(high - low, 0.1)
@@ -0,0 +1,162 @@
+import io
+import os
+import shutil
+import socket
+import tempfile
+import time
+import unittest
+import numpy as np
+from src.training.control import TrainingControl
+from src.utils.event_stream import (
+    EventPublisher, EventSubscriber, SeriesPoints, decode_call, encode_call, is_serving, read_frame
+)
+from src.utils.metric_series import MetricSeries
+
+
+class RecordingWindow:
+    def __init__(self):
+        self.logs = []
+        self.progress = []
+        self.losses = None
+
+    def update_log(self, category, message):
+        self.logs.append((category, message))
+
+    def update_progress(self, progress_value):
+        self.progress.append(progress_value)
+
+    def update_loss_plot(self, losses):
+        self.losses = losses
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+class TestEventStream(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.address = os.path.join(self.test_dir, "trainer.sock")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_call_round_trip(self):
+        points = SeriesPoints("loss", 50, [1.0, 2.0], [0.5, 0.25])
+        frame = encode_call("update_training_metrics", [np.float32(1.5)],
+                            {"step": np.int64(3), "accuracy": None, "rows": [("a", True)], "series": points})
+        kind, payload = read_frame(io.BytesIO(frame))
+        name, args, kwargs = decode_call(payload)
+        self.assertEqual((name, args), ("update_training_metrics", [1.5]))
+        self.assertEqual((kwargs["step"], kwargs["accuracy"], kwargs["rows"]), (3, None, [["a", True]]))
+        self.assertEqual(kwargs["series"].values.tolist(), [0.5, 0.25])
+        self.assertEqual(kwargs["series"].steps.tolist(), [1.0, 2.0])
+        with self.assertRaises(TypeError):
+            encode_call("update_log", [object()])
+
+    def test_late_subscriber_gets_snapshot_then_live_tail(self):
+        publisher = EventPublisher(self.address, log_tail=2)
+        publisher.start()
+        control = TrainingControl()
+        publisher.set_training_control(control)
+        losses = MetricSeries("loss", window=2)
+        try:
+            for step in range(3):
+                publisher.update_log("TRAINING", f"step {step}")
+                publisher.update_progress(step * 10)
+                losses.append(3.0 - step)
+                publisher.update_loss_plot(losses)
+
+            window = RecordingWindow()
+            subscriber = EventSubscriber(publisher.address, window, retry_interval=0.05)
+            subscriber.start()
+            self.assertTrue(subscriber.attached.wait(5))
+            # Only the newest progress and the last log_tail lines, but the whole loss series
+            self.assertEqual(window.progress, [20])
+            self.assertEqual([message for category, message in window.logs if category == "TRAINING"],
+                             ["step 1", "step 2"])
+            self.assertEqual(window.losses.values.view().tolist(), [3.0, 2.0, 1.0])
+
+            losses.append(0.5)
+            publisher.update_loss_plot(losses)
+            wait_for(lambda: len(window.losses) == 4)
+            self.assertEqual(window.losses.last, 0.5)
+
+            subscriber.pause()
+            wait_for(lambda: control.paused)
+            subscriber.request_profile()
+            wait_for(lambda: control.profile_requested)
+            # Closing the dashboard detaches without stopping training
+            subscriber.detach()
+            wait_for(lambda: publisher.subscribers == 0)
+            self.assertFalse(control.stop_requested)
+        finally:
+            publisher.close()
+        self.assertFalse(os.path.exists(self.address))
+
+    def test_subscriber_waits_for_trainer_on_loopback(self):
+        window = RecordingWindow()
+        port_probe = socket.socket()
+        port_probe.bind(("127.0.0.1", 0))
+        address = f"127.0.0.1:{port_probe.getsockname()[1]}"
+        port_probe.close()
+
+        subscriber = EventSubscriber(address, window, retry_interval=0.05)
+        subscriber.start()
+        wait_for(lambda: window.logs)
+        self.assertIn("Waiting for a trainer", window.logs[0][1])
+
+        publisher = EventPublisher(address)
+        publisher.start()
+        try:
+            self.assertTrue(is_serving(address))
+            publisher.update_progress(42)
+            self.assertTrue(subscriber.attached.wait(5))
+            wait_for(lambda: window.progress == [42])
+        finally:
+            publisher.close()
+        wait_for(lambda: not subscriber.attached.is_set())
+        subscriber.detach()
+        self.assertTrue(any("disconnected" in message for _, message in window.logs))
+
+    def test_stalled_subscriber_never_blocks_the_trainer(self):
+        publisher = EventPublisher(self.address, client_buffer=4)
+        publisher.start()
+        stalled = socket.socket(socket.AF_UNIX)
+        try:
+            stalled.connect(self.address)
+            wait_for(lambda: publisher.subscribers == 1)
+            message = "x" * 65536
+            start = time.perf_counter()
+            for _ in range(200):
+                publisher.update_log("INFO", message)
+            self.assertLess(time.perf_counter() - start, 2.0)
+            # It was dropped instead of slowing the trainer down
+            wait_for(lambda: publisher.subscribers == 0)
+        finally:
+            stalled.close()
+            publisher.close()
+
+    def test_refuses_a_second_publisher(self):
+        publisher = EventPublisher(self.address)
+        publisher.start()
+        try:
+            with self.assertRaises(RuntimeError):
+                EventPublisher(self.address).start()
+        finally:
+            publisher.close()
+        # A socket file left behind by a dead trainer is replaced
+        stale = socket.socket(socket.AF_UNIX)
+        stale.bind(self.address)
+        stale.close()
+        publisher = EventPublisher(self.address)
+        publisher.start()
+        publisher.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
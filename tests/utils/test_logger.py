@@ -0,0 +1,164 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+from src.utils.logger import ConsoleLogger, TrainingLogger
+
+
+class TestConsoleLogger(unittest.TestCase):
+    def test_log_lines_to_stream_and_file(self):
+        stream = io.StringIO()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "train.log")
+            sink = ConsoleLogger(stream=stream, log_file=path)
+            logger = TrainingLogger(sink)
+            logger.log("TRAINING", "Loss: 1.2345")
+            logger.close()
+            sink.close()
+            with open(path) as f:
+                written = f.read()
+
+        self.assertIn("[TRAINING] Loss: 1.2345", stream.getvalue())
+        self.assertEqual(written, stream.getvalue())
+
+    def test_progress_is_throttled(self):
+        stream = io.StringIO()
+        logger = TrainingLogger(ConsoleLogger(stream=stream, progress_step=5))
+        for progress in range(0, 101):
+            logger.update_progress(progress)
+        logger.update_progress(100)
+        logger.close()
+
+        lines = [line for line in stream.getvalue().splitlines() if "[PROGRESS]" in line]
+        self.assertEqual(len(lines), 21)
+        self.assertTrue(lines[-1].endswith("100%"))
+
+
+class ListSink:
+    def __init__(self, delay=0.0):
+        self.records = []
+        self.delay = delay
+        self.closed = False
+
+    def emit(self, records):
+        time.sleep(self.delay)
+        self.records.extend(records)
+
+    def close(self):
+        self.closed = True
+
+
+class TestTrainingLogger(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "logs", "training.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_records(self, path):
+        with open(path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_records_are_written_as_jsonl(self):
+        sink = ListSink()
+        logger = TrainingLogger(None, log_file=self.path, sinks=[sink])
+        logger.log("INFO", "Starting training...")
+        logger.step = 10
+        logger.log("TRAINING", "Loss: 1.5000", loss=1.5)
+        logger.close()
+
+        records = self.read_records(self.path)
+        self.assertEqual([record["message"] for record in records], ["Starting training...", "Loss: 1.5000"])
+        self.assertIsNone(records[0]["step"])
+        self.assertNotIn("data", records[0])
+        self.assertEqual((records[1]["step"], records[1]["data"]), (10, {"loss": 1.5}))
+        self.assertEqual(sink.records, records)
+        self.assertTrue(sink.closed)
+
+    def test_file_is_rotated(self):
+        logger = TrainingLogger(None, log_file=self.path, max_bytes=2000, backup_count=2)
+        for index in range(200):
+            logger.log("INFO", f"message {index:03d}")
+        logger.close()
+
+        self.assertTrue(os.path.exists(self.path + ".2"))
+        self.assertFalse(os.path.exists(self.path + ".3"))
+        self.assertLessEqual(os.path.getsize(self.path + ".1"), 2000)
+        self.assertEqual(self.read_records(self.path)[-1]["message"], "message 199")
+
+    def test_noisy_category_is_rate_limited(self):
+        sink = ListSink()
+        logger = TrainingLogger(None, rate_limits={"Tokenization": 2.0}, sinks=[sink])
+        for batch in range(100):
+            logger.log("Tokenization", f"batch {batch}")
+            logger.log("INFO", f"info {batch}")
+        logger.flush()
+
+        tokenization = [record for record in sink.records if record["category"] == "Tokenization"]
+        self.assertEqual(sum(record["category"] == "INFO" for record in sink.records), 100)
+        # A burst of two, then the latest held-back message standing for the rest
+        self.assertEqual([record["message"] for record in tokenization], ["batch 0", "batch 1", "batch 99"])
+        self.assertEqual(tokenization[-1]["suppressed"], 97)
+        logger.close()
+
+    def test_log_does_not_wait_for_sinks(self):
+        sink = ListSink(delay=0.2)
+        logger = TrainingLogger(None, sinks=[sink])
+        start = time.perf_counter()
+        for index in range(100):
+            logger.log("TRAINING", f"step {index}", step_time=0.1)
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertTrue(logger.flush(timeout=5))
+        self.assertEqual(len(sink.records), 100)
+        logger.close()
+
+    def test_progress_is_queued_in_order_with_records(self):
+        class SlowWindow:
+            def __init__(self):
+                self.calls = []
+
+            def update_log(self, category, message):
+                time.sleep(0.05)
+                self.calls.append(message)
+
+            def update_progress(self, progress):
+                self.calls.append(progress)
+
+        window = SlowWindow()
+        logger = TrainingLogger(window)
+        start = time.perf_counter()
+        logger.log("INFO", "Tokenizing dataset...")
+        logger.update_progress(30)
+        logger.log("INFO", "Dataset tokenized.")
+        logger.update_progress(130)
+        self.assertLess(time.perf_counter() - start, 0.05)
+        logger.close()
+        self.assertEqual(window.calls, ["Tokenizing dataset...", 30, "Dataset tokenized.", 100])
+
+        # Sink-only loggers have nowhere to show progress
+        logger = TrainingLogger(None, sinks=[ListSink()])
+        logger.update_progress(50)
+        logger.close()
+
+    def test_failing_sink_does_not_stop_the_others(self):
+        class FailingSink(ListSink):
+            def emit(self, records):
+                raise OSError("disk full")
+
+        sink = ListSink()
+        logger = TrainingLogger(None, sinks=[FailingSink(), sink])
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            logger.log("INFO", "still delivered")
+            logger.flush()
+        logger.close()
+        self.assertEqual([record["message"] for record in sink.records], ["still delivered"])
+        self.assertIn("disk full", stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import sys
+import threading
+import unittest
+import numpy as np
+from src.utils.metric_series import MetricSeries
+
+
+class TestMetricSeries(unittest.TestCase):
+    def test_running_averages(self):
+        values = np.linspace(1.0, 2.0, 500)
+        series = MetricSeries.from_values(values, window=50, ema_alpha=0.5)
+
+        self.assertEqual(len(series), 500)
+        self.assertEqual(series.last, 2.0)
+        self.assertAlmostEqual(series.running_mean, values.mean())
+        self.assertAlmostEqual(series.window_mean(), values[-50:].mean())
+        self.assertAlmostEqual(series.window_mean(10), values[-10:].mean())
+        self.assertAlmostEqual(series.average.last, values[-50:].mean())
+        self.assertGreater(series.ema, values[-50:].mean())
+
+    def test_empty_series(self):
+        series = MetricSeries()
+        self.assertIsNone(series.last)
+        self.assertIsNone(series.window_mean(10))
+
+    def test_small_series_not_downsampled(self):
+        series = MetricSeries.from_values([3.0, 1.0, 2.0])
+        steps, values = series.downsample(100)
+        self.assertEqual(steps.tolist(), [0, 1, 2])
+        self.assertEqual(values.tolist(), [3.0, 1.0, 2.0])
+
+    def test_downsample_keeps_extremes(self):
+        """Output size is bounded by max_points and spikes survive"""
+        values = np.random.RandomState(0).rand(100000)
+        values[12345] = 10.0
+        values[99999] = -5.0
+        series = MetricSeries.from_values(values, window=None)
+
+        steps, sampled = series.downsample(1000)
+        self.assertLessEqual(len(sampled), 1000)
+        self.assertGreater(len(sampled), 250)
+        self.assertEqual(sampled.max(), 10.0)
+        self.assertEqual(sampled.min(), -5.0)
+        self.assertEqual(steps[0], 0)
+
+    def test_growth_preserves_values(self):
+        series = MetricSeries(window=None, capacity=2)
+        for step in range(10):
+            series.append(step * 2, step=step * 10)
+        self.assertEqual(series.values.view().tolist(), [step * 2 for step in range(10)])
+        self.assertEqual(series.steps[-1], 90)
+
+    def test_downsample_while_appending(self):
+        """The UI thread downsamples while the trainer thread appends"""
+        series = MetricSeries(window=None)
+        errors = []
+        done = threading.Event()
+
+        def read():
+            while not done.is_set():
+                try:
+                    steps, values = series.downsample(max(1, len(series) - 1))
+                    if len(steps) != len(values):
+                        errors.append((len(steps), len(values)))
+                except Exception as e:
+                    errors.append(e)
+
+        interval = sys.getswitchinterval()
+        # Switch threads as often as possible so a half-appended block would be seen
+        sys.setswitchinterval(1e-6)
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            for step in range(20000):
+                series.append(step % 7)
+        finally:
+            done.set()
+            reader.join()
+            sys.setswitchinterval(interval)
+        self.assertEqual(errors, [])
@@ -0,0 +1,115 @@
+import csv
+import json
+import os
+import tempfile
+import threading
+import unittest
+import numpy as np
+from src.utils.run_log import RunLog, RunLogReader, export_run
+
+
+class TestRunLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.run_dir = os.path.join(self.tmp.name, "run")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write_run(self, rows=100, flush_rows=16):
+        log = RunLog(self.run_dir, flush_rows=flush_rows, flush_interval=60)
+        for step in range(rows):
+            values = {'step': step, 'loss': 1.0 / (step + 1), 'timestamp': float(step)}
+            if step >= 50:
+                # A column that only appears mid-run (e.g. eval metrics)
+                values['eval_loss'] = 2.0
+            log.append(**values)
+        log.close()
+        return RunLogReader(self.run_dir)
+
+    def test_columns_and_backfill(self):
+        reader = self._write_run()
+
+        self.assertEqual(len(reader), 100)
+        self.assertEqual(reader.columns, ['step', 'loss', 'timestamp', 'eval_loss'])
+        np.testing.assert_array_equal(reader.column('step'), np.arange(100))
+        eval_loss = reader.column('eval_loss')
+        self.assertTrue(np.isnan(eval_loss[:50]).all())
+        self.assertTrue((eval_loss[50:] == 2.0).all())
+
+    def test_schema_is_never_read_half_written(self):
+        """A reader polling the schema while columns keep appearing always gets valid JSON"""
+        log = RunLog(self.run_dir, flush_rows=1, flush_interval=60)
+        reader = RunLogReader(self.run_dir)
+        errors = []
+        done = threading.Event()
+
+        def poll():
+            while not done.is_set():
+                try:
+                    reader.columns
+                except ValueError as e:
+                    errors.append(e)
+
+        poller = threading.Thread(target=poll)
+        poller.start()
+        try:
+            for index in range(300):
+                log.append(**{f"metric_{index}": float(index)})
+            log.close()
+        finally:
+            done.set()
+            poller.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(reader.columns), 301)
+        self.assertNotIn("schema.json.tmp", os.listdir(os.path.join(self.run_dir, "metrics")))
+
+    def test_iter_chunks(self):
+        reader = self._write_run()
+
+        chunks = list(reader.iter_chunks(chunk_rows=30, columns=['step']))
+        self.assertEqual([len(chunk['step']) for chunk in chunks], [30, 30, 30, 10])
+        np.testing.assert_array_equal(np.concatenate([chunk['step'] for chunk in chunks]), np.arange(100))
+
+    def test_iter_chunks_from_offset(self):
+        reader = self._write_run()
+
+        chunks = list(reader.iter_chunks(chunk_rows=64, columns=['step'], start=90))
+        self.assertEqual(len(chunks), 1)
+        np.testing.assert_array_equal(chunks[0]['step'], np.arange(90, 100))
+
+    def test_empty_run(self):
+        RunLog(self.run_dir).close()
+        reader = RunLogReader(self.run_dir)
+        self.assertEqual(len(reader), 0)
+        self.assertEqual(reader.columns, [])
+
+    def test_export(self):
+        self._write_run()
+        written = export_run(self.run_dir, chunk_rows=32)
+
+        with open(written['csv'], newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 100)
+        self.assertEqual(rows[0]['eval_loss'], "")
+        self.assertEqual(rows[99], {'step': "99", 'loss': "0.01", 'timestamp': "99", 'eval_loss': "2"})
+
+        with open(written['json']) as f:
+            records = json.load(f)
+        self.assertEqual(len(records), 100)
+        self.assertNotIn('eval_loss', records[0])
+        self.assertEqual(records[60]['eval_loss'], 2.0)
+
+        arrays = np.load(written['npz'])
+        np.testing.assert_allclose(arrays['loss'], 1.0 / np.arange(1, 101))
+
+        if 'parquet' in written:
+            import pyarrow.parquet as pq
+            table = pq.read_table(written['parquet'])
+            self.assertEqual(table.num_rows, 100)
+            self.assertEqual(table.column('step').to_pylist()[-1], 99.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.utils.run_log import RunLog, RunLogReader
+from src.utils.run_registry import RunRegistry, load_curve
+
+
+class TestRunRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.registry = RunRegistry(self.root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write_run(self, name, rows, start_step=0):
+        run_dir = os.path.join(self.root, name)
+        log = RunLog(run_dir, flush_rows=64, flush_interval=60)
+        for step in range(start_step, start_step + rows):
+            log.append(step=step, loss=10.0 / (step + 1), learning_rate=1e-3, tokens_per_second=500.0)
+            if step % 10 == 9:
+                # Evaluation rows carry no training loss
+                log.append(step=step, eval_loss=5.0 / (step + 1))
+        log.close()
+        return run_dir
+
+    def test_registered_run_is_indexed_with_summary(self):
+        run_dir = os.path.join(self.root, "run-b")
+        self.registry.register(run_dir, {"learning_rate": 1e-3, "batch_size": 8})
+        self._write_run("run-b", 100)
+        self.registry.finish(run_dir, "stopped")
+        # A run logged before the registry existed is indexed from its log alone
+        self._write_run("run-a", 20)
+
+        runs = {run["name"]: run for run in self.registry.runs()}
+        self.assertEqual(set(runs), {"run-a", "run-b"})
+        run = runs["run-b"]
+        self.assertEqual((run["status"], run["config"]["batch_size"]), ("stopped", 8))
+        self.assertEqual((run["step"], run["final_loss"]), (99, 0.1))
+        self.assertAlmostEqual(run["best_eval_loss"], 0.05)
+        self.assertEqual(run["tokens_per_second"], 500.0)
+        self.assertEqual(runs["run-a"]["status"], "unknown")
+        self.assertIsNotNone(runs["run-a"]["started"])
+
+    def test_index_is_only_refreshed_for_changed_runs(self):
+        self._write_run("run-a", 20)
+        self.registry.runs()
+        index_mtime = os.stat(self.registry.index_file).st_mtime_ns
+        self.registry.runs()
+        self.assertEqual(os.stat(self.registry.index_file).st_mtime_ns, index_mtime)
+
+        self._write_run("run-a", 10, start_step=20)
+        runs = self.registry.runs()
+        self.assertEqual(runs[0]["step"], 29)
+
+    def test_curve_keeps_extremes_and_drops_gaps(self):
+        run_dir = self._write_run("run-a", 1000)
+        reader = RunLogReader(run_dir)
+        steps, values = load_curve(reader, "loss", max_points=100)
+        self.assertLessEqual(len(steps), 100)
+        self.assertFalse(np.isnan(values).any())
+        self.assertTrue((np.diff(steps) >= 0).all())
+        # The first (largest) and last (smallest) losses survive downsampling
+        self.assertEqual((values.max(), values.min()), (10.0, 0.01))
+
+        steps, values = load_curve(reader, "loss", max_points=10_000)
+        np.testing.assert_array_equal(steps, np.arange(1000))
+
+        cached = self.registry.curve(run_dir, "loss", 100)
+        self.assertIs(self.registry.curve(run_dir, "loss", 100), cached)
+        self._write_run("run-a", 10, start_step=1000)
+        self.assertEqual(self.registry.curve(run_dir, "loss", 100)[0][-1], 1009)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+import unittest
+from src.utils.startup import StartupTimer, import_times
+
+HEAVY_PACKAGES = ("torch", "transformers", "datasets")
+
+
+class TestStartup(unittest.TestCase):
+    def test_phases_are_reported(self):
+        messages = []
+        timer = StartupTimer(lambda category, message: messages.append((category, message)))
+        with timer.phase("Loading dashboard"):
+            pass
+
+        self.assertEqual([name for name, _ in timer.phases], ["Loading dashboard"])
+        self.assertEqual(messages[0], ("STARTUP", "Loading dashboard..."))
+        self.assertTrue(messages[1][1].startswith("Loading dashboard took"))
+        self.assertGreaterEqual(timer.mark("First frame"), 0.0)
+        self.assertEqual(len(timer.report()), 2)
+
+    def test_import_times(self):
+        entries = import_times("json")
+        names = [name for name, _, _ in entries]
+        self.assertIn("json", names)
+        self.assertEqual(entries, sorted(entries, key=lambda entry: entry[1], reverse=True))
+
+    def test_dashboard_imports_stay_light(self):
+        """The window must be able to paint before the training stack is loaded"""
+        code = (
+            "import sys, main, src.ui.training_window, src.config.training_config; "
+            f"print(','.join(m for m in {HEAVY_PACKAGES!r} if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "")
+
+
+if __name__ == '__main__':
+    unittest.main()